@@ -0,0 +1,88 @@
+"""Mede a repintura de uma tela com muitos GlassCards, com e sem o QGraphicsDropShadowEffect.
+
+Monta uma grade de cards iguais aos da aplicação, primeiro com a sombra
+antiga (um QGraphicsDropShadowEffect por card, que renderiza o card fora
+da tela e refaz o desfoque a cada quadro) e depois com o GlassCard atual,
+que pinta na própria margem a sombra montada com as nove partes
+pré-renderizadas de cardshadow e o vidro por cima.
+
+Uso (na raiz do projeto; não precisa de tela):
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_card_shadow [--cards 40] [--repeticoes 30]
+"""
+import argparse
+import sys
+import time
+
+from PySide6.QtCore import QSize
+from PySide6.QtGui import QColor, QImage
+from PySide6.QtWidgets import QApplication, QFrame, QGraphicsDropShadowEffect, QGridLayout, QLabel, \
+    QVBoxLayout, QWidget
+
+
+class LegacyGlassCard(QFrame):
+    """GlassCard como era antes: um QGraphicsDropShadowEffect por card"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setStyleSheet("""
+            QFrame {
+                background-color: rgba(35, 40, 60, 0.4);
+                border-radius: 20px;
+                border: 1px solid rgba(255, 255, 255, 0.1);
+            }
+        """)
+        shadow = QGraphicsDropShadowEffect()
+        shadow.setBlurRadius(15)
+        shadow.setColor(QColor(0, 0, 0, 160))
+        shadow.setOffset(0, 5)
+        self.setGraphicsEffect(shadow)
+        # O PySide6 não segura o efeito passado a setGraphicsEffect; sem esta
+        # referência ele é coletado e o card é pintado sem sombra
+        self.sombra = shadow
+
+
+def montar_tela(classe, quantidade):
+    tela = QWidget()
+    # Com seletor, para o fundo da tela não passar para os cards
+    tela.setObjectName("Tela")
+    tela.setStyleSheet("QWidget#Tela { background-color: rgb(20, 25, 45); }")
+    grade = QGridLayout(tela)
+    grade.setSpacing(30)
+    for i in range(quantidade):
+        card = classe()
+        layout = QVBoxLayout(card)
+        layout.addWidget(QLabel(f"Card {i + 1}"))
+        grade.addWidget(card, i // 8, i % 8)
+    tela.resize(QSize(1920, 1080))
+    tela.show()
+    return tela
+
+
+def repintar(tela, repeticoes):
+    """Tempo médio (ms) de uma repintura completa da tela"""
+    alvo = QImage(tela.size(), QImage.Format.Format_ARGB32_Premultiplied)
+    tela.render(alvo)  # primeira pintura: monta caches e layouts
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        tela.render(alvo)
+    return (time.perf_counter() - inicio) * 1000 / repeticoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=40)
+    parser.add_argument("--repeticoes", type=int, default=30)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    from mundoconsciencias import GlassCard
+    from theme import aplicar_tema
+    aplicar_tema(app)  # o GlassCard atual é estilizado pela folha do tema
+
+    antes = repintar(montar_tela(LegacyGlassCard, args.cards), args.repeticoes)
+    depois = repintar(montar_tela(GlassCard, args.cards), args.repeticoes)
+    print(f"{args.cards} cards: antes {antes:7.2f} ms/quadro, depois {depois:7.2f} ms/quadro")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""Mede a gravação em lotes e a repetição em fluxo do log de escolhas.
+
+Grava eventos um a um pelo ChoiceLog (como a tela da história faz), depois
+gera um log grande direto no formato binário e o repete pelo ProfileEngine
+com repetir_perfis, medindo o tempo e o pico de memória alocada. Confere o
+resultado contra ProfileEngine.recalcular_todos com todos os eventos na
+memória.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_choice_log [--gravacoes 200000] [--eventos 5000000] [--usuarios 100000]
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.bench_story_engine import historia_sintetica
+from choicelog import EVENT_DTYPE, HEADER, LOG_VERSION, MAGIC, RECORD, ChoiceLog, repetir_perfis
+from profileengine import ProfileEngine
+from storyengine import compile_story
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--gravacoes", type=int, default=200000)
+    parser.add_argument("--eventos", type=int, default=5000000)
+    parser.add_argument("--usuarios", type=int, default=100000)
+    parser.add_argument("--bloco", type=int, default=1 << 18, help="eventos lidos por vez")
+    args = parser.parse_args()
+
+    dados = historia_sintetica(2000)
+    dados["id"] = "sintetica"
+    story = compile_story(dados)
+    engine = ProfileEngine([story])
+    aleatorio = np.random.default_rng(3)
+    pasta = tempfile.mkdtemp()
+
+    # Gravação pelo caminho da aplicação: um evento por vez, em lotes
+    log = ChoiceLog(os.path.join(pasta, "gravacao.log"))
+    usuarios = aleatorio.integers(0, args.usuarios, args.gravacoes).tolist()
+    escolhas = aleatorio.integers(0, len(story.choice_targets), args.gravacoes).tolist()
+    inicio = time.perf_counter()
+    for usuario, escolha in zip(usuarios, escolhas):
+        log.registrar(usuario, "sintetica", 0, escolha, 1500)
+    log.close()
+    duracao = time.perf_counter() - inicio
+    print(f"Gravação: {args.gravacoes} eventos em {duracao * 1000:.0f} ms "
+          f"({duracao / args.gravacoes * 1e6:.2f} µs cada), {RECORD.size} bytes por evento")
+
+    # Log grande escrito direto no formato, com o mesmo registro de histórias
+    caminho = os.path.join(pasta, "grande.log")
+    eventos = np.zeros(args.eventos, dtype=EVENT_DTYPE)
+    eventos["user_id"] = aleatorio.integers(0, args.usuarios, args.eventos)
+    eventos["mode"] = 1
+    eventos["choice"] = aleatorio.integers(0, len(story.choice_targets), args.eventos)
+    with open(caminho, "wb") as arquivo:
+        arquivo.write(HEADER.pack(MAGIC, LOG_VERSION, RECORD.size))
+        eventos.tofile(arquivo)
+    with open(os.path.splitext(caminho)[0] + ".historias", "w", encoding="utf-8") as arquivo:
+        arquivo.write("sintetica\n")
+    tamanho = os.path.getsize(caminho)
+
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    perfis, _ = repetir_perfis(caminho, engine, args.bloco)
+    duracao = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"Repetição: {args.eventos} eventos ({tamanho / 2 ** 20:.0f} MiB) em {duracao * 1000:.0f} ms, "
+          f"pico de memória {pico / 2 ** 20:.0f} MiB")
+
+    referencia = engine.recalcular_todos(eventos["user_id"], np.zeros(args.eventos, dtype=np.intp),
+                                         eventos["choice"], len(perfis))
+    print(f"  resultados iguais: {np.array_equal(perfis, referencia)}")
+
+
+if __name__ == "__main__":
+    main()
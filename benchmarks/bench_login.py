@@ -0,0 +1,100 @@
+"""Benchmark de consultas de login sob concorrência.
+
+Compara o Database com pool de conexões por thread (modo WAL) contra o
+desenho anterior, em que uma única conexão e um único cursor eram
+compartilhados por todas as chamadas.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_login [--threads 8] [--usuarios 5000] [--segundos 3]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from database import Database
+
+
+class SingleCursorDatabase:
+    """Reprodução do desenho antigo: uma conexão e um cursor compartilhados"""
+
+    def __init__(self, db_name):
+        # Sem a trava, threads concorrentes falham com
+        # "Recursive use of cursors not allowed"
+        self.conn = sqlite3.connect(db_name, check_same_thread=False)
+        self.cursor = self.conn.cursor()
+        self.lock = threading.Lock()
+
+    def verificar_credenciais(self, email, senha):
+        with self.lock:
+            self.cursor.execute('SELECT 1 FROM usuarios WHERE email = ? AND senha = ?', (email, senha))
+            return self.cursor.fetchone() is not None
+
+    def close(self):
+        self.conn.close()
+
+
+def popular(db_name, quantidade):
+    db = Database(db_name)
+    with db.conn as conn:
+        conn.executemany(
+            "INSERT INTO usuarios (nome, apelido, email, senha) VALUES (?, ?, ?, ?)",
+            ((f"Usuario {i}", f"u{i}", f"u{i}@gmail.com", "123456") for i in range(quantidade)),
+        )
+    db.close()
+
+
+def medir(db, threads, quantidade, segundos):
+    contadores = [0] * threads
+    parar = threading.Event()
+
+    def trabalhador(indice):
+        rnd = random.Random(indice)
+        feitos = 0
+        while not parar.is_set():
+            i = rnd.randrange(quantidade)
+            db.verificar_credenciais(f"u{i}@gmail.com", "123456")
+            feitos += 1
+        contadores[indice] = feitos
+
+    workers = [threading.Thread(target=trabalhador, args=(i,)) for i in range(threads)]
+    inicio = time.perf_counter()
+    for w in workers:
+        w.start()
+    time.sleep(segundos)
+    parar.set()
+    for w in workers:
+        w.join()
+    return sum(contadores) / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--usuarios", type=int, default=5000)
+    parser.add_argument("--segundos", type=float, default=3.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        db_name = os.path.join(pasta, "bench.db")
+        popular(db_name, args.usuarios)
+
+        antigo = SingleCursorDatabase(db_name)
+        taxa_antiga = medir(antigo, args.threads, args.usuarios, args.segundos)
+        antigo.close()
+
+        novo = Database(db_name)
+        taxa_nova = medir(novo, args.threads, args.usuarios, args.segundos)
+        novo.close()
+
+    print(f"{args.threads} threads, {args.usuarios} usuários")
+    print(f"  cursor único    : {taxa_antiga:10.0f} consultas/s")
+    print(f"  pool por thread : {taxa_nova:10.0f} consultas/s")
+    print(f"  razão           : {taxa_nova / taxa_antiga:10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
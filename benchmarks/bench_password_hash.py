@@ -0,0 +1,65 @@
+"""Mede quantas senhas por segundo o PasswordHasher confere, por núcleo e em paralelo.
+
+Para cada configuração (scrypt e PBKDF2 com os custos atuais, e o que
+mais for pedido em --scrypt-n/--iteracoes) codifica uma senha e a
+confere repetidamente: primeiro numa única thread, depois com uma thread
+por núcleo, como no pool do CredentialService. Como o hashlib libera o
+GIL durante a derivação, a vazão em paralelo deve crescer com os núcleos.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_password_hash [--segundos 3] [--threads N] [--scrypt-n 16384 32768]
+"""
+import argparse
+import os
+import threading
+import time
+
+from passwordhash import PBKDF2_ITERATIONS, SCRYPT_N, PasswordHasher
+
+
+def medir(codificada, threads, segundos):
+    """Conferências por segundo somando todas as threads"""
+    contadores = [0] * threads
+    parar = threading.Event()
+
+    def trabalhador(indice):
+        feitos = 0
+        while not parar.is_set():
+            PasswordHasher.verificar("12#4!6", codificada)
+            feitos += 1
+        contadores[indice] = feitos
+
+    workers = [threading.Thread(target=trabalhador, args=(i,)) for i in range(threads)]
+    inicio = time.perf_counter()
+    for w in workers:
+        w.start()
+    time.sleep(segundos)
+    parar.set()
+    for w in workers:
+        w.join()
+    return sum(contadores) / (time.perf_counter() - inicio)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--segundos", type=float, default=3.0)
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--scrypt-n", type=int, nargs="+", default=[SCRYPT_N])
+    parser.add_argument("--iteracoes", type=int, nargs="+", default=[PBKDF2_ITERATIONS])
+    args = parser.parse_args()
+
+    hashers = [PasswordHasher("scrypt", n=n) for n in args.scrypt_n]
+    hashers += [PasswordHasher("pbkdf2_sha256", iteracoes=i) for i in args.iteracoes]
+    print(f"{args.threads} threads, {args.segundos:.0f} s por medição")
+    for hasher in hashers:
+        codificada = hasher.gerar("12#4!6")
+        parametros = codificada.split("$")[1]
+        uma = medir(codificada, 1, args.segundos)
+        varias = medir(codificada, args.threads, args.segundos)
+        print(f"  {hasher.algoritmo:13} {parametros:18}: {1000 / uma:6.1f} ms cada, "
+              f"{uma:7.1f}/s em 1 thread, {varias:7.1f}/s em {args.threads} "
+              f"({varias / args.threads:.1f}/s por núcleo)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""Mede o tempo de troca de nó na tela da história com e sem a antecipação de imagens.
+
+Gera uma história sintética em que cada nó tem uma imagem PNG própria
+(grande, como as ilustrações dos capítulos), percorre um caminho
+pseudoaleatório com uma pausa de leitura em cada nó e mede quanto tempo
+a thread da interface gasta para obter o pixmap do nó seguinte: primeiro
+decodificando na hora (sem chamar entrar), depois com o NodePrefetcher
+decodificando os destinos durante a leitura.
+
+Uso (na raiz do projeto; não precisa de tela):
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_prefetch [--nos 60] [--passos 40] [--leitura 150]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+import numpy as np
+from PySide6.QtGui import QGuiApplication, QImage
+
+from benchmarks.bench_story_engine import historia_sintetica
+from imagecache import cache_imagens
+from nodeprefetch import NodePrefetcher
+from storyengine import compile_story
+
+
+def gerar_imagens(pasta, quantidade, largura, altura):
+    """Imagens com ruído, para a decodificação do PNG não ser trivial"""
+    aleatorio = np.random.default_rng(7)
+    caminhos = []
+    for i in range(quantidade):
+        pixels = aleatorio.integers(0, 256, (altura, largura, 3), dtype=np.uint8)
+        imagem = QImage(pixels.data, largura, altura, largura * 3, QImage.Format.Format_RGB888)
+        caminho = os.path.join(pasta, f"no_{i}.png")
+        imagem.save(caminho)
+        caminhos.append(caminho)
+    return caminhos
+
+
+def percorrer(story, prefetcher, passos, leitura, antecipar, semente=1):
+    """Tempos (ms) para obter o pixmap de cada nó visitado"""
+    aleatorio = random.Random(semente)
+    tempos = []
+    node = story.start
+    for _ in range(passos):
+        inicio = time.perf_counter()
+        prefetcher.pixmap(story.image(node))
+        tempos.append((time.perf_counter() - inicio) * 1000)
+        if story.is_ending(node):
+            node = story.start
+            continue
+        if antecipar:
+            prefetcher.entrar(node)
+        time.sleep(leitura / 1000)
+        node = story.choice_target(node, aleatorio.randrange(story.choice_count(node)))
+    return tempos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nos", type=int, default=60)
+    parser.add_argument("--passos", type=int, default=40)
+    parser.add_argument("--leitura", type=int, default=150, help="pausa em cada nó, em ms")
+    parser.add_argument("--largura", type=int, default=1920)
+    parser.add_argument("--altura", type=int, default=1080)
+    args = parser.parse_args()
+
+    app = QGuiApplication(sys.argv)
+    pasta = tempfile.mkdtemp()
+    dados = historia_sintetica(args.nos)
+    caminhos = gerar_imagens(pasta, args.nos, args.largura, args.altura)
+    for node, caminho in zip(dados["nodes"].values(), caminhos):
+        node["image"] = caminho
+    story = compile_story(dados)
+
+    print(f"Nós: {args.nos}, imagens {args.largura}x{args.altura}, {args.passos} trocas, leitura {args.leitura} ms")
+    for nome, antecipar in (("sem antecipação", False), ("com antecipação", True)):
+        cache_imagens.limpar()
+        prefetcher = NodePrefetcher(story)
+        tempos = np.array(percorrer(story, prefetcher, args.passos, args.leitura, antecipar))
+        prefetcher.close()
+        print(f"  {nome}: mediana {np.median(tempos):.2f} ms, máximo {tempos.max():.2f} ms "
+              f"(acertos {prefetcher.acertos}, esperas {prefetcher.esperas}, falhas {prefetcher.falhas})")
+
+
+if __name__ == "__main__":
+    main()
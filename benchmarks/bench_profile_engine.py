@@ -0,0 +1,67 @@
+"""Compara o recálculo de todos os perfis em laço Python e vetorizado.
+
+Gera um registro sintético de escolhas (usuário, história, escolha) sobre
+histórias sintéticas e recalcula o perfil de todos os usuários de duas
+formas: percorrendo as escolhas de cada usuário em Python e com
+ProfileEngine.recalcular_todos. Confere que os resultados são iguais.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_profile_engine [--usuarios 100000] [--escolhas 5000000]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.bench_story_engine import historia_sintetica
+from profileengine import ProfileEngine
+from storyengine import ATTRIBUTES, compile_story
+
+
+def laco_python(stories, usuarios, historias, escolhas, total_usuarios):
+    """Como seria sem vetorização: uma soma de atributos por escolha"""
+    perfis = [[0] * len(ATTRIBUTES) for _ in range(total_usuarios)]
+    tabelas = [story.choice_effect_table for story in stories]
+    for usuario, historia, escolha in zip(usuarios.tolist(), historias.tolist(), escolhas.tolist()):
+        perfil, tabela, inicio = perfis[usuario], tabelas[historia], escolha * len(ATTRIBUTES)
+        for atributo in range(len(ATTRIBUTES)):
+            perfil[atributo] += tabela[inicio + atributo]
+    return np.array(perfis, dtype=np.int64)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--usuarios", type=int, default=100000)
+    parser.add_argument("--escolhas", type=int, default=5000000)
+    parser.add_argument("--historias", type=int, default=3)
+    args = parser.parse_args()
+
+    stories = []
+    for i in range(args.historias):
+        dados = historia_sintetica(2000, semente=i)
+        dados["id"] = f"sintetica_{i}"
+        stories.append(compile_story(dados))
+    engine = ProfileEngine(stories)
+
+    aleatorio = np.random.default_rng(1)
+    usuarios = aleatorio.integers(0, args.usuarios, args.escolhas)
+    historias = aleatorio.integers(0, args.historias, args.escolhas)
+    totais = np.array([len(story.choice_targets) for story in stories])
+    escolhas = (aleatorio.random(args.escolhas) * totais[historias]).astype(np.intp)
+
+    inicio = time.perf_counter()
+    vetorizado = engine.recalcular_todos(usuarios, historias, escolhas, args.usuarios)
+    tempo_vetorizado = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    referencia = laco_python(stories, usuarios, historias, escolhas, args.usuarios)
+    tempo_laco = time.perf_counter() - inicio
+
+    print(f"Usuários: {args.usuarios}, escolhas no registro: {args.escolhas}")
+    print(f"  laço Python : {tempo_laco * 1000:9.1f} ms")
+    print(f"  vetorizado  : {tempo_vetorizado * 1000:9.1f} ms ({tempo_laco / tempo_vetorizado:.0f}x)")
+    print(f"  resultados iguais: {np.array_equal(vetorizado, referencia)}")
+
+
+if __name__ == "__main__":
+    main()
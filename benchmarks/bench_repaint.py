@@ -0,0 +1,78 @@
+"""Mede o tempo de repintura dos fundos com e sem o cache de pixmaps.
+
+Compara o BackgroundWidget atual (que usa imagecache) com a versão anterior,
+que chamava QPixmap.scaled(..., SmoothTransformation) a cada paintEvent.
+
+Uso (na raiz do projeto; não precisa de tela):
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_repaint [--repeticoes 50]
+"""
+import argparse
+import sys
+import time
+
+from PySide6.QtCore import Qt, QSize
+from PySide6.QtGui import QBrush, QColor, QImage, QPainter, QPixmap
+from PySide6.QtWidgets import QApplication, QWidget
+
+IMAGEM = "NA PELE E NA CONSCIÊNCIA (11).png"
+
+
+class LegacyBackgroundWidget(QWidget):
+    """Pintura como era antes do cache: escala a imagem original a cada quadro"""
+
+    def __init__(self, path):
+        super().__init__()
+        self.original_pixmap = QPixmap(path)
+        self.darken_factor = 0.6
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        scaled_pixmap = self.original_pixmap.scaled(
+            self.size(),
+            Qt.AspectRatioMode.KeepAspectRatioByExpanding,
+            Qt.TransformationMode.SmoothTransformation
+        )
+        x = (self.width() - scaled_pixmap.width()) // 2
+        y = (self.height() - scaled_pixmap.height()) // 2
+        painter.drawPixmap(x, y, scaled_pixmap)
+        painter.setBrush(QBrush(QColor(0, 0, 0, int(255 * self.darken_factor))))
+        painter.setPen(Qt.NoPen)
+        painter.drawRect(self.rect())
+        painter.end()
+
+
+def repintar(widget, tamanhos, repeticoes):
+    """Tempo médio (ms) de um paintEvent completo para cada tamanho"""
+    alvo = QImage(QSize(1920, 1080), QImage.Format_ARGB32_Premultiplied)
+    inicio = time.perf_counter()
+    total = 0
+    for _ in range(repeticoes):
+        for tamanho in tamanhos:
+            widget.resize(tamanho)
+            widget.render(alvo)
+            total += 1
+    return (time.perf_counter() - inicio) * 1000 / total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeticoes", type=int, default=50)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    from mundoconsciencias import BackgroundWidget
+
+    fixo = [QSize(1700, 950)]
+    # Janela sendo arrastada para frente e para trás entre alguns tamanhos
+    redimensionando = [QSize(1600 + 20 * i, 900 + 10 * i) for i in range(5)]
+
+    print(f"Imagem: {IMAGEM}")
+    for nome, tamanhos in (("tamanho fixo", fixo), ("redimensionando", redimensionando)):
+        antes = repintar(LegacyBackgroundWidget(IMAGEM), tamanhos, args.repeticoes)
+        depois = repintar(BackgroundWidget(IMAGEM), tamanhos, args.repeticoes)
+        print(f"  {nome:16}: antes {antes:7.2f} ms/quadro, depois {depois:7.2f} ms/quadro")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Mede as consultas de perfis parecidos e diferentes no índice de similaridade.
+
+Gera perfis sintéticos (Justice, Reputation, Empathy, Stress), monta o
+ProfileSimilarityIndex e mede a latência das buscas dos k mais próximos e
+dos k mais distantes, o custo de atualizar perfis e, numa amostra das
+consultas, confere o resultado contra uma varredura completa em NumPy.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_similarity [--perfis 1000000] [--consultas 500] [--atualizacoes 20000]
+"""
+import argparse
+import time
+
+import numpy as np
+
+from similarityindex import ProfileSimilarityIndex
+from storyengine import ATTRIBUTES
+
+
+def varredura(vetores, ids, consulta, k, excluir, mais_distantes):
+    """Distâncias do resultado esperado, calculadas contra todos os perfis"""
+    distancias = np.sqrt(((vetores - consulta) ** 2).sum(axis=1))[ids != excluir]
+    distancias.sort()
+    return (distancias[::-1] if mais_distantes else distancias)[:k]
+
+
+def medir(indice, vetores, ids, aleatorio, consultas, k, conferir):
+    tempos = {False: [], True: []}
+    exatas = True
+    for numero in range(consultas):
+        linha = int(aleatorio.integers(len(ids)))
+        for mais_distantes in (False, True):
+            buscar = indice.mais_distantes if mais_distantes else indice.mais_proximos
+            inicio = time.perf_counter()
+            resultado = buscar(vetores[linha], k, excluir=int(ids[linha]))
+            tempos[mais_distantes].append(time.perf_counter() - inicio)
+            if numero < conferir:
+                esperado = varredura(vetores, ids, vetores[linha], k, ids[linha], mais_distantes)
+                exatas &= np.allclose([distancia for _, distancia in resultado], esperado)
+    return tempos, exatas
+
+
+def relatorio(tempos):
+    for mais_distantes, nome in ((False, "mais parecidos "), (True, "mais diferentes")):
+        amostras = np.array(tempos[mais_distantes]) * 1000
+        print(f"  {nome}: mediana {np.median(amostras):.3f} ms, p99 {np.percentile(amostras, 99):.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--perfis", type=int, default=1000000)
+    parser.add_argument("--consultas", type=int, default=500)
+    parser.add_argument("--atualizacoes", type=int, default=20000)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--conferir", type=int, default=20, help="consultas conferidas contra a varredura")
+    args = parser.parse_args()
+
+    aleatorio = np.random.default_rng(42)
+    ids = np.arange(1, args.perfis + 1, dtype=np.int64)
+    vetores = aleatorio.normal(0, 15, (args.perfis, len(ATTRIBUTES))).round()
+
+    indice = ProfileSimilarityIndex(len(ATTRIBUTES))
+    inicio = time.perf_counter()
+    indice.construir(ids, vetores)
+    print(f"Perfis: {args.perfis}, construção do índice: {time.perf_counter() - inicio:.2f} s")
+
+    tempos, exatas = medir(indice, vetores, ids, aleatorio, args.consultas, args.k, args.conferir)
+    relatorio(tempos)
+    print(f"  iguais à varredura completa: {exatas}")
+
+    # Cada atualização simula o perfil mudando depois de algumas escolhas
+    inicio = time.perf_counter()
+    for _ in range(args.atualizacoes):
+        linha = int(aleatorio.integers(args.perfis))
+        vetores[linha] += aleatorio.integers(-3, 4, len(ATTRIBUTES))
+        indice.atualizar(int(ids[linha]), vetores[linha])
+    duracao = time.perf_counter() - inicio
+    print(f"Atualizações: {args.atualizacoes}, {duracao / max(1, args.atualizacoes) * 1e6:.1f} µs cada "
+          f"(incluindo as reorganizações)")
+
+    tempos, exatas = medir(indice, vetores, ids, aleatorio, args.consultas, args.k, args.conferir)
+    relatorio(tempos)
+    print(f"  iguais à varredura completa: {exatas}")
+
+
+if __name__ == "__main__":
+    main()
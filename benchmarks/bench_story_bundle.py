@@ -0,0 +1,73 @@
+"""Compara abrir uma história grande pelo JSON e pelo pacote binário.
+
+Para cada forma mede o tempo até exibir o primeiro nó e o tempo de abrir
+e percorrer um caminho curto (o que um jogador faz numa sessão), usando a
+mesma história sintética de bench_story_engine.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_story_bundle [--nos 50000] [--caminho 30]
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from benchmarks.bench_story_engine import historia_sintetica
+from storybundle import BundledStory, build_bundle, bundle_path
+from storyengine import StoryCursor, load_story
+
+
+def sessao(story, passos):
+    """Exibe o nó atual e segue a primeira escolha, como um jogador faria"""
+    cursor = StoryCursor(story)
+    for _ in range(passos):
+        story.text(cursor.node)
+        cursor.choices()
+        if cursor.finished:
+            break
+        cursor.choose(0)
+
+
+def medir(abrir, passos, repeticoes):
+    primeiro, completo = [], []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        story = abrir()
+        story.text(story.start)
+        primeiro.append(time.perf_counter() - inicio)
+        sessao(story, passos)
+        completo.append(time.perf_counter() - inicio)
+        if isinstance(story, BundledStory):
+            story.close()
+    return min(primeiro) * 1000, min(completo) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nos", type=int, default=50000)
+    parser.add_argument("--caminho", type=int, default=30, help="nós visitados na sessão")
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as pasta:
+        source_path = os.path.join(pasta, "sintetica.json")
+        with open(source_path, "w", encoding="utf-8") as arquivo:
+            json.dump(historia_sintetica(args.nos), arquivo, ensure_ascii=False)
+
+        inicio = time.perf_counter()
+        destino = build_bundle(source_path)
+        construcao = (time.perf_counter() - inicio) * 1000
+
+        json_primeiro, json_sessao = medir(lambda: load_story(source_path), args.caminho, args.repeticoes)
+        pacote_primeiro, pacote_sessao = medir(lambda: BundledStory(bundle_path(source_path), source_path),
+                                               args.caminho, args.repeticoes)
+
+        print(f"Nós: {args.nos}; JSON {os.path.getsize(source_path) / 1024:.0f} KiB, "
+              f"pacote {os.path.getsize(destino) / 1024:.0f} KiB (gerado em {construcao:.0f} ms)")
+        print(f"  JSON   : primeiro nó {json_primeiro:9.2f} ms, sessão de {args.caminho} nós {json_sessao:9.2f} ms")
+        print(f"  pacote : primeiro nó {pacote_primeiro:9.2f} ms, sessão de {args.caminho} nós {pacote_sessao:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
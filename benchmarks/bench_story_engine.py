@@ -0,0 +1,87 @@
+"""Mede carga, compilação e percurso de uma história sintética grande.
+
+Gera uma história com N nós (duas ou três escolhas por nó, textos
+repetidos para exercitar a tabela de strings), grava em JSON, carrega e
+compila com storyengine e depois percorre o grafo fazendo escolhas
+pseudoaleatórias até somar o número de passos pedido.
+
+Uso (na raiz do projeto):
+    python -m benchmarks.bench_story_engine [--nos 50000] [--passos 1000000]
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+
+from storyengine import ATTRIBUTES, StoryCursor, load_story
+
+
+def historia_sintetica(quantidade, semente=42):
+    """Cadeia de capítulos em que cada nó aponta para nós à frente e o último é final"""
+    aleatorio = random.Random(semente)
+    frases = [f"Trecho narrativo {i} com uma decisão difícil pela frente." for i in range(500)]
+    nodes = {}
+    for i in range(quantidade):
+        if i == quantidade - 1:
+            nodes[f"n{i}"] = {"text": "Fim.", "ending": True}
+            continue
+        destinos = {i + 1} | {min(quantidade - 1, i + aleatorio.randint(1, 50))
+                              for _ in range(aleatorio.randint(1, 2))}
+        nodes[f"n{i}"] = {
+            "text": aleatorio.choice(frases),
+            "choices": [
+                {"text": f"Opção {j + 1}", "target": f"n{destino}",
+                 "effects": {atributo: aleatorio.randint(-2, 2) for atributo in ATTRIBUTES}}
+                for j, destino in enumerate(sorted(destinos))
+            ],
+        }
+    return {"id": "sintetica", "title": "História sintética", "start": "n0", "nodes": nodes}
+
+
+def tamanho_tabelas(story):
+    return sum(tabela.itemsize * len(tabela) for tabela in (
+        story.node_text, story.node_image, story.node_ending, story.choice_offset,
+        story.choice_text_ids, story.choice_targets, story.choice_effect_table))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--nos", type=int, default=50000)
+    parser.add_argument("--passos", type=int, default=1000000)
+    args = parser.parse_args()
+
+    dados = historia_sintetica(args.nos)
+    with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False, encoding="utf-8") as arquivo:
+        json.dump(dados, arquivo, ensure_ascii=False)
+        caminho = arquivo.name
+    try:
+        inicio = time.perf_counter()
+        story = load_story(caminho)
+        carga = (time.perf_counter() - inicio) * 1000
+        tamanho_json = os.path.getsize(caminho)
+    finally:
+        os.remove(caminho)
+
+    aleatorio = random.Random(7)
+    escolhas = [aleatorio.random() for _ in range(4096)]
+    passos = 0
+    inicio = time.perf_counter()
+    while passos < args.passos:
+        cursor = StoryCursor(story)
+        while not cursor.finished and passos < args.passos:
+            quantidade = story.choice_count(cursor.node)
+            cursor.choose(int(escolhas[passos & 4095] * quantidade))
+            passos += 1
+    percurso = time.perf_counter() - inicio
+
+    print(f"Nós: {story.node_count}, escolhas: {len(story.choice_targets)}, strings únicas: {len(story.strings)}")
+    print(f"  JSON                : {tamanho_json / 1024:8.0f} KiB")
+    print(f"  tabelas compiladas  : {tamanho_tabelas(story) / 1024:8.0f} KiB")
+    print(f"  carga + compilação  : {carga:8.1f} ms")
+    print(f"  percurso            : {passos / percurso:10.0f} escolhas/s ({percurso * 1e9 / passos:.0f} ns/escolha)")
+
+
+if __name__ == "__main__":
+    main()
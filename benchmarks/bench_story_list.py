@@ -0,0 +1,73 @@
+"""Mede a rolagem da lista virtualizada de histórias com milhares de entradas.
+
+Monta um StoryListView com N histórias sintéticas, rola a lista de cima a
+baixo renderizando o viewport a cada passo e informa o tempo de montagem e
+o tempo médio por quadro (a meta é ficar abaixo de 16,7 ms, ou seja, 60 fps).
+
+Uso (na raiz do projeto; não precisa de tela):
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_story_list [--historias 10000]
+"""
+import argparse
+import sys
+import time
+
+from PySide6.QtCore import QSize
+from PySide6.QtGui import QImage
+from PySide6.QtWidgets import QApplication
+
+STATUSES = ("not_started", "in_progress", "completed")
+
+
+def historias_sinteticas(quantidade):
+    historias = []
+    for i in range(quantidade):
+        status = STATUSES[i % 3]
+        story = {"id": f"story_{i}", "title": f"História {i}", "status": status}
+        if status == "in_progress":
+            story["progress"] = f"Capítulo {i % 12 + 1}"
+            story["completion"] = f"{i % 100}%"
+        elif status == "completed":
+            story["completion"] = "100%"
+        historias.append(story)
+    return historias
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--historias", type=int, default=10000)
+    parser.add_argument("--passo", type=int, default=40, help="pixels rolados por quadro")
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    from storylist import StoryListModel, StoryCardDelegate, StoryListView
+
+    inicio = time.perf_counter()
+    model = StoryListModel(historias_sinteticas(args.historias))
+    view = StoryListView(model, StoryCardDelegate(playable_ids={"story_0"}))
+    view.resize(QSize(1200, 700))
+    view.show()
+    app.processEvents()
+    montagem = (time.perf_counter() - inicio) * 1000
+
+    barra = view.verticalScrollBar()
+    alvo = QImage(view.viewport().size(), QImage.Format_ARGB32_Premultiplied)
+    quadros = 0
+    pior = 0.0
+    inicio = time.perf_counter()
+    for posicao in range(0, barra.maximum() + 1, args.passo):
+        antes = time.perf_counter()
+        barra.setValue(posicao)
+        view.viewport().render(alvo)
+        pior = max(pior, time.perf_counter() - antes)
+        quadros += 1
+    total = (time.perf_counter() - inicio) * 1000
+
+    print(f"Histórias: {args.historias}")
+    print(f"  montagem da lista : {montagem:8.1f} ms")
+    print(f"  quadros rolados   : {quadros}")
+    print(f"  média por quadro  : {total / max(quadros, 1):8.2f} ms")
+    print(f"  pior quadro       : {pior * 1000:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
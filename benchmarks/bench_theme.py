@@ -0,0 +1,184 @@
+"""Mede a construção dos widgets e a troca de modo com folhas por widget e com a folha do tema.
+
+Monta várias vezes o painel de seleção de modo do Mundo de Consciências
+(rótulo, dois indicadores e dois ModernButtons dentro de um GlassCard),
+primeiro como era antes, com um setStyleSheet em cada widget, e depois
+com os widgets atuais, estilizados pela folha única de theme. Em seguida
+alterna o modo selecionado muitas vezes: antes, cada troca concatenava
+regras na folha do botão (que crescia e era reanalisada); agora só muda
+a propriedade "selecionado" e o widget é repolido.
+
+Uso (na raiz do projeto; não precisa de tela):
+    QT_QPA_PLATFORM=offscreen python -m benchmarks.bench_theme [--paineis 50] [--trocas 500]
+"""
+import argparse
+import sys
+import time
+from functools import partial
+
+from PySide6.QtGui import QColor
+from PySide6.QtWidgets import QApplication, QFrame, QHBoxLayout, QLabel, QPushButton
+
+
+def _indicador_antigo(cor, preenchido):
+    return f"""
+        QLabel {{
+            background-color: {cor if preenchido else "transparent"};
+            border: 2px solid {cor};
+            border-radius: 15px;
+        }}
+    """
+
+
+class LegacyModernButton(QPushButton):
+    """ModernButton como era antes: folha própria montada no construtor"""
+
+    def __init__(self, text, color1, color2, parent=None):
+        super().__init__(text, parent)
+        self.setFixedHeight(50)
+        claro = [QColor(cor).lighter(120).name() for cor in (color1, color2)]
+        escuro = [QColor(cor).darker(120).name() for cor in (color1, color2)]
+        self.setStyleSheet(f"""
+            QPushButton {{
+                background-color: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 {color1}, stop:1 {color2});
+                color: white;
+                border-radius: 25px;
+                font: bold 16px;
+                padding: 0 25px;
+                border: none;
+            }}
+            QPushButton:hover {{
+                background-color: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 {claro[0]}, stop:1 {claro[1]});
+            }}
+            QPushButton:pressed {{
+                background-color: qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 {escuro[0]}, stop:1 {escuro[1]});
+                padding-top: 2px;
+            }}
+        """)
+
+
+class LegacyPanel(QFrame):
+    def __init__(self):
+        super().__init__()
+        self.setStyleSheet("""
+            QFrame {
+                background-color: rgba(35, 40, 60, 0.4);
+                border-radius: 20px;
+                border: 1px solid rgba(255, 255, 255, 0.1);
+            }
+        """)
+        layout = QHBoxLayout(self)
+        rotulo = QLabel("SELECIONE O MODO:")
+        rotulo.setStyleSheet("QLabel { color: #AAAAAA; font-size: 18px; font-weight: bold; }")
+        layout.addWidget(rotulo)
+        self.mode1_indicator = QLabel()
+        self.mode1_indicator.setStyleSheet(_indicador_antigo("#FFD700", False))
+        self.mode1_btn = LegacyModernButton("MODO TRADICIONAL", "#FF8C00", "#FFD700")
+        self.mode2_indicator = QLabel()
+        self.mode2_indicator.setStyleSheet(_indicador_antigo("#9370DB", False))
+        self.mode2_btn = LegacyModernButton("MODO TEMPORIZADO", "#8A2BE2", "#9370DB")
+        for widget in (self.mode1_indicator, self.mode1_btn, self.mode2_indicator, self.mode2_btn):
+            layout.addWidget(widget)
+
+    def select_mode(self, mode):
+        """Cópia da troca de modo antiga"""
+        if mode == "modo1":
+            self.mode1_indicator.setStyleSheet(_indicador_antigo("#FFD700", True))
+            self.mode2_indicator.setStyleSheet(_indicador_antigo("#9370DB", False))
+            self.mode1_btn.setStyleSheet(self.mode1_btn.styleSheet() + """
+                QPushButton {
+                    border: 2px solid #FFD700;
+                }
+            """)
+            self.mode2_btn.setStyleSheet(self.mode2_btn.styleSheet().replace("border: 2px solid #9370DB;", ""))
+        else:
+            self.mode1_indicator.setStyleSheet(_indicador_antigo("#FFD700", False))
+            self.mode2_indicator.setStyleSheet(_indicador_antigo("#9370DB", True))
+            self.mode2_btn.setStyleSheet(self.mode2_btn.styleSheet() + """
+                QPushButton {
+                    border: 2px solid #9370DB;
+                }
+            """)
+            self.mode1_btn.setStyleSheet(self.mode1_btn.styleSheet().replace("border: 2px solid #FFD700;", ""))
+
+
+def painel_atual(GlassCard, ModernButton, definir_estado):
+    """Painel com os widgets atuais (importados em main, fora da medição)"""
+    painel = GlassCard()
+    layout = QHBoxLayout(painel)
+    rotulo = QLabel("SELECIONE O MODO:")
+    rotulo.setObjectName("RotuloSecao")
+    layout.addWidget(rotulo)
+    painel.mode1_indicator = QLabel()
+    painel.mode1_indicator.setObjectName("IndicadorModo")
+    painel.mode1_indicator.setProperty("variante", "dourado")
+    painel.mode1_btn = ModernButton("MODO TRADICIONAL", "dourado")
+    painel.mode2_indicator = QLabel()
+    painel.mode2_indicator.setObjectName("IndicadorModo")
+    painel.mode2_indicator.setProperty("variante", "violeta")
+    painel.mode2_btn = ModernButton("MODO TEMPORIZADO", "violeta")
+    for widget in (painel.mode1_indicator, painel.mode1_btn, painel.mode2_indicator, painel.mode2_btn):
+        layout.addWidget(widget)
+
+    def select_mode(mode):
+        for modo, botao, indicador in (("modo1", painel.mode1_btn, painel.mode1_indicator),
+                                       ("modo2", painel.mode2_btn, painel.mode2_indicator)):
+            definir_estado(botao, "selecionado", modo == mode)
+            definir_estado(indicador, "selecionado", modo == mode)
+
+    painel.select_mode = select_mode
+    return painel
+
+
+def construir(fabrica, quantidade, app):
+    """Tempo total (ms) para criar e polir os painéis, e os painéis criados"""
+    inicio = time.perf_counter()
+    paineis = [fabrica() for _ in range(quantidade)]
+    for painel in paineis:
+        painel.ensurePolished()
+        for filho in painel.findChildren(QFrame) + painel.findChildren(QPushButton):
+            filho.ensurePolished()
+    app.processEvents()
+    return (time.perf_counter() - inicio) * 1000, paineis
+
+
+def alternar(painel, trocas, app):
+    """Tempo médio (ms) de uma troca de modo"""
+    painel.show()
+    app.processEvents()
+    inicio = time.perf_counter()
+    for i in range(trocas):
+        painel.select_mode("modo1" if i % 2 == 0 else "modo2")
+        app.processEvents()
+    return (time.perf_counter() - inicio) * 1000 / trocas
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--paineis", type=int, default=50)
+    parser.add_argument("--trocas", type=int, default=500)
+    args = parser.parse_args()
+
+    app = QApplication(sys.argv)
+    # Importar mundoconsciencias custa mais que construir os painéis: fica fora da medição
+    from mundoconsciencias import GlassCard, ModernButton
+    from theme import aplicar_tema, compilar, definir_estado
+
+    inicio = time.perf_counter()
+    aplicar_tema(app)
+    print(f"Folha do tema: {len(compilar())} caracteres, compilada e aplicada em "
+          f"{(time.perf_counter() - inicio) * 1000:.2f} ms")
+
+    antes, antigos = construir(LegacyPanel, args.paineis, app)
+    depois, atuais = construir(partial(painel_atual, GlassCard, ModernButton, definir_estado), args.paineis, app)
+    print(f"Construção de {args.paineis} painéis: antes {antes:8.2f} ms, depois {depois:8.2f} ms")
+
+    antes = alternar(antigos[0], args.trocas, app)
+    tamanho = len(antigos[0].mode1_btn.styleSheet())
+    depois = alternar(atuais[0], args.trocas, app)
+    print(f"Troca de modo ({args.trocas}x): antes {antes:6.3f} ms cada (folha do botão com {tamanho} "
+          f"caracteres no fim), depois {depois:6.3f} ms cada")
+
+
+if __name__ == "__main__":
+    main()
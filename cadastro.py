@@ -1,24 +1,30 @@
 
 import sys
+from startuptimeline import timeline
 import re
 import os
 import sqlite3
-import random
-import smtplib
-from email.mime.text import MIMEText
 from typing import Optional, Tuple, Dict, Any
-from datetime import datetime, timedelta
 from dotenv import load_dotenv
 from PySide6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout,
                                QHBoxLayout, QLabel, QLineEdit, QPushButton,
                                QCheckBox, QMessageBox, QSpacerItem, QSizePolicy, QDialog)
-from PySide6.QtGui import QPixmap, QPainter, QIcon, QFont, QLinearGradient, QColor
+from PySide6.QtGui import QPainter, QIcon, QFont, QLinearGradient, QColor
 from PySide6.QtCore import QFile, Qt, QSize, QTimer
+timeline.marcar("importar PySide6")
 
-from loginapp import LoginScreen
+# LoginScreen (e, a partir dela, o menu e o Mundo de Consciências) só é
+# importada quando o usuário abre o login, para não atrasar a primeira janela
+from credentialservice import CredentialService
 from database import Database
+from maildispatcher import MailDispatcher
+from ratelimit import RateLimiter, mensagem_espera
+from verificationcodes import CODE_MESSAGES, CODE_VALID, PURPOSE_LOGIN, PURPOSE_SIGNUP, VerificationCodeStore
+from imagecache import cache_imagens
+from theme import aplicar_tema
 # Carregar variáveis de ambiente
 load_dotenv('cadastroapp.env')
+timeline.marcar("importar módulos do app")
 
 
 
@@ -33,23 +39,38 @@ class MinhaJanela(QMainWindow):
         self.EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD")
         self.SMTP_SERVER = os.getenv("SMTP_SERVER")
         self.SMTP_PORT = int(os.getenv("SMTP_PORT", 587))
+        self.SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "1") != "0"
         
         if not all([self.EMAIL_SENDER, self.EMAIL_PASSWORD, self.SMTP_SERVER]):
             QMessageBox.critical(self, "Erro de Configuração", 
                                "Variáveis de ambiente não configuradas corretamente!")
             sys.exit(1)
         
+        # Envio de emails em segundo plano para não travar a interface
+        self.mail_dispatcher = MailDispatcher(
+            self.EMAIL_SENDER, self.SMTP_SERVER, self.SMTP_PORT,
+            self.EMAIL_SENDER, self.EMAIL_PASSWORD, usar_tls=self.SMTP_STARTTLS
+        )
+        self.mail_dispatcher.entrega_concluida.connect(self._on_email_entregue)
+        
         # Inicializar banco de dados
         self.db = Database()
+        # Senhas codificadas e conferidas fora da thread da interface
+        self.credenciais = CredentialService(self.db)
+        self.credenciais.cadastro_concluido.connect(self._on_cadastro_concluido)
+        self.cadastro_pendente = False
+        # Códigos de verificação pendentes, guardados no mesmo banco
+        self.codigos = VerificationCodeStore(self.db.db_name)
+        # Limites de reenvio de códigos e de senhas erradas, também no banco
+        self.limites = RateLimiter(self.db.db_name)
         self.tentativas_login = 0
         self.janela_2fa = None
         self.dados_cadastro_temp = None
         self.current_field_index = 0
-        self.background_pixmap = None
+        self.background_path = None
 
         caminho_imagem_fundo = r"C:/Users/Clara/OneDrive/Área de Trabalho/KIVY/NA PELE E NA CONSCIÊNCIA (1).png"
         caminho_icone_local = "C:/Users/Clara/OneDrive/Área de Trabalho/KIVY/logo.ico"
-        caminho_checkmark_icon = "check.png"
 
         if not QFile.exists(caminho_imagem_fundo):
             QMessageBox.critical(self, "Erro de Imagem de Fundo",
@@ -57,13 +78,8 @@ class MinhaJanela(QMainWindow):
                                "Por favor, verifique o caminho e o nome do arquivo 'NA PELE E NA CONSCIÊNCIA (1).png'.")
             return
 
-        self.background_pixmap = QPixmap(caminho_imagem_fundo)
-
-        if self.background_pixmap.isNull():
-            QMessageBox.critical(self, "Erro de Carregamento da Imagem de Fundo",
-                               f"Não foi possível criar QPixmap a partir de: \n{caminho_imagem_fundo}\n"
-                               "O arquivo pode estar corrompido ou em um formato não suportado pelo Qt.")
-            self.background_pixmap = None
+        # A imagem só é decodificada na primeira pintura (ver paintEvent)
+        self.background_path = caminho_imagem_fundo
 
         if QFile.exists(caminho_icone_local):
             icone = QIcon(caminho_icone_local)
@@ -73,7 +89,7 @@ class MinhaJanela(QMainWindow):
                               f"O ícone não foi encontrado no caminho: \n{caminho_icone_local}\n"
                               "A janela usará o ícone padrão do sistema.")
 
-        self.setStyleSheet("QMainWindow { background: transparent; }")
+        self.setObjectName("JanelaCadastro")
 
         central_widget = QWidget(self)
         self.setCentralWidget(central_widget)
@@ -82,66 +98,8 @@ class MinhaJanela(QMainWindow):
         main_layout.setAlignment(Qt.AlignCenter)
         main_layout.setSpacing(0)
 
-        gradient_start_color = "#F06292"
-        gradient_middle_color = "#FFD54F"
-        gradient_end_color = "#8E24AA"
-
-        self.form_stylesheet = f"""
-            QLabel {{
-                color: white;
-                font-family: 'Arial';
-                font-size: 16px;
-                font-weight: normal;
-            }}
-            QLineEdit {{
-                background-color: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                                                stop:0 {gradient_start_color}, 
-                                                stop:0.5 {gradient_middle_color}, 
-                                                stop:1 {gradient_end_color});
-                border: 1px solid white;
-                border-radius: 15px;
-                padding: 10px;
-                color: white;
-                font-size: 14px;
-                font-family: 'Arial';
-            }}
-            QPushButton {{
-                background-color: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                                                stop:0 {gradient_start_color}, 
-                                                stop:0.5 {gradient_middle_color}, 
-                                                stop:1 {gradient_end_color});
-                color: white;
-                border: none;
-                border-radius: 20px;
-                padding: 12px 25px;
-                font-size: 18px;
-                font-weight: bold;
-                font-family: 'Arial';
-            }}
-            QPushButton:hover {{
-                background-color: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                                                stop:0 #FF80AB, 
-                                                stop:0.5 #FFEB3B, 
-                                                stop:1 #AB47BC);
-            }}
-            QCheckBox {{
-                color: white;
-                font-size: 14px;
-                font-family: 'Arial';
-            }}
-            QCheckBox::indicator {{
-                width: 18px;
-                height: 18px;
-                border: 2px solid white;
-                border-radius: 5px;
-                background-color: transparent;
-            }}
-            QCheckBox::indicator:checked {{
-                background-color: white;
-                image: url({caminho_checkmark_icon});
-            }}
-        """
-        central_widget.setStyleSheet(self.form_stylesheet)
+        # Labels, campos, botões e caixas do formulário: regras #FormularioCadastro do tema
+        central_widget.setObjectName("FormularioCadastro")
 
         # Espaçamento grande no topo (40% da janela)
         top_spacer = QSpacerItem(20, 300, QSizePolicy.Minimum, QSizePolicy.Expanding)
@@ -227,29 +185,33 @@ class MinhaJanela(QMainWindow):
         # Mostrar critérios do primeiro campo após a janela estar totalmente carregada
         QTimer.singleShot(100, self.show_first_criteria)
 
-    def gerar_codigo(self):
-        return str(random.randint(100000, 999999))
+    def liberar_envio(self, email, finalidade, janela):
+        """Consome uma ficha de envio; avisa o usuário e retorna False se ele pediu códigos demais"""
+        espera = self.limites.liberar_envio(email, finalidade)
+        if espera:
+            QMessageBox.warning(janela, "Aguarde", mensagem_espera(espera))
+            return False
+        return True
 
     def enviar_codigo_email(self, destinatario, codigo):
-        try:
-            msg = MIMEText(
-                f"Olá! Seja bem vindo (a) ao Na Pele e na Consciência\n Seu código de verificação é: {codigo}\n\nEste código é válido por 5 minutos.")
-            msg['Subject'] = 'Código de Verificação - Na Pele e na Consciência'
-            msg['From'] = self.EMAIL_SENDER
-            msg['To'] = destinatario
-
-            with smtplib.SMTP(self.SMTP_SERVER, self.SMTP_PORT) as server:
-                server.starttls()
-                server.login(self.EMAIL_SENDER, self.EMAIL_PASSWORD)
-                server.sendmail(self.EMAIL_SENDER, destinatario, msg.as_string())
-            return True
-        except Exception as e:
-            print(f"Erro ao enviar email: {e}")
-            return False
+        """Coloca o email com o código na fila de envio; retorna False se não foi aceito"""
+        return self.mail_dispatcher.enfileirar(
+            destinatario,
+            'Código de Verificação - Na Pele e na Consciência',
+            f"Olá! Seja bem vindo (a) ao Na Pele e na Consciência\n Seu código de verificação é: {codigo}\n\nEste código é válido por 5 minutos.")
+
+    def _on_email_entregue(self, destinatario, sucesso, erro):
+        """Avisa o usuário quando o envio em segundo plano falha definitivamente"""
+        if not sucesso:
+            QMessageBox.critical(QApplication.activeModalWidget() or self, "Erro",
+                               f"Falha ao enviar código de verificação para {destinatario}. Tente novamente.")
 
     def criar_janela_2fa(self, nome, apelido, email, senha):
+        if not self.liberar_envio(email, PURPOSE_SIGNUP, self):
+            return
         self.janela_2fa = QDialog(self)
         self.janela_2fa.setWindowTitle("Autenticação em Duas Etapas")
+        self.janela_2fa.setObjectName("Dialogo2FA")
         self.janela_2fa.setFixedSize(400, 350)
 
         QMessageBox.information(self, "Verificação Necessária",
@@ -259,11 +221,11 @@ class MinhaJanela(QMainWindow):
     # Configurar imagem de fundo
         caminho_imagem_fundo = r"C:/Users/Clara/OneDrive/Área de Trabalho/KIVY/NA PELE E NA CONSCIÊNCIA (3).png"
         if QFile.exists(caminho_imagem_fundo):
-            self.janela_2fa.background_pixmap = QPixmap(caminho_imagem_fundo)
-            self.janela_2fa.setStyleSheet("background: transparent;")
+            self.janela_2fa.background_path = caminho_imagem_fundo
+            self.janela_2fa.setProperty("transparente", True)
         else:
             QMessageBox.warning(self.janela_2fa, "Aviso", "Imagem de fundo não encontrada.")
-            self.janela_2fa.background_pixmap = None
+            self.janela_2fa.background_path = None
     
     # Armazenar dados temporários
         self.dados_cadastro_temp = {
@@ -274,10 +236,9 @@ class MinhaJanela(QMainWindow):
         }
     
     # Gerar e enviar código
-        self.codigo_2fa = self.gerar_codigo()
-        self.codigo_valido_ate = datetime.now() + timedelta(minutes=5)
+        codigo = self.codigos.gerar(email, PURPOSE_SIGNUP)
     
-        if not self.enviar_codigo_email(email, self.codigo_2fa):
+        if not self.enviar_codigo_email(email, codigo):
             QMessageBox.critical(self.janela_2fa, "Erro", 
                            "Falha ao enviar código de verificação. Tente novamente.")
             self.janela_2fa.close()
@@ -295,66 +256,18 @@ class MinhaJanela(QMainWindow):
         self.codigo_entry = QLineEdit()
         self.codigo_entry.setMaxLength(6)
         self.codigo_entry.setAlignment(Qt.AlignCenter)
-        self.codigo_entry.setStyleSheet("""
-            QLineEdit {
-                background-color: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                                            stop:0 #F06292, 
-                                            stop:0.5 #FFD54F, 
-                                            stop:1 #8E24AA);
-                border: 1px solid white;
-                border-radius: 15px;
-                padding: 10px;
-                color: white;
-                font-size: 16px;
-                font-family: 'Arial';
-                min-width: 200px;
-                max-width: 200px;
-            }
-        """)
+        self.codigo_entry.setObjectName("CampoCodigo")
         layout.addWidget(self.codigo_entry, 0, Qt.AlignCenter)
     
     # Botão de reenviar código
         btn_reenviar = QPushButton("Reenviar código de verificação")
-        btn_reenviar.setStyleSheet("""
-            QPushButton {
-                color: white;
-                font-size: 12px;
-                font-family: 'Arial';
-                text-decoration: underline;
-                background: transparent;
-                border: none;
-            }
-            QPushButton:hover {
-                color: #FFD54F;
-            }
-        """)
+        btn_reenviar.setObjectName("LinkReenviar")
         btn_reenviar.clicked.connect(self.solicitar_novo_codigo)
         layout.addWidget(btn_reenviar, 0, Qt.AlignCenter)
     
     # Botão de verificar
         btn_verificar = QPushButton("VERIFICAR CÓDIGO")
-        btn_verificar.setStyleSheet("""
-            QPushButton {
-                background-color: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                                            stop:0 #F06292, 
-                                            stop:0.5 #FFD54F, 
-                                            stop:1 #8E24AA);
-                color: white;
-                border: none;
-                border-radius: 20px;
-                padding: 12px 25px;
-                font-size: 16px;
-                font-weight: bold;
-                font-family: 'Arial';
-                min-width: 200px;
-            }
-            QPushButton:hover {
-                background-color: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                                            stop:0 #FF80AB, 
-                                            stop:0.5 #FFEB3B, 
-                                            stop:1 #AB47BC);
-            }
-        """)
+        btn_verificar.setObjectName("BotaoCodigo")
         btn_verificar.clicked.connect(self.verificar_codigo_2fa)
         layout.addWidget(btn_verificar, 0, Qt.AlignCenter)
     
@@ -363,8 +276,10 @@ class MinhaJanela(QMainWindow):
     
         def paintEvent(event):
             painter = QPainter(self.janela_2fa)
-            if hasattr(self.janela_2fa, 'background_pixmap') and self.janela_2fa.background_pixmap and not self.janela_2fa.background_pixmap.isNull():
-                painter.drawPixmap(self.janela_2fa.rect(), self.janela_2fa.background_pixmap)
+            if self.janela_2fa.background_path:
+                painter.drawPixmap(0, 0, cache_imagens.escalado(
+                    self.janela_2fa.background_path, self.janela_2fa.size(),
+                    Qt.IgnoreAspectRatio, Qt.FastTransformation))
             painter.end()
     
         self.janela_2fa.paintEvent = paintEvent
@@ -379,39 +294,40 @@ class MinhaJanela(QMainWindow):
                               "Código inválido. Deve conter 6 dígitos.")
             return
         
-        if datetime.now() > self.codigo_valido_ate:
-            QMessageBox.warning(self.janela_2fa, "Erro", 
-                              "Código expirado. Solicite um novo.")
+        # Um clique por vez: a senha é codificada em segundo plano
+        if self.cadastro_pendente:
             return
         
-        if codigo_digitado == self.codigo_2fa:
-            try:
-                if self.db.inserir_usuario(
-                    self.dados_cadastro_temp['nome'],
-                    self.dados_cadastro_temp['apelido'],
-                    self.dados_cadastro_temp['email'],
-                    self.dados_cadastro_temp['senha']
-                ):
-                    QMessageBox.information(self.janela_2fa, "Sucesso", 
-                                          "Cadastro concluído com sucesso!")
-                    self.janela_2fa.close()
-                    # Limpar campos após cadastro bem-sucedido
-                    self._limpar_campos_cadastro()
-                else:
-                    QMessageBox.critical(self.janela_2fa, "Erro", 
-                                       "Falha ao cadastrar usuário. Email ou apelido já existente.")
-            except Exception as e:
-                QMessageBox.critical(self.janela_2fa, "Erro", 
-                                   f"Erro ao cadastrar usuário: {str(e)}")
+        resultado = self.codigos.verificar(self.dados_cadastro_temp['email'], PURPOSE_SIGNUP, codigo_digitado)
+        if resultado == CODE_VALID:
+            self.cadastro_pendente = True
+            self.credenciais.cadastrar(
+                self.dados_cadastro_temp['nome'],
+                self.dados_cadastro_temp['apelido'],
+                self.dados_cadastro_temp['email'],
+                self.dados_cadastro_temp['senha']
+            )
         else:
-            QMessageBox.warning(self.janela_2fa, "Erro", 
-                              "Código incorreto. Tente novamente.")
+            QMessageBox.warning(self.janela_2fa, "Erro", CODE_MESSAGES[resultado])
+
+    def _on_cadastro_concluido(self, email, sucesso):
+        """Resultado da inserção feita pelo CredentialService"""
+        self.cadastro_pendente = False
+        if sucesso:
+            QMessageBox.information(self.janela_2fa, "Sucesso", 
+                                  "Cadastro concluído com sucesso!")
+            self.janela_2fa.close()
+            # Limpar campos após cadastro bem-sucedido
+            self._limpar_campos_cadastro()
+        else:
+            QMessageBox.critical(self.janela_2fa, "Erro", 
+                               "Falha ao cadastrar usuário. Email ou apelido já existente.")
 
     def solicitar_novo_codigo(self):
-        self.codigo_2fa = self.gerar_codigo()
-        self.codigo_valido_ate = datetime.now() + timedelta(minutes=5)
-        
-        if self.enviar_codigo_email(self.dados_cadastro_temp['email'], self.codigo_2fa):
+        email = self.dados_cadastro_temp['email']
+        if not self.liberar_envio(email, PURPOSE_SIGNUP, self.janela_2fa):
+            return
+        if self.enviar_codigo_email(email, self.codigos.gerar(email, PURPOSE_SIGNUP)):
             QMessageBox.information(self.janela_2fa, "Sucesso", 
                                   "Novo código enviado para seu email!")
         else:
@@ -420,15 +336,14 @@ class MinhaJanela(QMainWindow):
 
     def verificar_login_2fa(self, email):
         """Verificação em duas etapas para login"""
+        if not self.liberar_envio(email, PURPOSE_LOGIN, self):
+            return False
         janela_2fa = QDialog(self)
         janela_2fa.setWindowTitle("Verificação de Segurança")
         janela_2fa.setFixedSize(400, 250)
         
         # Gerar e enviar código
-        codigo = self.gerar_codigo()
-        codigo_valido_ate = datetime.now() + timedelta(minutes=5)
-        
-        if not self.enviar_codigo_email(email, codigo):
+        if not self.enviar_codigo_email(email, self.codigos.gerar(email, PURPOSE_LOGIN)):
             QMessageBox.critical(janela_2fa, "Erro", 
                                "Falha ao enviar código de verificação. Tente novamente.")
             return False
@@ -436,7 +351,7 @@ class MinhaJanela(QMainWindow):
         layout = QVBoxLayout(janela_2fa)
         
         label_titulo = QLabel("🔒 Verificação de Segurança")
-        label_titulo.setStyleSheet("font-size: 16px; font-weight: bold;")
+        label_titulo.setObjectName("TituloVerificacao")
         layout.addWidget(label_titulo)
         
         label_info = QLabel(f"Enviamos um código de 6 dígitos para {email}.")
@@ -457,7 +372,7 @@ class MinhaJanela(QMainWindow):
         layout.addWidget(btn_novo_codigo)
         
         label_validade = QLabel("O código é válido por 5 minutos.")
-        label_validade.setStyleSheet("font-size: 10px;")
+        label_validade.setObjectName("ValidadeCodigo")
         layout.addWidget(label_validade)
         
         resultado = {'verificado': False}
@@ -470,24 +385,17 @@ class MinhaJanela(QMainWindow):
                                   "Código inválido. Deve conter 6 dígitos.")
                 return
                 
-            if datetime.now() > codigo_valido_ate:
-                QMessageBox.warning(janela_2fa, "Erro", 
-                                  "Código expirado. Solicite um novo.")
-                return
-                
-            if codigo_digitado == codigo:
+            estado = self.codigos.verificar(email, PURPOSE_LOGIN, codigo_digitado)
+            if estado == CODE_VALID:
                 resultado['verificado'] = True
                 janela_2fa.close()
             else:
-                QMessageBox.warning(janela_2fa, "Erro", 
-                                  "Código incorreto. Tente novamente.")
+                QMessageBox.warning(janela_2fa, "Erro", CODE_MESSAGES[estado])
         
         def novo_codigo():
-            nonlocal codigo, codigo_valido_ate
-            codigo = self.gerar_codigo()
-            codigo_valido_ate = datetime.now() + timedelta(minutes=5)
-            
-            if self.enviar_codigo_email(email, codigo):
+            if not self.liberar_envio(email, PURPOSE_LOGIN, janela_2fa):
+                return
+            if self.enviar_codigo_email(email, self.codigos.gerar(email, PURPOSE_LOGIN)):
                 QMessageBox.information(janela_2fa, "Sucesso", 
                                       "Novo código enviado para seu email!")
             else:
@@ -519,6 +427,7 @@ class MinhaJanela(QMainWindow):
 
     def _show_login_screen(self):
         """Mostra a tela de login"""
+        from loginapp import LoginScreen
         login_screen = LoginScreen(self)
         login_screen.exec()  # Isso agora é modal e não interfere com o menu
 
@@ -537,10 +446,26 @@ class MinhaJanela(QMainWindow):
 
     def paintEvent(self, event):
         painter = QPainter(self)
-        if self.background_pixmap and not self.background_pixmap.isNull():
-            painter.drawPixmap(self.rect(), self.background_pixmap)
+        # Decodifica na primeira pintura e escala só quando o tamanho da janela muda
+        background = None
+        if self.background_path:
+            background = cache_imagens.escalado(
+                self.background_path, self.size(), Qt.IgnoreAspectRatio, Qt.FastTransformation)
+        if background is not None and not background.isNull():
+            painter.drawPixmap(0, 0, background)
         else:
+            if background is not None:
+                # Arquivo existe mas não decodificou: avisa uma vez, fora do paintEvent
+                QTimer.singleShot(0, lambda caminho=self.background_path: self._avisar_fundo_invalido(caminho))
+                self.background_path = None
             painter.fillRect(self.rect(), self.palette().window().color())
+        painter.end()
+        timeline.registrar_primeira_pintura()
+
+    def _avisar_fundo_invalido(self, caminho):
+        QMessageBox.critical(self, "Erro de Carregamento da Imagem de Fundo",
+                           f"Não foi possível criar QPixmap a partir de: \n{caminho}\n"
+                           "O arquivo pode estar corrompido ou em um formato não suportado pelo Qt.")
 
     def _create_input_field(self, label_text, is_password=False):
         container = QWidget()
@@ -728,11 +653,24 @@ class MinhaJanela(QMainWindow):
 
     def closeEvent(self, event):
         """Fecha a conexão com o banco de dados quando a janela é fechada"""
+        self.mail_dispatcher.parar()
+        self.credenciais.parar()
+        self.codigos.close()
+        self.limites.close()
         self.db.close()
         event.accept()
 
 if __name__ == "__main__":
+    # --perfil-inicializacao imprime a linha do tempo da inicialização
+    if "--perfil-inicializacao" in sys.argv:
+        sys.argv.remove("--perfil-inicializacao")
+        timeline.ativo = True
     app = QApplication(sys.argv)
+    timeline.marcar("criar QApplication")
+    # Folha de estilo única, compilada a partir dos tokens do tema
+    aplicar_tema(app)
+    timeline.marcar("aplicar tema")
     window = MinhaJanela()
+    timeline.marcar("construir MinhaJanela")
     window.show()
     sys.exit(app.exec())
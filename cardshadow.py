@@ -0,0 +1,66 @@
+from PySide6.QtCore import Qt, QRect, QRectF
+from PySide6.QtGui import QImage, QPainter, QPixmap
+from PySide6.QtWidgets import QGraphicsBlurEffect, QGraphicsPixmapItem, QGraphicsScene
+
+from imagecache import cache_imagens
+
+
+def _desfocar(imagem, raio):
+    """Mesmo desfoque do QGraphicsDropShadowEffect, aplicado uma única vez"""
+    cena = QGraphicsScene()
+    item = QGraphicsPixmapItem(QPixmap.fromImage(imagem))
+    efeito = QGraphicsBlurEffect()
+    efeito.setBlurRadius(raio)
+    item.setGraphicsEffect(efeito)
+    cena.addItem(item)
+    resultado = QImage(imagem.size(), QImage.Format.Format_ARGB32_Premultiplied)
+    resultado.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(resultado)
+    cena.render(painter, QRectF(resultado.rect()), QRectF(imagem.rect()))
+    painter.end()
+    return resultado
+
+
+def renderizar_sombra(largura, altura, raio, desfoque, cor):
+    """Sombra desfocada de um retângulo arredondado largura x altura, com margem 'desfoque' em volta"""
+    imagem = QImage(largura + 2 * desfoque, altura + 2 * desfoque, QImage.Format.Format_ARGB32_Premultiplied)
+    imagem.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(imagem)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    painter.setPen(Qt.PenStyle.NoPen)
+    painter.setBrush(cor)
+    painter.drawRoundedRect(QRectF(desfoque, desfoque, largura, altura), raio, raio)
+    painter.end()
+    return QPixmap.fromImage(_desfocar(imagem, desfoque))
+
+
+def pintar_sombra(painter, alvo, raio, desfoque, cor):
+    """Pinta em 'alvo' (retângulo do card já com a margem) a sombra montada em nove partes.
+
+    Os cantos vêm de uma sombra pequena renderizada uma vez por raio,
+    desfoque e cor; bordas e centro são uniformes e só são esticados.
+    Cards menores que os cantos usam uma sombra renderizada no tamanho exato.
+    """
+    canto = 2 * desfoque + raio
+    if alvo.width() <= 2 * canto or alvo.height() <= 2 * canto:
+        largura, altura = alvo.width() - 2 * desfoque, alvo.height() - 2 * desfoque
+        if largura > 0 and altura > 0:
+            sombra = cache_imagens.obter(
+                ("sombra", largura, altura, raio, desfoque, cor.rgba()),
+                lambda: renderizar_sombra(largura, altura, raio, desfoque, cor))
+            painter.drawPixmap(alvo.topLeft(), sombra)
+        return
+
+    # Retângulo em que o meio das bordas já não sente a curva dos cantos
+    lado = 2 * (raio + desfoque) + 1
+    partes = cache_imagens.obter(("sombra_nove_partes", raio, desfoque, cor.rgba()),
+                                 lambda: renderizar_sombra(lado, lado, raio, desfoque, cor))
+    x, y, w, h = alvo.x(), alvo.y(), alvo.width(), alvo.height()
+    # (posição no alvo, tamanho no alvo, posição na origem, tamanho na origem)
+    colunas = ((x, canto, 0, canto), (x + canto, w - 2 * canto, canto, 1), (x + w - canto, canto, canto + 1, canto))
+    linhas = ((y, canto, 0, canto), (y + canto, h - 2 * canto, canto, 1), (y + h - canto, canto, canto + 1, canto))
+    for destino_y, altura, origem_y, altura_origem in linhas:
+        for destino_x, largura, origem_x, largura_origem in colunas:
+            painter.drawPixmap(QRect(destino_x, destino_y, largura, altura), partes,
+                               QRect(origem_x, origem_y, largura_origem, altura_origem))
+
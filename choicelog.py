@@ -0,0 +1,273 @@
+"""Registro só de acréscimo das escolhas feitas nas histórias.
+
+Uso:
+    python choicelog.py contar [--log escolhas.log]
+    python choicelog.py perfis [--log escolhas.log] [--db database.db] [--usuarios usuarios1.db]
+
+Cada escolha vira um registro binário de tamanho fixo (RECORD): usuário,
+história, modo, nó, escolha (índice na tabela de escolhas da história, o
+mesmo do storyengine e do ProfileEngine) e tempo de reação em ms. O
+arquivo começa com um cabeçalho (HEADER) e depois só recebe registros no
+fim, em lotes. As histórias são guardadas como números; o texto de cada
+id fica no registro de histórias ao lado do log (escolhas.historias, um
+id por linha, na ordem dos números).
+
+ler_eventos lê o log em blocos como arrays NumPy, então milhões de
+eventos podem ser repetidos pelo ProfileEngine sem carregar o arquivo
+inteiro. 'perfis' recalcula a tabela perfis a partir do log.
+"""
+import argparse
+import atexit
+import glob
+import os
+import struct
+import sys
+import threading
+from typing import Dict, Iterator, List, Tuple
+
+import numpy as np
+
+from storyengine import ATTRIBUTES
+from storystats import MODES
+
+MAGIC = b"NPCL"
+LOG_VERSION = 1
+# magic, versão, tamanho do registro, reservado
+HEADER = struct.Struct("<4sHH8x")
+# user_id, história, modo, (alinhamento), nó, escolha, tempo em ms
+RECORD = struct.Struct("<IHBxIII")
+# Mesmo layout de RECORD, para ler blocos inteiros com NumPy
+EVENT_DTYPE = np.dtype([
+    ("user_id", "<u4"),
+    ("story", "<u2"),
+    ("mode", "u1"),
+    ("_pad", "u1"),
+    ("node", "<u4"),
+    ("choice", "<u4"),
+    ("elapsed_ms", "<u4"),
+])
+assert EVENT_DTYPE.itemsize == RECORD.size
+
+# Código gravado no campo modo: posição em MODES + 1 (0 fica livre)
+MODE_CODES = {modo: i + 1 for i, modo in enumerate(MODES)}
+
+
+class ChoiceLogError(ValueError):
+    """Arquivo que não é um log de escolhas ou de versão desconhecida"""
+
+
+def registry_path(log_path: str) -> str:
+    """Caminho do registro de histórias que acompanha o log"""
+    return os.path.splitext(log_path)[0] + ".historias"
+
+
+class StoryRegistry:
+    """Numeração estável dos ids de história usados no log (só cresce)"""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.ids: List[str] = []
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as arquivo:
+                self.ids = [linha.rstrip("\n") for linha in arquivo if linha.strip()]
+        self._numeros: Dict[str, int] = {story_id: i for i, story_id in enumerate(self.ids)}
+
+    def numero(self, story_id: str) -> int:
+        """Número da história, registrando-a na primeira vez"""
+        numero = self._numeros.get(story_id)
+        if numero is None:
+            # Gravado antes de qualquer evento que use o número
+            with open(self.path, "a", encoding="utf-8") as arquivo:
+                arquivo.write(story_id + "\n")
+            numero = self._numeros[story_id] = len(self.ids)
+            self.ids.append(story_id)
+        return numero
+
+
+def _ler_cabecalho(arquivo, path: str) -> None:
+    dados = arquivo.read(HEADER.size)
+    if len(dados) < HEADER.size:
+        raise ChoiceLogError(f"{path}: cabeçalho incompleto")
+    magic, versao, tamanho = HEADER.unpack(dados)
+    if magic != MAGIC:
+        raise ChoiceLogError(f"{path}: não é um log de escolhas")
+    if versao != LOG_VERSION or tamanho != RECORD.size:
+        raise ChoiceLogError(f"{path}: versão {versao} não suportada")
+
+
+class ChoiceLog:
+    """Grava as escolhas em lotes no fim do log"""
+
+    def __init__(self, path: str = "escolhas.log", tamanho_lote: int = 64) -> None:
+        self.path = path
+        self.tamanho_lote = tamanho_lote
+        self.historias = StoryRegistry(registry_path(path))
+        self._buffer = bytearray()
+        self._pendentes = 0
+        self._lock = threading.Lock()
+        self._preparar()
+        # O que estiver no buffer ao fechar o programa ainda é gravado
+        atexit.register(self.descarregar)
+
+    def _preparar(self) -> None:
+        """Cria o arquivo com cabeçalho ou confere o existente"""
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            with open(self.path, "wb") as arquivo:
+                arquivo.write(HEADER.pack(MAGIC, LOG_VERSION, RECORD.size))
+            return
+        with open(self.path, "r+b") as arquivo:
+            _ler_cabecalho(arquivo, self.path)
+            # Um lote interrompido no meio deixa um registro parcial no fim
+            tamanho = os.path.getsize(self.path)
+            excesso = (tamanho - HEADER.size) % RECORD.size
+            if excesso:
+                arquivo.truncate(tamanho - excesso)
+
+    def registrar(self, user_id: int, story_id: str, node: int, choice: int, elapsed_ms: int,
+                  modo: str = "modo1") -> bool:
+        """Acrescenta um evento ao lote; o lote vai para o disco quando enche"""
+        with self._lock:
+            self._buffer += RECORD.pack(user_id, self.historias.numero(story_id), MODE_CODES[modo], node,
+                                        choice, max(0, min(int(elapsed_ms), 0xFFFFFFFF)))
+            self._pendentes += 1
+            if self._pendentes < self.tamanho_lote:
+                return True
+        return self.descarregar()
+
+    def descarregar(self) -> bool:
+        """Grava o lote pendente no fim do arquivo"""
+        with self._lock:
+            if not self._buffer:
+                return True
+            try:
+                with open(self.path, "ab") as arquivo:
+                    arquivo.write(self._buffer)
+            except OSError as e:
+                print(f"Erro ao gravar o log de escolhas: {e}")
+                return False
+            self._buffer = bytearray()
+            self._pendentes = 0
+            return True
+
+    def close(self) -> None:
+        self.descarregar()
+        atexit.unregister(self.descarregar)
+
+
+def ler_eventos(path: str, bloco: int = 1 << 18) -> Iterator[np.ndarray]:
+    """Eventos do log em blocos de até 'bloco' registros (arrays com EVENT_DTYPE)"""
+    with open(path, "rb") as arquivo:
+        _ler_cabecalho(arquivo, path)
+        while True:
+            dados = arquivo.read(bloco * RECORD.size)
+            inteiros = len(dados) - len(dados) % RECORD.size
+            if not inteiros:
+                return
+            yield np.frombuffer(dados, dtype=EVENT_DTYPE, count=inteiros // RECORD.size)
+
+
+def repetir_perfis(path: str, engine, bloco: int = 1 << 18) -> Tuple[np.ndarray, np.ndarray]:
+    """Perfis de todos os usuários somando cada escolha do log (linha = user_id).
+
+    Só um bloco de eventos fica na memória por vez. Eventos de histórias
+    que não estão no registro ou no engine, ou com escolhas além da tabela
+    da história (log antigo, história removida ou renumerada), são
+    ignorados e contados numa mensagem. Retorna a matriz de perfis e, por
+    linha, se o usuário tem alguma escolha no log.
+    """
+    historias = StoryRegistry(registry_path(path))
+    # número no registro -> índice da história no engine (-1 se ausente) e quantas escolhas ela tem
+    mapa = np.array([engine.indice_historia(story_id) if story_id in engine else -1
+                     for story_id in historias.ids] or [-1], dtype=np.intp)
+    escolhas = np.array([engine.quantidade_escolhas(story_id) if story_id in engine else 0
+                         for story_id in historias.ids] or [0], dtype=np.int64)
+    perfis = np.zeros((0, len(ATTRIBUTES)), dtype=np.int64)
+    vistos = np.zeros(0, dtype=bool)
+    ignorados = 0
+    for eventos in ler_eventos(path, bloco):
+        numeros = eventos["story"].astype(np.intp)
+        conhecidos = numeros < len(mapa)
+        numeros = np.where(conhecidos, numeros, 0)
+        indices = np.where(conhecidos, mapa[numeros], -1)
+        validos = (indices >= 0) & (eventos["choice"] < escolhas[numeros])
+        ignorados += len(validos) - int(np.count_nonzero(validos))
+        usuarios = eventos["user_id"][validos]
+        if not len(usuarios):
+            continue
+        total = max(len(perfis), int(usuarios.max()) + 1)
+        if total > len(perfis):
+            perfis = np.concatenate((perfis, np.zeros((total - len(perfis), len(ATTRIBUTES)), dtype=np.int64)))
+            vistos = np.concatenate((vistos, np.zeros(total - len(vistos), dtype=bool)))
+        perfis = engine.recalcular_todos(usuarios, indices[validos], eventos["choice"][validos], total, base=perfis)
+        vistos[usuarios] = True
+    if ignorados:
+        print(f"{ignorados} escolhas do log ignoradas: história desconhecida ou escolha fora da tabela")
+    return perfis, vistos
+
+
+def contar(args):
+    total = 0
+    por_historia: Dict[int, int] = {}
+    try:
+        for eventos in ler_eventos(args.log):
+            total += len(eventos)
+            numeros, vezes = np.unique(eventos["story"], return_counts=True)
+            for numero, n in zip(numeros.tolist(), vezes.tolist()):
+                por_historia[numero] = por_historia.get(numero, 0) + n
+    except (OSError, ChoiceLogError) as e:
+        print(e)
+        return 1
+    ids = StoryRegistry(registry_path(args.log)).ids
+    for numero, n in sorted(por_historia.items()):
+        print(f"{ids[numero] if numero < len(ids) else numero}: {n} escolhas")
+    print(f"{total} escolhas no log")
+    return 0
+
+
+def perfis(args):
+    from database import Database
+    from profileengine import ProfileEngine, salvar_matriz
+    from storybundle import open_story
+    from storyprogress import StoryProgressRepository
+
+    stories = []
+    for source_path in sorted(glob.glob(os.path.join(args.historias, "*.json"))):
+        try:
+            stories.append(open_story(source_path))
+        except (OSError, ValueError) as e:
+            print(f"{source_path}: {e}")
+    try:
+        matriz, vistos = repetir_perfis(args.log, ProfileEngine(stories))
+    except (OSError, ChoiceLogError) as e:
+        print(e)
+        return 1
+    presentes = np.flatnonzero(vistos)
+    repositorio = StoryProgressRepository(Database(args.usuarios), args.db, log_escolhas=args.log)
+    try:
+        ok = salvar_matriz(repositorio, presentes.tolist(), matriz[presentes])
+    finally:
+        repositorio.close()
+    print(f"{len(presentes)} perfis recalculados a partir de {args.log}")
+    return 0 if ok else 1
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Log binário das escolhas feitas nas histórias")
+    parser.add_argument('--log', default='escolhas.log', help="arquivo do log (padrão: escolhas.log)")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p_contar = sub.add_parser('contar', help="conta as escolhas do log por história")
+    p_contar.set_defaults(func=contar)
+
+    p_perfis = sub.add_parser('perfis', help="recalcula a tabela perfis repetindo o log")
+    p_perfis.add_argument('--db', default='database.db', help="banco do progresso (padrão: database.db)")
+    p_perfis.add_argument('--usuarios', default='usuarios1.db', help="banco de usuários (padrão: usuarios1.db)")
+    p_perfis.add_argument('--historias', default='stories', help="pasta das histórias (padrão: stories)")
+    p_perfis.set_defaults(func=perfis)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
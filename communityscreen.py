@@ -0,0 +1,176 @@
+import threading
+
+from PySide6.QtWidgets import QMainWindow, QVBoxLayout, QHBoxLayout, QLabel
+from PySide6.QtCore import Qt, QTimer, Signal
+
+from mundoconsciencias import BackgroundWidget, GlassCard, ModernButton, STORY_CATALOG
+from profileengine import ProfileEngine
+from similarityindex import indice_dos_perfis
+from storyengine import ATTRIBUTES
+
+# Nomes dos atributos exibidos na comunidade, na ordem de ATTRIBUTES
+ATTRIBUTE_LABELS = {
+    "Justice": "Justiça",
+    "Reputation": "Reputação",
+    "Empathy": "Empatia",
+    "Stress": "Estresse",
+}
+
+# Quantos perfis aparecem em cada lista
+COMMUNITY_LIST_SIZE = 5
+
+
+class CommunityScreen(QMainWindow):
+    """Aba Comunidade: os perfis éticos mais parecidos e mais diferentes do jogador"""
+    go_back_to_menu = Signal()
+    # Emitido da thread que monta o índice; entregue na thread da interface
+    indice_pronto = Signal(object)
+
+    def __init__(self, repositorio, sessao, parent=None):
+        super().__init__(parent)
+        self.repositorio = repositorio
+        # O id já vem da sessão do login, sem consultar a tabela usuarios
+        self.sessao = sessao
+        self.user_apelido = sessao.apelido
+        self.user_id = sessao.id
+        # Índice montado numa thread (carrega todos os perfis e roda o k-means);
+        # depois acompanha cada salvar_perfis sozinho
+        self.indice = None
+        self.indice_pronto.connect(self._on_indice_pronto)
+        threading.Thread(target=lambda: self.indice_pronto.emit(indice_dos_perfis(repositorio)),
+                         name="indice-perfis", daemon=True).start()
+        self._refresh_scheduled = False
+        repositorio.adicionar_ouvinte_perfil(self._on_perfil_salvo)
+
+        self.setWindowTitle("Na Pele e na Consciência - Comunidade")
+        self.setMinimumSize(1200, 800)
+
+        self.background_widget = BackgroundWidget("assets/world_bg.jpg")
+        self.setCentralWidget(self.background_widget)
+
+        main_layout = QVBoxLayout(self.background_widget)
+        main_layout.setContentsMargins(60, 30, 60, 30)
+        main_layout.setSpacing(30)
+
+        top_bar = GlassCard()
+        top_bar.setFixedHeight(100)
+        top_bar_layout = QHBoxLayout(top_bar)
+        top_bar_layout.setContentsMargins(30, 10, 30, 10)
+        back_btn = ModernButton("Voltar ao Menu Principal", "ardosia")
+        back_btn.clicked.connect(self.go_back_to_menu.emit)
+        top_bar_layout.addWidget(back_btn)
+        title_label = QLabel("COMUNIDADE")
+        title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        title_label.setStyleSheet("""
+            QLabel {
+                color: #FFD700;
+                font-size: 32px;
+                font-weight: bold;
+                letter-spacing: 3px;
+            }
+        """)
+        top_bar_layout.addWidget(title_label, 1)
+        main_layout.addWidget(top_bar)
+
+        self.profile_label = QLabel()
+        self.profile_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.profile_label.setStyleSheet("color: white; font-size: 18px; background: transparent;")
+        main_layout.addWidget(self.profile_label)
+
+        lists_layout = QHBoxLayout()
+        lists_layout.setSpacing(40)
+        self.similar_labels = self.create_profile_list(lists_layout, "MAIS PARECIDOS COM VOCÊ")
+        self.different_labels = self.create_profile_list(lists_layout, "MAIS DIFERENTES DE VOCÊ")
+        main_layout.addLayout(lists_layout, 1)
+
+        # Totais das histórias, lidos das estatísticas já agregadas
+        self.stats_label = QLabel()
+        self.stats_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.stats_label.setStyleSheet("color: white; font-size: 16px; background: transparent;")
+        main_layout.addWidget(self.stats_label)
+
+        self.refresh_lists()
+
+    def create_profile_list(self, layout, title):
+        """Card com o título e uma linha por perfil"""
+        card = GlassCard()
+        card_layout = QVBoxLayout(card)
+        card_layout.setContentsMargins(40, 30, 40, 30)
+        card_layout.setSpacing(15)
+
+        title_label = QLabel(title)
+        title_label.setStyleSheet("""
+            QLabel {
+                color: #FFD700;
+                font-size: 22px;
+                font-weight: bold;
+                letter-spacing: 2px;
+                background: transparent;
+                border: none;
+            }
+        """)
+        card_layout.addWidget(title_label)
+
+        labels = []
+        for _ in range(COMMUNITY_LIST_SIZE):
+            label = QLabel()
+            label.setWordWrap(True)
+            label.setStyleSheet("color: white; font-size: 16px; background: transparent; border: none;")
+            card_layout.addWidget(label)
+            labels.append(label)
+        card_layout.addStretch()
+        layout.addWidget(card, 1)
+        return labels
+
+    def describe_profile(self, vetor):
+        return " · ".join(f"{ATTRIBUTE_LABELS[atributo]} {int(valor)}" for atributo, valor in zip(ATTRIBUTES, vetor))
+
+    def _on_perfil_salvo(self, user_id, atributos):
+        """Várias gravações seguidas viram uma única atualização das listas"""
+        if not self._refresh_scheduled:
+            self._refresh_scheduled = True
+            QTimer.singleShot(0, self.refresh_lists)
+
+    def _on_indice_pronto(self, indice):
+        self.indice = indice
+        self.refresh_lists()
+
+    def refresh_lists(self):
+        """Consulta o índice (sem percorrer todos os usuários) e preenche as duas listas"""
+        self._refresh_scheduled = False
+        if self.indice is not None and self.user_id in self.indice:
+            vetor = self.indice.vetor(self.user_id)
+        else:
+            vetor = ProfileEngine.vetor(self.repositorio.get_user_profile(self.user_apelido))
+        self.profile_label.setText(f"Seu perfil: {self.describe_profile(vetor)}")
+        if self.indice is None:
+            # Índice ainda sendo montado: _on_indice_pronto preenche as listas
+            for labels in (self.similar_labels, self.different_labels):
+                for i, label in enumerate(labels):
+                    label.setText("" if i else "Carregando perfis da comunidade...")
+            self.refresh_story_stats()
+            return
+
+        parecidos = self.indice.mais_proximos(vetor, COMMUNITY_LIST_SIZE, excluir=self.user_id)
+        diferentes = self.indice.mais_distantes(vetor, COMMUNITY_LIST_SIZE, excluir=self.user_id)
+        apelidos = self.repositorio.usuarios.obter_apelidos(
+            {user_id for user_id, _ in parecidos + diferentes})
+        for labels, perfis in ((self.similar_labels, parecidos), (self.different_labels, diferentes)):
+            for i, label in enumerate(labels):
+                if i >= len(perfis):
+                    label.setText("—" if i else "Ainda não há outros perfis na comunidade.")
+                    continue
+                user_id, _ = perfis[i]
+                label.setText(f"<b>{apelidos.get(user_id, '?')}</b><br>"
+                              f"{self.describe_profile(self.indice.vetor(user_id))}")
+        self.refresh_story_stats()
+
+    def refresh_story_stats(self):
+        """Jogadores e taxa de conclusão de cada história (consultas pela chave das estatísticas)"""
+        linhas = []
+        for story_id, title in STORY_CATALOG:
+            resumo = self.repositorio.agregados.resumo(story_id)
+            if resumo["jogadores"]:
+                linhas.append(f"{title}: {resumo['jogadores']} jogador(es), "
+                              f"{resumo['taxa_conclusao']:.0%} concluíram")
+        self.stats_label.setText("<br>".join(linhas))
@@ -0,0 +1,69 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from PySide6.QtCore import QObject, Signal
+
+from passwordhash import PasswordHasher
+from session import UserSession
+
+
+class CredentialService(QObject):
+    """Gera e confere senhas num pool de threads, fora da thread da interface.
+
+    A derivação da senha (scrypt/PBKDF2) leva dezenas de milissegundos de
+    propósito. Cada operação roda no pool e termina emitindo um sinal, que
+    o Qt entrega na thread da interface, como no MailDispatcher.
+    """
+    # email, UserSession (None se a senha não confere)
+    login_verificado = Signal(str, object)
+    # email, usuário inserido
+    cadastro_concluido = Signal(str, bool)
+    # email, senha atualizada
+    senha_redefinida = Signal(str, bool)
+
+    def __init__(self, db, hasher: Optional[PasswordHasher] = None, trabalhadores: Optional[int] = None,
+                 parent=None) -> None:
+        super().__init__(parent)
+        self.db = db
+        self.hasher = hasher or PasswordHasher()
+        self._executor = ThreadPoolExecutor(max_workers=trabalhadores or min(4, os.cpu_count() or 1),
+                                            thread_name_prefix="CredentialService")
+
+    def autenticar(self, email: str, senha: str) -> None:
+        """Confere a senha e monta a sessão; o resultado chega por login_verificado"""
+        self._executor.submit(self._tarefa, self.login_verificado, email, None, self._autenticar, email, senha)
+
+    def cadastrar(self, nome: str, apelido: str, email: str, senha: str) -> None:
+        """Insere o usuário com a senha codificada; o resultado chega por cadastro_concluido"""
+        self._executor.submit(self._tarefa, self.cadastro_concluido, email, False,
+                              lambda: self.db.inserir_usuario(nome, apelido, email, self.hasher.gerar(senha)))
+
+    def redefinir(self, email: str, nova_senha: str) -> None:
+        """Grava a nova senha codificada; o resultado chega por senha_redefinida"""
+        self._executor.submit(self._tarefa, self.senha_redefinida, email, False,
+                              lambda: self.db.atualizar_senha(email, self.hasher.gerar(nova_senha)))
+
+    @staticmethod
+    def _tarefa(sinal, email: str, falha, funcao, *args) -> None:
+        try:
+            resultado = funcao(*args)
+        except Exception as e:
+            print(f"Erro ao processar credenciais de {email}: {e}")
+            resultado = falha
+        sinal.emit(email, resultado)
+
+    def _autenticar(self, email: str, senha: str) -> Optional[UserSession]:
+        # Uma consulta traz a senha gravada e tudo o que a sessão precisa
+        conta = self.db.obter_conta(email)
+        if conta is None or not self.hasher.verificar(senha, conta['senha']):
+            return None
+        if self.hasher.precisa_atualizar(conta['senha']):
+            # Senha certa em texto puro ou com custo antigo: regrava com os
+            # parâmetros atuais, só se ninguém a trocou enquanto conferíamos
+            self.db.substituir_senha(email, conta['senha'], self.hasher.gerar(senha))
+        return UserSession.da_conta(conta)
+
+    def parar(self) -> None:
+        """Espera as operações em andamento e encerra o pool"""
+        self._executor.shutdown(wait=True)
@@ -1,33 +1,91 @@
 import sqlite3
-from typing import Optional, Tuple, Dict, Any
+import threading
+from typing import Optional, Tuple, Dict, Any, List, Iterable, Iterator
+
+from passwordhash import PasswordHasher
+
+
+class ConnectionPool:
+    """Entrega uma conexão SQLite por thread, em modo WAL, com cache de statements"""
+
+    def __init__(self, db_name: str, cached_statements: int = 128, timeout: float = 5.0) -> None:
+        self.db_name = db_name
+        self.cached_statements = cached_statements
+        self.timeout = timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: List[sqlite3.Connection] = []
+
+    def _open(self) -> sqlite3.Connection:
+        """Abre uma conexão nova já configurada para acesso concorrente"""
+        # check_same_thread=False apenas para permitir que close_all feche
+        # conexões de outras threads; cada conexão continua sendo usada
+        # somente pela thread que a criou.
+        conn = sqlite3.connect(
+            self.db_name,
+            timeout=self.timeout,
+            cached_statements=self.cached_statements,
+            check_same_thread=False,
+        )
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.timeout * 1000)}")
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        """Retorna a conexão da thread atual, criando-a na primeira chamada"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self._open()
+            self._local.conn = conn
+        return conn
+
+    def close_all(self) -> None:
+        """Fecha as conexões de todas as threads"""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                print(f"Erro ao fechar conexão: {e}")
+        # Conexões fechadas não podem ser reaproveitadas por nenhuma thread
+        self._local = threading.local()
+
 
 class Database:
     def __init__(self, db_name: str = "usuarios1.db") -> None:
         self.db_name = db_name
-        self.conn = None
-        self.cursor = None
+        self.pool = None
         self._connect()
 
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Conexão da thread atual"""
+        self._ensure_connection()
+        return self.pool.connection()
+
     def _connect(self) -> None:
-        """Estabelece uma nova conexão com o banco de dados"""
+        """Cria o pool de conexões com o banco de dados"""
         try:
-            self.conn = sqlite3.connect(self.db_name)
-            self.cursor = self.conn.cursor()
+            self.pool = ConnectionPool(self.db_name)
             self.create_table()
         except sqlite3.Error as e:
             print(f"Erro ao conectar ao banco de dados: {e}")
             raise
 
     def _ensure_connection(self) -> None:
-        """Garante que a conexão esteja ativa"""
-        if self.conn is None:
+        """Garante que o pool de conexões esteja ativo"""
+        if self.pool is None:
             self._connect()
 
     def create_table(self) -> None:
         """Cria a tabela de usuários se não existir"""
         try:
-            self._ensure_connection()
-            self.cursor.execute('''
+            conn = self.conn
+            conn.execute('''
                 CREATE TABLE IF NOT EXISTS usuarios (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     nome TEXT NOT NULL,
@@ -36,7 +94,7 @@ class Database:
                     senha TEXT NOT NULL
                 )
             ''')
-            self.conn.commit()
+            conn.commit()
         except sqlite3.Error as e:
             print(f"Erro ao criar tabela: {e}")
             raise
@@ -44,20 +102,53 @@ class Database:
     def obter_apelido(self, email: str) -> Optional[str]:
         """Obtém o apelido do usuário pelo email"""
         try:
-            self._ensure_connection()
-            self.cursor.execute("SELECT apelido FROM usuarios WHERE email = ?", (email,))
-            resultado = self.cursor.fetchone()
+            resultado = self.conn.execute("SELECT apelido FROM usuarios WHERE email = ?", (email,)).fetchone()
             return resultado[0] if resultado else None
         except sqlite3.Error as e:
             print(f"Erro ao obter apelido: {e}")
             return None
 
+    def obter_usuario(self, apelido: str) -> Optional[Dict[str, Any]]:
+        """Obtém id, nome, apelido e email do usuário pelo apelido"""
+        try:
+            resultado = self.conn.execute(
+                "SELECT id, nome, apelido, email FROM usuarios WHERE apelido = ?", (apelido,)
+            ).fetchone()
+            if not resultado:
+                return None
+            return dict(zip(('id', 'nome', 'apelido', 'email'), resultado))
+        except sqlite3.Error as e:
+            print(f"Erro ao obter usuário: {e}")
+            return None
+
+    def obter_conta(self, email: str) -> Optional[Dict[str, Any]]:
+        """Registro completo do usuário pelo email (id, nome, apelido, email e senha gravada), em uma consulta"""
+        try:
+            resultado = self.conn.execute(
+                "SELECT id, nome, apelido, email, senha FROM usuarios WHERE email = ?", (email,)
+            ).fetchone()
+            return dict(zip(('id', 'nome', 'apelido', 'email', 'senha'), resultado)) if resultado else None
+        except sqlite3.Error as e:
+            print(f"Erro ao obter conta: {e}")
+            return None
+
+    def obter_apelidos(self, ids: Iterable[int]) -> Dict[int, str]:
+        """Apelidos de vários usuários pelo id, em uma consulta"""
+        ids = list(ids)
+        if not ids:
+            return {}
+        try:
+            return dict(self.conn.execute(
+                f"SELECT id, apelido FROM usuarios WHERE id IN ({', '.join('?' * len(ids))})", ids
+            ).fetchall())
+        except sqlite3.Error as e:
+            print(f"Erro ao obter apelidos: {e}")
+            return {}
+
     def verificar_email_existente(self, email: str) -> bool:
         """Verifica se um email já está cadastrado"""
         try:
-            self._ensure_connection()
-            self.cursor.execute('SELECT 1 FROM usuarios WHERE email = ?', (email,))
-            return self.cursor.fetchone() is not None
+            return self.conn.execute('SELECT 1 FROM usuarios WHERE email = ?', (email,)).fetchone() is not None
         except sqlite3.Error as e:
             print(f"Erro ao verificar email: {e}")
             return False
@@ -65,22 +156,19 @@ class Database:
     def verificar_apelido_existente(self, apelido: str) -> bool:
         """Verifica se um apelido já está cadastrado"""
         try:
-            self._ensure_connection()
-            self.cursor.execute('SELECT 1 FROM usuarios WHERE apelido = ?', (apelido,))
-            return self.cursor.fetchone() is not None
+            return self.conn.execute('SELECT 1 FROM usuarios WHERE apelido = ?', (apelido,)).fetchone() is not None
         except sqlite3.Error as e:
             print(f"Erro ao verificar apelido: {e}")
             return False
 
     def inserir_usuario(self, nome: str, apelido: str, email: str, senha: str) -> bool:
-        """Insere um novo usuário no banco de dados"""
+        """Insere um novo usuário (senha já codificada com PasswordHasher.gerar)"""
         try:
-            self._ensure_connection()
-            self.cursor.execute('''
-                INSERT INTO usuarios (nome, apelido, email, senha)
-                VALUES (?, ?, ?, ?)
-            ''', (nome, apelido, email, senha))
-            self.conn.commit()
+            with self.conn as conn:
+                conn.execute('''
+                    INSERT INTO usuarios (nome, apelido, email, senha)
+                    VALUES (?, ?, ?, ?)
+                ''', (nome, apelido, email, senha))
             return True
         except sqlite3.IntegrityError as e:
             print(f"Erro de integridade ao inserir usuário: {e}")
@@ -89,48 +177,152 @@ class Database:
             print(f"Erro ao inserir usuário: {e}")
             return False
 
-    def verificar_credenciais(self, email: str, senha: str) -> bool:
-        """Verifica se as credenciais de login são válidas"""
+    def importar_usuarios(self, registros: Iterable[Dict[str, str]], tamanho_lote: int = 5000,
+                          hasher: Optional[PasswordHasher] = None) -> Dict[str, Any]:
+        """Importa usuários em lotes, registrando conflitos sem abortar a importação.
+
+        Cada lote roda em uma única transação com executemany. Linhas com
+        campos vazios ou com apelido/email já existentes (no banco ou no
+        próprio arquivo) entram em 'conflitos' como (linha, campo, valor).
+        Senhas em texto puro são codificadas em paralelo antes da transação,
+        com os custos atuais, a menos que outro hasher seja passado; as que
+        já vêm codificadas (de uma exportação) são mantidas.
+        """
+        resultado = {'inseridos': 0, 'conflitos': []}
+        hasher = hasher or PasswordHasher()
+        lote = []
+        for linha, registro in enumerate(registros, start=1):
+            lote.append((linha, registro))
+            if len(lote) >= tamanho_lote:
+                self._importar_lote(lote, resultado, hasher)
+                lote = []
+        if lote:
+            self._importar_lote(lote, resultado, hasher)
+        return resultado
+
+    def _importar_lote(self, lote: List[Tuple[int, Dict[str, str]]], resultado: Dict[str, Any],
+                       hasher: PasswordHasher) -> None:
+        """Insere um lote de usuários, descartando apenas as linhas em conflito"""
+        campos = ('nome', 'apelido', 'email', 'senha')
+        conflitos = resultado['conflitos']
+        candidatos = []
+        apelidos_lote, emails_lote = set(), set()
+        for linha, registro in lote:
+            valores = tuple((registro.get(campo) or '').strip() for campo in campos)
+            nome, apelido, email, senha = valores
+            vazio = next((campo for campo, valor in zip(campos, valores) if not valor), None)
+            if vazio:
+                conflitos.append((linha, vazio, ''))
+            elif email in emails_lote:
+                conflitos.append((linha, 'email', email))
+            elif apelido in apelidos_lote:
+                conflitos.append((linha, 'apelido', apelido))
+            else:
+                emails_lote.add(email)
+                apelidos_lote.add(apelido)
+                candidatos.append((linha, valores))
+
+        # Fora da transação: a derivação é lenta e seguraria a escrita no banco
+        senhas = hasher.codificar_varias(valores[3] for _, valores in candidatos)
+        candidatos = [(linha, (nome, apelido, email, senha))
+                      for (linha, (nome, apelido, email, _)), senha in zip(candidatos, senhas)]
+
+        conn = self.conn
         try:
-            self._ensure_connection()
-            self.cursor.execute('SELECT 1 FROM usuarios WHERE email = ? AND senha = ?', (email, senha))
-            return self.cursor.fetchone() is not None
+            # BEGIN IMMEDIATE segura a escrita até o commit, então ninguém
+            # insere o mesmo apelido/email entre a checagem e o executemany
+            conn.execute("BEGIN IMMEDIATE")
+            emails_existentes = self._valores_existentes(conn, 'email', emails_lote)
+            apelidos_existentes = self._valores_existentes(conn, 'apelido', apelidos_lote)
+            linhas_validas = []
+            for linha, (nome, apelido, email, senha) in candidatos:
+                if email in emails_existentes:
+                    conflitos.append((linha, 'email', email))
+                elif apelido in apelidos_existentes:
+                    conflitos.append((linha, 'apelido', apelido))
+                else:
+                    linhas_validas.append((nome, apelido, email, senha))
+            conn.executemany('''
+                INSERT INTO usuarios (nome, apelido, email, senha)
+                VALUES (?, ?, ?, ?)
+            ''', linhas_validas)
+            conn.commit()
+            resultado['inseridos'] += len(linhas_validas)
         except sqlite3.Error as e:
-            print(f"Erro ao verificar credenciais: {e}")
-            return False
+            conn.rollback()
+            print(f"Erro ao importar lote de usuários: {e}")
+            conflitos.extend((linha, 'erro', str(e)) for linha, _ in candidatos)
+
+    @staticmethod
+    def _valores_existentes(conn: sqlite3.Connection, coluna: str, valores: Iterable[str]) -> set:
+        """Retorna quais valores de uma coluna única já estão cadastrados"""
+        valores = list(valores)
+        existentes = set()
+        # Respeita o limite de parâmetros por consulta de versões antigas do SQLite
+        for inicio in range(0, len(valores), 900):
+            parte = valores[inicio:inicio + 900]
+            marcadores = ', '.join('?' * len(parte))
+            existentes.update(row[0] for row in conn.execute(
+                f'SELECT {coluna} FROM usuarios WHERE {coluna} IN ({marcadores})', parte))
+        return existentes
+
+    def exportar_usuarios(self, tamanho_lote: int = 1000) -> Iterator[Tuple[str, str, str, str]]:
+        """Percorre os usuários em lotes, sem carregar a tabela inteira na memória"""
+        try:
+            cursor = self.conn.execute('SELECT nome, apelido, email, senha FROM usuarios ORDER BY id')
+            while True:
+                linhas = cursor.fetchmany(tamanho_lote)
+                if not linhas:
+                    break
+                yield from linhas
+        except sqlite3.Error as e:
+            print(f"Erro ao exportar usuários: {e}")
+
+    def verificar_credenciais(self, email: str, senha: str) -> bool:
+        """Verifica se as credenciais de login são válidas.
+
+        Bloqueia durante a derivação da senha; na interface use o
+        CredentialService, que confere fora da thread principal.
+        """
+        return PasswordHasher.verificar(senha, self.obter_senha_atual(email))
 
     def obter_senha_atual(self, email: str) -> Optional[str]:
-        """Obtém a senha atual de um usuário"""
+        """Obtém a senha gravada (codificada ou, em contas antigas, em texto puro)"""
         try:
-            self._ensure_connection()
-            self.cursor.execute('SELECT senha FROM usuarios WHERE email = ?', (email,))
-            result = self.cursor.fetchone()
+            result = self.conn.execute('SELECT senha FROM usuarios WHERE email = ?', (email,)).fetchone()
             return result[0] if result else None
         except sqlite3.Error as e:
             print(f"Erro ao obter senha: {e}")
             return None
 
     def atualizar_senha(self, email: str, nova_senha: str) -> bool:
-        """Atualiza a senha de um usuário"""
+        """Atualiza a senha de um usuário (já codificada com PasswordHasher.gerar)"""
         try:
-            self._ensure_connection()
-            self.cursor.execute('UPDATE usuarios SET senha = ? WHERE email = ?', (nova_senha, email))
-            self.conn.commit()
+            with self.conn as conn:
+                conn.execute('UPDATE usuarios SET senha = ? WHERE email = ?', (nova_senha, email))
             return True
         except sqlite3.Error as e:
             print(f"Erro ao atualizar senha: {e}")
             return False
 
-    def close(self) -> None:
-        """Fecha a conexão com o banco de dados"""
+    def substituir_senha(self, email: str, senha_atual: str, nova_senha: str) -> bool:
+        """Troca a senha gravada só se ela ainda for senha_atual (regravação após o login)"""
         try:
-            if self.conn:
-                self.conn.close()
+            with self.conn as conn:
+                cursor = conn.execute('UPDATE usuarios SET senha = ? WHERE email = ? AND senha = ?',
+                                      (nova_senha, email, senha_atual))
+            return cursor.rowcount == 1
         except sqlite3.Error as e:
-            print(f"Erro ao fechar conexão: {e}")
+            print(f"Erro ao substituir senha: {e}")
+            return False
+
+    def close(self) -> None:
+        """Fecha todas as conexões do pool"""
+        try:
+            if self.pool:
+                self.pool.close_all()
         finally:
-            self.conn = None
-            self.cursor = None
+            self.pool = None
 
     def __enter__(self):
         self._ensure_connection()
@@ -142,5 +334,3 @@ class Database:
     def __del__(self):
         """Destrutor que garante o fechamento da conexão"""
         self.close()
-
-        
\ No newline at end of file
@@ -0,0 +1,137 @@
+import time
+
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtGui import QFont, QFontMetrics
+from PySide6.QtWidgets import QLabel
+
+from theme import definir_estado
+
+# Tempo para cada decisão no Modo 2 (Pressão Decisória)
+DECISION_SECONDS = 15
+
+
+def agora_ms():
+    """Relógio monotônico compartilhado, em milissegundos (não volta se o relógio do sistema mudar)"""
+    return time.monotonic_ns() // 1_000_000
+
+
+class _Contagem:
+    __slots__ = ("inicio", "prazo", "ao_tick", "ao_esgotar", "exibido")
+
+    def __init__(self, inicio, prazo, ao_tick, ao_esgotar):
+        self.inicio = inicio
+        self.prazo = prazo
+        self.ao_tick = ao_tick
+        self.ao_esgotar = ao_esgotar
+        self.exibido = None
+
+
+class DecisionTimer:
+    """Contagens regressivas de decisão servidas por um único QTimer.
+
+    Todas as contagens usam o mesmo relógio (agora_ms). Em vez de disparar
+    em intervalo fixo, o QTimer é reagendado para o próximo instante em que
+    o segundo exibido de alguma contagem muda ou em que ela se esgota: uma
+    ativação por segundo visível, não importa quantas telas estejam contando.
+    """
+
+    def __init__(self):
+        self._contagens = {}
+        self._timer = None
+        self.ativacoes = 0
+
+    def _qtimer(self):
+        # Criado no primeiro uso, quando a QApplication já existe
+        if self._timer is None:
+            self._timer = QTimer()
+            self._timer.setSingleShot(True)
+            self._timer.setTimerType(Qt.TimerType.PreciseTimer)
+            self._timer.timeout.connect(self._disparar)
+        return self._timer
+
+    def iniciar(self, chave, duracao_ms, ao_tick=None, ao_esgotar=None):
+        """Começa (ou recomeça) a contagem da chave.
+
+        ao_tick(segundos_restantes) é chamado já no início e depois só quando
+        o segundo exibido muda; ao_esgotar() quando o prazo acaba.
+        """
+        agora = agora_ms()
+        contagem = self._contagens[chave] = _Contagem(agora, agora + duracao_ms, ao_tick, ao_esgotar)
+        self._notificar(contagem, agora)
+        self._reagendar(agora)
+
+    def parar(self, chave):
+        """Encerra a contagem e devolve o tempo decorrido em ms (None se não havia contagem)"""
+        contagem = self._contagens.pop(chave, None)
+        if contagem is None:
+            return None
+        agora = agora_ms()
+        self._reagendar(agora)
+        return agora - contagem.inicio
+
+    def restante_ms(self, chave):
+        contagem = self._contagens.get(chave)
+        return None if contagem is None else max(0, contagem.prazo - agora_ms())
+
+    @staticmethod
+    def _notificar(contagem, agora):
+        # Segundos exibidos arredondados para cima: 14.2 s restantes mostram 15
+        segundos = max(0, -(-(contagem.prazo - agora) // 1000))
+        if segundos != contagem.exibido:
+            contagem.exibido = segundos
+            if contagem.ao_tick is not None:
+                contagem.ao_tick(segundos)
+
+    def _disparar(self):
+        self.ativacoes += 1
+        agora = agora_ms()
+        esgotadas = []
+        for chave, contagem in list(self._contagens.items()):
+            if agora >= contagem.prazo:
+                del self._contagens[chave]
+                esgotadas.append(contagem)
+            else:
+                self._notificar(contagem, agora)
+        # Os callbacks podem recomeçar contagens; o reagendamento vem depois deles
+        for contagem in esgotadas:
+            self._notificar(contagem, contagem.prazo)
+            if contagem.ao_esgotar is not None:
+                contagem.ao_esgotar()
+        self._reagendar(agora_ms())
+
+    def _reagendar(self, agora):
+        timer = self._qtimer()
+        if not self._contagens:
+            timer.stop()
+            return
+        # Próxima fronteira de segundo (ou o próprio prazo, no último segundo)
+        proximo = min((contagem.prazo - agora) % 1000 or 1000 for contagem in self._contagens.values())
+        timer.start(max(1, proximo))
+
+
+class CountdownLabel(QLabel):
+    """Mostrador da contagem com tamanho fixo: trocar o número só repinta o próprio rótulo"""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        # Aparência na folha do tema (QLabel#ContagemDecisao); "urgente" nos últimos segundos
+        self.setObjectName("ContagemDecisao")
+        self.setProperty("urgente", False)
+        # Largura do maior texto possível na fonte do estilo, para o layout
+        # nunca precisar ser recalculado
+        fonte = QFont(self.font())
+        fonte.setPixelSize(28)
+        fonte.setBold(True)
+        self.setFixedSize(QFontMetrics(fonte).horizontalAdvance("00 s") + 40, 56)
+
+    def mostrar(self, segundos):
+        texto = f"{segundos:02d} s"
+        if texto != self.text():
+            # Só repole quando o estado muda, não a cada segundo
+            definir_estado(self, "urgente", segundos <= 5)
+            self.setText(texto)
+
+
+# Instância única usada por todas as telas
+temporizador_decisoes = DecisionTimer()
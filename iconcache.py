@@ -0,0 +1,81 @@
+import os
+import zlib
+
+from PySide6.QtCore import Qt, QRectF
+from PySide6.QtGui import QBrush, QImage, QPainter, QPixmap
+
+from imagecache import cache_imagens
+
+# Miniaturas já recortadas, reaproveitadas entre execuções
+ICON_CACHE_DIR = os.path.join(".cache", "icones")
+
+
+def renderizar_circular(caminho, lado):
+    """Ícone escalado para caber em lado x lado, recortado em elipse com borda suavizada"""
+    imagem = QImage(caminho)
+    if imagem.isNull():
+        return QPixmap()
+    # Escala antes de recortar: a elipse é pintada só no tamanho final
+    escalada = imagem.scaled(lado, lado, Qt.AspectRatioMode.KeepAspectRatio,
+                             Qt.TransformationMode.SmoothTransformation)
+    resultado = QImage(escalada.size(), QImage.Format.Format_ARGB32_Premultiplied)
+    resultado.fill(Qt.GlobalColor.transparent)
+    painter = QPainter(resultado)
+    painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+    painter.setPen(Qt.PenStyle.NoPen)
+    painter.setBrush(QBrush(escalada))
+    painter.drawEllipse(QRectF(resultado.rect()))
+    painter.end()
+    return QPixmap.fromImage(resultado)
+
+
+class IconCache:
+    """Ícones circulares das histórias, na memória (cache_imagens) e em disco"""
+
+    def __init__(self, pasta=ICON_CACHE_DIR, memoria=cache_imagens):
+        self.pasta = pasta
+        self.memoria = memoria
+        self.do_disco = 0
+        self.renderizados = 0
+
+    def _arquivo(self, caminho, lado, info):
+        # Tamanho e data do original entram no nome: trocar o ícone gera outra miniatura
+        assinatura = zlib.crc32(f"{os.path.abspath(caminho)}|{info.st_size}|{info.st_mtime_ns}".encode())
+        nome = os.path.splitext(os.path.basename(caminho))[0]
+        return os.path.join(self.pasta, f"{nome}_{lado}_{assinatura:08x}.png")
+
+    def circular(self, caminho, lado):
+        """Ícone circular de lado x lado (pixmap nulo se o original não existir)"""
+        return self.memoria.obter(("circular", caminho, lado), lambda: self._carregar(caminho, lado))
+
+    def _carregar(self, caminho, lado):
+        try:
+            info = os.stat(caminho)
+        except OSError:
+            return QPixmap()
+        arquivo = self._arquivo(caminho, lado, info)
+        pixmap = QPixmap(arquivo)
+        if not pixmap.isNull():
+            self.do_disco += 1
+            return pixmap
+
+        self.renderizados += 1
+        pixmap = renderizar_circular(caminho, lado)
+        if not pixmap.isNull():
+            self._gravar(pixmap, arquivo)
+        return pixmap
+
+    @staticmethod
+    def _gravar(pixmap, arquivo):
+        # Grava num temporário e renomeia: outra instância nunca lê meio arquivo
+        temporario = arquivo + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(arquivo), exist_ok=True)
+            if pixmap.save(temporario, "PNG"):
+                os.replace(temporario, arquivo)
+        except OSError as e:
+            print(f"Erro ao gravar o ícone em cache: {e}")
+
+
+# Instância única usada por todas as telas
+cache_icones = IconCache()
@@ -0,0 +1,76 @@
+from collections import OrderedDict
+
+from PySide6.QtCore import Qt, QSize
+from PySide6.QtGui import QPixmap
+
+
+class PixmapCache:
+    """Cache LRU de pixmaps compartilhado pelas telas, limitado por memória"""
+
+    def __init__(self, limite_bytes=192 * 1024 * 1024):
+        self.limite_bytes = limite_bytes
+        self._itens = OrderedDict()
+        self._bytes = 0
+        self.acertos = 0
+        self.falhas = 0
+
+    @staticmethod
+    def _tamanho_bytes(pixmap):
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 1) // 8
+
+    def obter(self, chave, fabrica):
+        """Retorna o pixmap da chave, criando-o com fabrica() se não estiver no cache"""
+        pixmap = self._itens.get(chave)
+        if pixmap is not None:
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return pixmap
+
+        self.falhas += 1
+        pixmap = fabrica()
+        tamanho = self._tamanho_bytes(pixmap)
+        if tamanho > self.limite_bytes:
+            # Maior que o cache inteiro: usa sem guardar
+            return pixmap
+        self._itens[chave] = pixmap
+        self._bytes += tamanho
+        while self._bytes > self.limite_bytes:
+            _, removido = self._itens.popitem(last=False)
+            self._bytes -= self._tamanho_bytes(removido)
+        return pixmap
+
+    def contem(self, chave):
+        """Se a chave está no cache (sem contar acerto nem mudar a ordem)"""
+        return chave in self._itens
+
+    def original(self, caminho):
+        """Imagem decodificada do disco (pixmap nulo se não puder ser carregada)"""
+        return self.obter(("original", caminho), lambda: QPixmap(caminho))
+
+    def escalado(self, caminho, tamanho,
+                 aspecto=Qt.AspectRatioMode.KeepAspectRatioByExpanding,
+                 transformacao=Qt.TransformationMode.SmoothTransformation):
+        """Imagem escalada para o tamanho pedido; só reescala quando o tamanho muda"""
+        tamanho = QSize(tamanho)
+        chave = ("escalado", caminho, tamanho.width(), tamanho.height(), aspecto, transformacao)
+
+        def escalar():
+            original = self.original(caminho)
+            if original.isNull():
+                return original
+            return original.scaled(tamanho, aspecto, transformacao)
+
+        return self.obter(chave, escalar)
+
+    def limpar(self):
+        """Descarta todos os pixmaps"""
+        self._itens.clear()
+        self._bytes = 0
+
+    @property
+    def bytes_em_uso(self):
+        return self._bytes
+
+
+# Instância única usada por todas as telas
+cache_imagens = PixmapCache()
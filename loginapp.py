@@ -1,13 +1,15 @@
 from PySide6.QtWidgets import (QDialog, QWidget, QVBoxLayout, QHBoxLayout, 
                               QLabel, QLineEdit, QPushButton, QCheckBox, 
                               QMessageBox, QSpacerItem, QSizePolicy)
-from PySide6.QtGui import QPixmap, QPainter, QColor
-from PySide6.QtCore import Qt, QFile
-from datetime import datetime, timedelta
-import random
+from PySide6.QtGui import QPainter, QColor
+from PySide6.QtCore import Qt, QFile, QObject
 import re
+from credentialservice import CredentialService
 from database import Database
-from menuapp import MenuScreen 
+from imagecache import cache_imagens
+from ratelimit import RateLimiter, mensagem_espera
+from verificationcodes import (CODE_EXPIRED, CODE_MESSAGES, CODE_VALID, CODE_WRONG, PURPOSE_RESET,
+                               VerificationCodeStore)
 
 class LoginScreen(QDialog):
     def __init__(self, parent=None):
@@ -18,8 +20,17 @@ class LoginScreen(QDialog):
         # Configurações
         self.parent_window = parent
         self.db = parent.db if parent else Database()
-        self.tentativas_senha = 0
+        # Conferência da senha fora da thread da interface
+        self.credenciais = parent.credenciais if parent else CredentialService(self.db)
+        # Guardada para ser desfeita em done: o serviço é compartilhado e vive mais que esta tela
+        self.conexao_login = self.credenciais.login_verificado.connect(self._on_login_verificado)
+        self.login_pendente = False
+        self.codigos = parent.codigos if parent else VerificationCodeStore(self.db.db_name)
+        # Senhas erradas contam por email numa janela de tempo, mesmo após fechar a tela
+        self.limites = parent.limites if parent else RateLimiter(self.db.db_name)
         self.email_verificado = None
+        # Diálogo de código aberto por _show_verify_code_screen
+        self.verify_dialog = self.verify_button = None
         
         # Layout principal
         main_layout = QVBoxLayout(self)
@@ -41,31 +52,11 @@ class LoginScreen(QDialog):
 
         # Campo Email
         self.email_label = QLabel("Email:")
-        self.email_label.setStyleSheet("""
-            QLabel {
-                color: white;
-                font-family: 'Arial';
-                font-size: 18px;
-                font-weight: bold;
-            }
-        """)
+        self.email_label.setObjectName("RotuloLogin")
         
         self.email_input = QLineEdit()
         self.email_input.setPlaceholderText("Digite seu email cadastrado")
-        self.email_input.setStyleSheet("""
-            QLineEdit {
-                background-color: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                                            stop:0 #F06292, 
-                                            stop:0.5 #FFD54F, 
-                                            stop:1 #8E24AA);
-                border: 1px solid white;
-                border-radius: 15px;
-                padding: 10px;
-                color: white;
-                font-size: 16px;
-                font-family: 'Arial';
-            }
-        """)
+        self.email_input.setObjectName("CampoLogin")
         self.email_input.setFixedSize(400, 45)
         
         email_container = QWidget()
@@ -76,19 +67,12 @@ class LoginScreen(QDialog):
 
         # Campo Senha (visível desde o início)
         self.senha_label = QLabel("Senha:")
-        self.senha_label.setStyleSheet("""
-            QLabel {
-                color: white;
-                font-family: 'Arial';
-                font-size: 18px;
-                font-weight: bold;
-            }
-        """)
+        self.senha_label.setObjectName("RotuloLogin")
         
         self.senha_input = QLineEdit()
         self.senha_input.setPlaceholderText("Digite sua senha")
         self.senha_input.setEchoMode(QLineEdit.Password)
-        self.senha_input.setStyleSheet(self.email_input.styleSheet())
+        self.senha_input.setObjectName("CampoLogin")
         self.senha_input.setFixedSize(400, 45)
         
         senha_container = QWidget()
@@ -99,43 +83,13 @@ class LoginScreen(QDialog):
 
         # Checkbox Mostrar Senha (visível desde o início)
         self.show_password_checkbox = QCheckBox("Mostrar Senha")
-        self.show_password_checkbox.setStyleSheet("""
-            QCheckBox {
-                color: white;
-                font-size: 16px;
-                font-family: 'Arial';
-            }
-            QCheckBox::indicator {
-                width: 18px;
-                height: 18px;
-                border: 2px solid white;
-                border-radius: 5px;
-                background-color: transparent;
-            }
-            QCheckBox::indicator:checked {
-                background-color: white;
-            }
-        """)
+        self.show_password_checkbox.setObjectName("MostrarSenha")
         self.show_password_checkbox.stateChanged.connect(self._toggle_password_visibility)
         form_layout.addWidget(self.show_password_checkbox, 0, Qt.AlignLeft)
 
         # Botão Esqueceu Senha (oculto inicialmente)
         self.forgot_password_button = QPushButton("Esqueceu Senha?")
-        self.forgot_password_button.setStyleSheet("""
-            QPushButton {
-                color: white;
-                font-size: 16px;
-                font-family: 'Arial';
-                text-decoration: underline;
-                background: transparent;
-                border: none;
-                padding: 0;
-                margin-top: 10px;
-            }
-            QPushButton:hover {
-                color: #FFD54F;
-            }
-        """)
+        self.forgot_password_button.setObjectName("LinkLogin")
         self.forgot_password_button.setVisible(False)
         self.forgot_password_button.clicked.connect(self._show_forgot_password_screen)
         form_layout.addWidget(self.forgot_password_button, 0, Qt.AlignLeft)
@@ -148,56 +102,14 @@ class LoginScreen(QDialog):
         
         # Botão VOLTAR
         self.back_button = QPushButton("VOLTAR")
-        self.back_button.setStyleSheet("""
-            QPushButton {
-                background-color: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                                            stop:0 #6D6D6D, 
-                                            stop:0.5 #9E9E9E, 
-                                            stop:1 #6D6D6D);
-                color: white;
-                border: none;
-                border-radius: 20px;
-                padding: 12px 25px;
-                font-size: 18px;
-                font-weight: bold;
-                font-family: 'Arial';
-                min-width: 120px;
-            }
-            QPushButton:hover {
-                background-color: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                                            stop:0 #8E8E8E, 
-                                            stop:0.5 #BEBEBE, 
-                                            stop:1 #8E8E8E);
-            }
-        """)
+        self.back_button.setObjectName("BotaoVoltarLogin")
         self.back_button.setFixedSize(150, 50)
         self.back_button.clicked.connect(self.reject)
         buttons_layout.addWidget(self.back_button)
         
         # Botão ENTRAR
         self.enter_button = QPushButton("ENTRAR")
-        self.enter_button.setStyleSheet("""
-            QPushButton {
-                background-color: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                                            stop:0 #F06292, 
-                                            stop:0.5 #FFD54F, 
-                                            stop:1 #8E24AA);
-                color: white;
-                border: none;
-                border-radius: 20px;
-                padding: 12px 25px;
-                font-size: 18px;
-                font-weight: bold;
-                font-family: 'Arial';
-                min-width: 120px;
-            }
-            QPushButton:hover {
-                background-color: qlineargradient(x1:0, y1:0, x2:1, y2:0, 
-                                            stop:0 #FF80AB, 
-                                            stop:0.5 #FFEB3B, 
-                                            stop:1 #AB47BC);
-            }
-        """)
+        self.enter_button.setObjectName("BotaoLogin")
         self.enter_button.setFixedSize(150, 50)
         self.enter_button.clicked.connect(self._verify_login)
         buttons_layout.addWidget(self.enter_button)
@@ -210,21 +122,27 @@ class LoginScreen(QDialog):
         # Espaçamento inferior
         main_layout.addItem(QSpacerItem(20, 60, QSizePolicy.Minimum, QSizePolicy.Expanding))
         
-        # Configurar fundo
+        # Configurar fundo (toda a aparência da tela vem da folha do tema)
+        self.setObjectName("TelaLogin")
         caminho_imagem = r"C:\Users\Clara\OneDrive\Área de Trabalho\KIVY\NA PELE E NA CONSCIÊNCIA (5).png"
         if QFile.exists(caminho_imagem):
-            self.background_pixmap = QPixmap(caminho_imagem)
-            self.setStyleSheet("background: transparent;")
+            # Decodificada só na primeira pintura
+            self.background_path = caminho_imagem
         else:
-            self.background_pixmap = None
+            self.background_path = None
+        self.setProperty("transparente", self.background_path is not None)
 
         # Conectar eventos
         self.email_input.returnPressed.connect(lambda: self._verify_email(show_message=True))
 
     def paintEvent(self, event):
         painter = QPainter(self)
-        if self.background_pixmap and not self.background_pixmap.isNull():
-            painter.drawPixmap(self.rect(), self.background_pixmap)
+        background = None
+        if self.background_path:
+            background = cache_imagens.escalado(
+                self.background_path, self.size(), Qt.IgnoreAspectRatio, Qt.FastTransformation)
+        if background is not None and not background.isNull():
+            painter.drawPixmap(0, 0, background)
         else:
             painter.fillRect(self.rect(), QColor(50, 50, 50))
 
@@ -261,78 +179,74 @@ class LoginScreen(QDialog):
             self._show_message("Campo Vazio", "Por favor, digite sua senha.", QMessageBox.Warning)
             return
     
-        if self.db.verificar_credenciais(self.email_verificado, senha):
-        # Obter o apelido do usuário do banco de dados
-            apelido = self.db.obter_apelido(self.email_verificado)
-            if apelido:
-            # Fechar a janela de login e abrir o menu
-                self.menu = MenuScreen(apelido)  # Cria a tela de menu
-                self.menu.show()                 # Mostra o menu
-                self.close()                     # Fecha a tela de login atual
+        if self.login_pendente:
+            return
+        if self.limites.bloqueado(self.email_verificado):
+            # Bloqueado sem consultar o banco nem conferir a senha
+            self._show_attempts_exhausted(self.limites.falhas(self.email_verificado))
+            return
+        self.login_pendente = True
+        self.enter_button.setEnabled(False)
+        self.credenciais.autenticar(self.email_verificado, senha)
+
+    def done(self, resultado):
+        """Desconecta do CredentialService ao fechar (done pode ser chamado mais de uma vez)"""
+        if self.conexao_login is not None:
+            QObject.disconnect(self.conexao_login)
+            self.conexao_login = None
+        super().done(resultado)
+
+    def _on_login_verificado(self, email, sessao):
+        """Resultado da conferência feita pelo CredentialService"""
+        if not self.login_pendente or email != self.email_verificado:
+            return
+        self.login_pendente = False
+        self.enter_button.setEnabled(True)
+        if sessao is not None:
+            self.limites.limpar_falhas(email)
+            # A sessão já traz id, nome e apelido: o menu e as telas seguintes
+            # não consultam o usuário de novo (importado só agora)
+            from menuapp import MenuScreen
+            self.menu = MenuScreen(sessao, self.db)  # Cria a tela de menu
+            self.menu.show()                 # Mostra o menu
+            self.close()                     # Fecha a tela de login atual
         else:
             self._handle_failed_login()
             self.forgot_password_button.setVisible(True)
 
     def _handle_failed_login(self):
-        self.tentativas_senha += 1
-        tentativas_restantes = 3 - self.tentativas_senha
+        tentativas = self.limites.registrar_falha(self.email_verificado)
+        tentativas_restantes = self.limites.max_falhas - tentativas
         
-        if self.tentativas_senha >= 3:
-            msg = QMessageBox()
-            msg.setIcon(QMessageBox.Warning)
-            msg.setWindowTitle("Tentativas Esgotadas")
-            msg.setText(f"Você excedeu o número máximo de tentativas!")
-            msg.setInformativeText(f"Tentativas realizadas: {self.tentativas_senha}\nTentativas restantes: 0\nSerá necessário redefinir sua senha.")
-            msg.setStyleSheet("""
-                QMessageBox {
-                    background-color: #333333;
-                }
-                QMessageBox QLabel {
-                    color: white;
-                }
-            """)
-            msg.exec_()
-            self._show_reset_password_screen()
+        if tentativas_restantes <= 0:
+            self._show_attempts_exhausted(tentativas)
         else:
             msg = QMessageBox()
             msg.setIcon(QMessageBox.Warning)
             msg.setWindowTitle("Senha Incorreta")
             msg.setText("Senha incorreta!")
-            msg.setInformativeText(f"Tentativas realizadas: {self.tentativas_senha}\nTentativas restantes: {tentativas_restantes}")
-            msg.setStyleSheet("""
-                QMessageBox {
-                    background-color: #333333;
-                }
-                QMessageBox QLabel {
-                    color: white;
-                }
-            """)
+            msg.setInformativeText(f"Tentativas realizadas: {tentativas}\nTentativas restantes: {tentativas_restantes}")
+            msg.setObjectName("AvisoLogin")
             msg.exec_()
             self.senha_input.clear()
             self.senha_input.setFocus()
 
+    def _show_attempts_exhausted(self, tentativas):
+        msg = QMessageBox()
+        msg.setIcon(QMessageBox.Warning)
+        msg.setWindowTitle("Tentativas Esgotadas")
+        msg.setText(f"Você excedeu o número máximo de tentativas!")
+        msg.setInformativeText(f"Tentativas realizadas: {tentativas}\nTentativas restantes: 0\nSerá necessário redefinir sua senha.")
+        msg.setObjectName("AvisoLogin")
+        msg.exec_()
+        self._show_reset_password_screen()
+
     def _show_message(self, title, message, icon):
         msg = QMessageBox()
         msg.setWindowTitle(title)
         msg.setText(message)
         msg.setIcon(icon)
-        msg.setStyleSheet("""
-            QMessageBox {
-                background-color: #333333;
-            }
-            QMessageBox QLabel {
-                color: white;
-            }
-            QMessageBox QPushButton {
-                background-color: #555555;
-                color: white;
-                padding: 5px 15px;
-                border-radius: 5px;
-            }
-            QMessageBox QPushButton:hover {
-                background-color: #777777;
-            }
-        """)
+        msg.setObjectName("MensagemLogin")
         msg.exec_()
 
     def _show_forgot_password_screen(self):
@@ -343,47 +257,39 @@ class LoginScreen(QDialog):
         reset_dialog.setWindowTitle("Redefinir Senha")
         reset_dialog.setFixedSize(500, 400)
         
-        if hasattr(self, 'background_pixmap') and self.background_pixmap:
-            reset_dialog.setStyleSheet("background: transparent;")
+        reset_dialog.setObjectName("DialogoLogin")
+        reset_dialog.setProperty("transparente", self.background_path is not None)
         
         layout = QVBoxLayout(reset_dialog)
         layout.setAlignment(Qt.AlignCenter)
         layout.setSpacing(20)
         
         titulo = QLabel("REDEFINIR SENHA")
-        titulo.setStyleSheet("""
-            QLabel {
-                color: white;
-                font-family: 'Arial';
-                font-size: 24px;
-                font-weight: bold;
-                margin-bottom: 30px;
-            }
-        """)
+        titulo.setObjectName("TituloDialogoLogin")
         titulo.setAlignment(Qt.AlignCenter)
         layout.addWidget(titulo)
         
         # Nova Senha
         nova_senha_label = QLabel("Nova Senha (6 dígitos - apenas números e caracteres especiais):")
-        nova_senha_label.setStyleSheet("color: white; font-size: 16px;")
+        nova_senha_label.setObjectName("TextoDialogoLogin")
         nova_senha_input = QLineEdit()
         nova_senha_input.setEchoMode(QLineEdit.Password)
-        nova_senha_input.setStyleSheet(self.email_input.styleSheet())
+        nova_senha_input.setObjectName("CampoLogin")
         nova_senha_input.setFixedSize(350, 45)
         nova_senha_input.setMaxLength(6)
         
         # Confirmar Senha
         confirmar_senha_label = QLabel("Confirmar Nova Senha:")
-        confirmar_senha_label.setStyleSheet("color: white; font-size: 16px;")
+        confirmar_senha_label.setObjectName("TextoDialogoLogin")
         confirmar_senha_input = QLineEdit()
         confirmar_senha_input.setEchoMode(QLineEdit.Password)
-        confirmar_senha_input.setStyleSheet(self.email_input.styleSheet())
+        confirmar_senha_input.setObjectName("CampoLogin")
         confirmar_senha_input.setFixedSize(350, 45)
         confirmar_senha_input.setMaxLength(6)
         
         # Checkbox Mostrar Senha
         show_password = QCheckBox("Mostrar Senha")
-        show_password.setStyleSheet(self.show_password_checkbox.styleSheet())
+        show_password.setObjectName("MostrarSenha")
         show_password.stateChanged.connect(lambda state: (
             nova_senha_input.setEchoMode(QLineEdit.Normal if state else QLineEdit.Password),
             confirmar_senha_input.setEchoMode(QLineEdit.Normal if state else QLineEdit.Password)
@@ -391,7 +297,7 @@ class LoginScreen(QDialog):
         
         # Botão Enviar Código
         enviar_button = QPushButton("ENVIAR CÓDIGO")
-        enviar_button.setStyleSheet(self.enter_button.styleSheet())
+        enviar_button.setObjectName("BotaoLogin")
         enviar_button.setFixedSize(200, 50)
         
         layout.addWidget(nova_senha_label)
@@ -433,10 +339,12 @@ class LoginScreen(QDialog):
                                  "compostos apenas por números e caracteres especiais.", QMessageBox.Warning)
                 return
                 
-            self.codigo_reset = str(random.randint(100000, 999999))
-            self.codigo_valido_ate = datetime.now() + timedelta(minutes=5)
-            
-            if self.parent_window.enviar_codigo_email(self.email_verificado, self.codigo_reset):
+            espera = self.limites.liberar_envio(self.email_verificado, PURPOSE_RESET)
+            if espera:
+                self._show_message("Aguarde", mensagem_espera(espera), QMessageBox.Warning)
+                return
+            codigo = self.codigos.gerar(self.email_verificado, PURPOSE_RESET)
+            if self.parent_window.enviar_codigo_email(self.email_verificado, codigo):
                 reset_dialog.close()
                 self._show_verify_code_screen(nova_senha)
             else:
@@ -451,57 +359,38 @@ class LoginScreen(QDialog):
         verify_dialog.setWindowTitle("Verificação de Código")
         verify_dialog.setFixedSize(500, 400)
         
-        if hasattr(self, 'background_pixmap') and self.background_pixmap:
-            verify_dialog.setStyleSheet("background: transparent;")
+        verify_dialog.setObjectName("DialogoLogin")
+        verify_dialog.setProperty("transparente", self.background_path is not None)
         
         layout = QVBoxLayout(verify_dialog)
         layout.setAlignment(Qt.AlignCenter)
         layout.setSpacing(20)
         
         titulo = QLabel("VERIFICAÇÃO DE CÓDIGO")
-        titulo.setStyleSheet("""
-            QLabel {
-                color: white;
-                font-family: 'Arial';
-                font-size: 24px;
-                font-weight: bold;
-                margin-bottom: 30px;
-            }
-        """)
+        titulo.setObjectName("TituloDialogoLogin")
         titulo.setAlignment(Qt.AlignCenter)
         layout.addWidget(titulo)
         
         instrucao = QLabel(f"Enviamos um código de 6 dígitos para:\n{self.email_verificado}")
-        instrucao.setStyleSheet("color: white; font-size: 14px; text-align: center;")
+        instrucao.setObjectName("InstrucaoLogin")
         layout.addWidget(instrucao)
         
         codigo_input = QLineEdit()
         codigo_input.setPlaceholderText("Digite o código")
         codigo_input.setMaxLength(6)
         codigo_input.setAlignment(Qt.AlignCenter)
-        codigo_input.setStyleSheet(self.email_input.styleSheet())
+        codigo_input.setObjectName("CampoLogin")
         codigo_input.setFixedSize(200, 45)
         layout.addWidget(codigo_input, 0, Qt.AlignCenter)
         
         # Botão Verificar
         verify_button = QPushButton("VERIFICAR")
-        verify_button.setStyleSheet(self.enter_button.styleSheet())
+        verify_button.setObjectName("BotaoLogin")
         verify_button.setFixedSize(200, 50)
         
         # Botão Reenviar
         resend_button = QPushButton("Reenviar Código")
-        resend_button.setStyleSheet("""
-            QPushButton {
-                color: white;
-                font-size: 12px;
-                text-decoration: underline;
-                background: transparent;
-                border: none;
-            }
-            QPushButton:hover {
-                color: #FFD54F;
-            }
-        """)
+        resend_button.setObjectName("LinkReenviar")
         
         layout.addWidget(verify_button, 0, Qt.AlignCenter)
         layout.addWidget(resend_button, 0, Qt.AlignCenter)
@@ -514,33 +403,51 @@ class LoginScreen(QDialog):
                 self._show_message("Código Inválido", "Digite um código de 6 dígitos.", QMessageBox.Warning)
                 return
                 
-            if datetime.now() > self.codigo_valido_ate:
+            resultado = self.codigos.verificar(self.email_verificado, PURPOSE_RESET, codigo)
+            if resultado == CODE_VALID:
+                # A nova senha é codificada em segundo plano
+                verify_button.setEnabled(False)
+                self.credenciais.redefinir(self.email_verificado, nova_senha)
+            elif resultado == CODE_EXPIRED:
                 self._show_message("Código Expirado", "Solicite um novo código.", QMessageBox.Warning)
-                return
-                
-            if codigo == self.codigo_reset:
-                if self.db.atualizar_senha(self.email_verificado, nova_senha):
-                    self._show_message("Sucesso", "Senha redefinida com sucesso!", QMessageBox.Information)
-                    verify_dialog.close()
-                    self.tentativas_senha = 0
-                else:
-                    self._show_message("Erro", "Falha ao atualizar senha.", QMessageBox.Critical)
-            else:
+            elif resultado == CODE_WRONG:
                 self._show_message("Código Incorreto", "Verifique o código digitado.", QMessageBox.Warning)
+            else:
+                self._show_message("Código Inválido", CODE_MESSAGES[resultado], QMessageBox.Warning)
         
         # Função para reenviar
         def resend_code():
-            self.codigo_reset = str(random.randint(100000, 999999))
-            self.codigo_valido_ate = datetime.now() + timedelta(minutes=5)
-            
-            if self.parent_window.enviar_codigo_email(self.email_verificado, self.codigo_reset):
+            espera = self.limites.liberar_envio(self.email_verificado, PURPOSE_RESET)
+            if espera:
+                self._show_message("Aguarde", mensagem_espera(espera), QMessageBox.Warning)
+                return
+            codigo = self.codigos.gerar(self.email_verificado, PURPOSE_RESET)
+            if self.parent_window.enviar_codigo_email(self.email_verificado, codigo):
                 self._show_message("Sucesso", "Novo código enviado!", QMessageBox.Information)
             else:
                 self._show_message("Erro", "Falha ao reenviar código.", QMessageBox.Critical)
         
         verify_button.clicked.connect(verify_code)
         resend_button.clicked.connect(resend_code)
+        # Método desta tela (e não uma função solta): o sinal vem do pool de
+        # threads e o Qt só o entrega na thread da interface se houver um receptor
+        self.verify_dialog, self.verify_button = verify_dialog, verify_button
+        self.credenciais.senha_redefinida.connect(self._on_senha_redefinida)
         
         verify_dialog.exec()
+        self.credenciais.senha_redefinida.disconnect(self._on_senha_redefinida)
+        self.verify_dialog = self.verify_button = None
+
+    def _on_senha_redefinida(self, email, sucesso):
+        """Resultado da nova senha gravada pelo CredentialService"""
+        if self.verify_dialog is None or email != self.email_verificado:
+            return
+        self.verify_button.setEnabled(True)
+        if sucesso:
+            self._show_message("Sucesso", "Senha redefinida com sucesso!", QMessageBox.Information)
+            self.verify_dialog.close()
+            self.limites.limpar_falhas(self.email_verificado)
+        else:
+            self._show_message("Erro", "Falha ao atualizar senha.", QMessageBox.Critical)
 
 
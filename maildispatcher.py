@@ -0,0 +1,142 @@
+import queue
+import smtplib
+import threading
+import time
+from email.mime.text import MIMEText
+from typing import Optional
+
+from PySide6.QtCore import QObject, Signal
+
+
+class SmtpSession:
+    """Sessão SMTP autenticada que permanece aberta entre os envios"""
+
+    def __init__(self, servidor: str, porta: int, usuario: Optional[str] = None,
+                 senha: Optional[str] = None, usar_tls: bool = True, timeout: float = 15.0) -> None:
+        self.servidor = servidor
+        self.porta = porta
+        self.usuario = usuario
+        self.senha = senha
+        self.usar_tls = usar_tls
+        self.timeout = timeout
+        self._smtp = None
+
+    def _abrir(self) -> None:
+        """Conecta, negocia STARTTLS e autentica uma única vez"""
+        smtp = smtplib.SMTP(self.servidor, self.porta, timeout=self.timeout)
+        try:
+            if self.usar_tls:
+                smtp.starttls()
+            if self.usuario and self.senha:
+                smtp.login(self.usuario, self.senha)
+        except Exception:
+            smtp.close()
+            raise
+        self._smtp = smtp
+
+    def enviar(self, remetente: str, destinatario: str, mensagem: str) -> None:
+        """Envia reaproveitando a sessão; reconecta uma vez se o servidor a encerrou"""
+        if self._smtp is None:
+            self._abrir()
+        try:
+            self._smtp.sendmail(remetente, destinatario, mensagem)
+        except (smtplib.SMTPServerDisconnected, ConnectionError):
+            # Servidores como o Gmail derrubam sessões ociosas; isso não
+            # conta como falha de entrega.
+            self.fechar()
+            self._abrir()
+            self._smtp.sendmail(remetente, destinatario, mensagem)
+
+    def fechar(self) -> None:
+        """Encerra a sessão, ignorando erros de uma conexão já perdida"""
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            self._smtp.close()
+        finally:
+            self._smtp = None
+
+
+def _erro_temporario(erro: Exception) -> bool:
+    """Indica se vale a pena tentar novamente o envio"""
+    if isinstance(erro, (smtplib.SMTPAuthenticationError, smtplib.SMTPRecipientsRefused)):
+        return False
+    if isinstance(erro, smtplib.SMTPResponseException):
+        # Códigos 4xx são temporários, 5xx são definitivos
+        return 400 <= erro.smtp_code < 500
+    return isinstance(erro, (smtplib.SMTPException, OSError))
+
+
+class MailDispatcher(QObject):
+    """Fila de envio de emails processada por uma thread em segundo plano"""
+    # destinatário, sucesso, mensagem de erro
+    entrega_concluida = Signal(str, bool, str)
+
+    def __init__(self, remetente: str, servidor: str, porta: int, usuario: Optional[str] = None,
+                 senha: Optional[str] = None, usar_tls: bool = True, tamanho_fila: int = 100,
+                 tentativas: int = 4, espera_inicial: float = 1.0, parent=None) -> None:
+        super().__init__(parent)
+        self.remetente = remetente
+        self.tentativas = tentativas
+        self.espera_inicial = espera_inicial
+        self.sessao = SmtpSession(servidor, porta, usuario, senha, usar_tls)
+        self._fila = queue.Queue(maxsize=tamanho_fila)
+        self._parar = threading.Event()
+        self._thread = threading.Thread(target=self._executar, name="MailDispatcher", daemon=True)
+        self._thread.start()
+
+    def enfileirar(self, destinatario: str, assunto: str, corpo: str) -> bool:
+        """Coloca um email na fila sem bloquear; retorna False se a fila estiver cheia"""
+        if self._parar.is_set():
+            return False
+        msg = MIMEText(corpo)
+        msg['Subject'] = assunto
+        msg['From'] = self.remetente
+        msg['To'] = destinatario
+        try:
+            self._fila.put_nowait((destinatario, msg.as_string()))
+            return True
+        except queue.Full:
+            print(f"Fila de emails cheia, descartando envio para {destinatario}")
+            return False
+
+    def parar(self, timeout: float = 5.0) -> None:
+        """Interrompe a thread de envio e fecha a sessão SMTP"""
+        self._parar.set()
+        try:
+            self._fila.put_nowait(None)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+
+    def _executar(self) -> None:
+        while not self._parar.is_set():
+            item = self._fila.get()
+            if item is None:
+                break
+            destinatario, mensagem = item
+            sucesso, erro = self._entregar(destinatario, mensagem)
+            self.entrega_concluida.emit(destinatario, sucesso, erro)
+        self.sessao.fechar()
+
+    def _entregar(self, destinatario: str, mensagem: str):
+        """Tenta o envio com espera exponencial entre as tentativas"""
+        espera = self.espera_inicial
+        for tentativa in range(1, self.tentativas + 1):
+            inicio = time.perf_counter()
+            try:
+                self.sessao.enviar(self.remetente, destinatario, mensagem)
+                print(f"Email enviado para {destinatario} em {time.perf_counter() - inicio:.2f}s")
+                return True, ""
+            except Exception as e:
+                print(f"Erro ao enviar email (tentativa {tentativa}/{self.tentativas}): {e}")
+                self.sessao.fechar()
+                if not _erro_temporario(e) or tentativa == self.tentativas:
+                    return False, str(e)
+                # wait() em vez de sleep() para que parar() não fique preso
+                if self._parar.wait(espera):
+                    return False, "Envio cancelado"
+                espera *= 2
+        return False, "Número máximo de tentativas atingido"
@@ -1,18 +1,27 @@
 # menuapp.py
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                                QLabel, QPushButton, QFrame, QSpacerItem, QSizePolicy)
-from PySide6.QtGui import QPixmap, QPainter, QFont, QColor
+from PySide6.QtGui import QPainter, QFont, QColor
 from PySide6.QtCore import Qt, QFile, QSize
-from mundoconsciencias import WorldOfConsciousnessScreen  # Importe a nova tela
+from imagecache import cache_imagens
+from theme import TOKENS, aplicar_tema, definir_estado
 
 class MenuScreen(QMainWindow):
-    def __init__(self, apelido_usuario="Usuário"):
+    def __init__(self, sessao, db=None):
         super().__init__()
+        # Usuário autenticado (session.UserSession), repassado às outras telas
+        self.sessao = sessao
+        self.apelido_usuario = sessao.apelido
+        self.db = db
         self.setWindowTitle("Na Pele e na Consciência - Menu")
         self.setGeometry(0, 0, 1700, 950)
         self.setMinimumSize(1200, 700)
+        self.world_of_consciousness_screen = None  # Construída na primeira navegação
+        self.community_screen = None
+        self.progress_store = None  # Compartilhado entre as telas
 
-        # Configuração do fundo
+        # Configuração do fundo (cores na folha do tema, QMainWindow#TelaMenu)
+        self.setObjectName("TelaMenu")
         self.set_background(r"C:\Users\Clara\OneDrive\Área de Trabalho\KIVY\NA PELE E NA CONSCIÊNCIA (9).png")
 
         central_widget = QWidget()
@@ -32,15 +41,7 @@ class MenuScreen(QMainWindow):
 
         # Título "MENU"
         menu_title = QLabel("MENU")
-        menu_title.setStyleSheet("""
-            QLabel {
-                color: white;
-                font-family: 'Arial';
-                font-size: 32px;
-                font-weight: normal;
-                padding-bottom: 5px;
-            }
-        """)
+        menu_title.setObjectName("TituloMenu")
         menu_title.setAlignment(Qt.AlignLeft)
         
         title_h_layout = QHBoxLayout()
@@ -50,7 +51,7 @@ class MenuScreen(QMainWindow):
 
         divider = QFrame()
         divider.setFrameShape(QFrame.HLine)
-        divider.setStyleSheet("background-color: white;")
+        divider.setObjectName("DivisorMenu")
         divider.setFixedHeight(1)
         left_layout.addWidget(divider)
 
@@ -64,45 +65,12 @@ class MenuScreen(QMainWindow):
             "SOBRE"
         ]
 
-        button_gradients = [
-            "qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #FF8C00, stop:1 #FF4500)",
-            "qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #FF69B4, stop:1 #FF1493)",
-            "qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #9370DB, stop:1 #8A2BE2)",
-            "qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #8A2BE2, stop:1 #4B0082)",
-            "qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #4B0082, stop:1 #6A5ACD)",
-            "qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #6A5ACD, stop:1 #DDA0DD)"
-        ]
-        
-        button_hover_gradients = [
-            "qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #FFA07A, stop:1 #FF6347)",
-            "qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #FFB6C1, stop:1 #FF69B4)",
-            "qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #BA55D3, stop:1 #9932CC)",
-            "qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #9370DB, stop:1 #6A5ACD)",
-            "qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #6A5ACD, stop:1 #836FFF)",
-            "qlineargradient(x1:0, y1:0, x2:1, y2:0, stop:0 #DDA0DD, stop:1 #EE82EE)"
-        ]
-
-        # Criar botões do menu
+        # Criar botões do menu (o gradiente de cada um vem de TOKENS["menu"], pelo índice)
         self.menu_buttons = []
         for i, item_text in enumerate(menu_items_text):
             button = QPushButton(item_text)
-            button.setStyleSheet(f"""
-                QPushButton {{
-                    background-color: {button_gradients[i % len(button_gradients)]};
-                    color: white;
-                    border: none;
-                    border-radius: 18px;
-                    padding: 10px 20px;
-                    font-family: 'Arial';
-                    font-size: 18px;
-                    font-weight: bold;
-                    text-align: left;
-                    min-height: 40px;
-                }}
-                QPushButton:hover {{
-                    background-color: {button_hover_gradients[i % len(button_hover_gradients)]};
-                }}
-            """)
+            button.setObjectName("BotaoMenu")
+            button.setProperty("indice", i % len(TOKENS["menu"]))
             button.setFixedSize(300, 50)
             left_layout.addWidget(button, alignment=Qt.AlignLeft)
             self.menu_buttons.append(button)
@@ -113,7 +81,7 @@ class MenuScreen(QMainWindow):
         # Linha vertical divisória
         vertical_divider = QFrame()
         vertical_divider.setFrameShape(QFrame.VLine)
-        vertical_divider.setStyleSheet("background-color: white;")
+        vertical_divider.setObjectName("DivisorMenu")
         vertical_divider.setFixedWidth(1)
         main_layout.addWidget(vertical_divider)
 
@@ -125,41 +93,13 @@ class MenuScreen(QMainWindow):
 
         right_layout.addStretch(2)
 
-        welcome_msg = QLabel(f"SEJA BEM VINDO (A) {apelido_usuario.upper()} !")
-        welcome_msg.setStyleSheet("""
-            QLabel {
-                color: white;
-                font-family: 'Arial';
-                font-size: 32px;
-                font-weight: bold;
-            }
-        """)
+        welcome_msg = QLabel(f"SEJA BEM VINDO (A) {self.apelido_usuario.upper()} !")
+        welcome_msg.setObjectName("BoasVindas")
         welcome_msg.setAlignment(Qt.AlignCenter)
         right_layout.addWidget(welcome_msg)
 
         start_button = QPushButton("INICIAR JORNADA")
-        start_button.setStyleSheet("""
-            QPushButton {
-                background-color: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                                                 stop:0 #8A2BE2,
-                                                 stop:0.5 #FF1493,
-                                                 stop:1 #FF8C00);
-                color: white;
-                border: none;
-                border-radius: 25px;
-                padding: 15px 30px;
-                font-family: 'Arial';
-                font-size: 20px;
-                font-weight: bold;
-                min-width: 250px;
-            }
-            QPushButton:hover {
-                background-color: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                                                 stop:0 #9932CC,
-                                                 stop:0.5 #FF69B4,
-                                                 stop:1 #FFA500);
-            }
-        """)
+        start_button.setObjectName("BotaoIniciar")
         start_button.setFixedSize(300, 60)
         right_layout.addWidget(start_button, alignment=Qt.AlignCenter)
 
@@ -168,29 +108,61 @@ class MenuScreen(QMainWindow):
 
         # Conectar os botões do menu às funções correspondentes
         self.menu_buttons[0].clicked.connect(self.show_world_of_consciousness)  # MUNDO DE CONSCIÊNCIAS
+        self.menu_buttons[2].clicked.connect(self.show_community)  # COMUNIDADE
         # Os outros botões podem ser conectados aqui quando suas telas estiverem prontas
 
     def show_world_of_consciousness(self):
         """Mostra a tela Mundo de Consciências"""
-        self.world_of_consciousness_screen = WorldOfConsciousnessScreen()
-        self.world_of_consciousness_screen.go_back_to_menu.connect(self.show)  # Conecta o sinal de voltar
+        if self.world_of_consciousness_screen is None:
+            # Importa e constrói a tela apenas na primeira vez que é aberta
+            from mundoconsciencias import WorldOfConsciousnessScreen
+            self.world_of_consciousness_screen = WorldOfConsciousnessScreen(self.get_progress_store(),
+                                                                            self.sessao)
+            self.world_of_consciousness_screen.go_back_to_menu.connect(self.show)  # Conecta o sinal de voltar
+        else:
+            # Tela reaproveitada: atualiza só as histórias que mudaram
+            self.world_of_consciousness_screen.refresh_story_status()
         self.world_of_consciousness_screen.show()
         self.hide()
 
+    def show_community(self):
+        """Mostra a aba Comunidade"""
+        if self.community_screen is None:
+            from communityscreen import CommunityScreen
+            self.community_screen = CommunityScreen(self.get_progress_store(), self.sessao)
+            self.community_screen.go_back_to_menu.connect(self.show)
+        else:
+            self.community_screen.refresh_lists()
+        self.community_screen.show()
+        self.hide()
+
+    def get_progress_store(self):
+        """Repositório de progresso e perfis, criado no primeiro uso"""
+        if self.progress_store is None:
+            from storyprogress import StoryProgressRepository
+            if self.db is None:
+                from database import Database
+                self.db = Database()
+            self.progress_store = StoryProgressRepository(self.db)
+            self.sessao.vincular(self.progress_store)
+        return self.progress_store
+
     def set_background(self, image_path):
         """Configura o background da janela para preencher a tela."""
         if QFile.exists(image_path):
-            self.background_pixmap = QPixmap(image_path)
-            self.setStyleSheet("background: transparent;")
+            # Decodificada só na primeira pintura
+            self.background_path = image_path
         else:
-            self.background_pixmap = None
-            self.setStyleSheet("background-color: #2c3e50;")
+            self.background_path = None
+        definir_estado(self, "imagem", self.background_path is not None)
 
     def paintEvent(self, event):
         """Desenha o background, ajustando para cobrir a janela."""
         painter = QPainter(self)
-        if self.background_pixmap and not self.background_pixmap.isNull():
-            scaled_pixmap = self.background_pixmap.scaled(
+        if self.background_path:
+            # Reaproveita a versão já escalada enquanto o tamanho não muda
+            scaled_pixmap = cache_imagens.escalado(
+                self.background_path,
                 self.size(),
                 Qt.KeepAspectRatioByExpanding,
                 Qt.SmoothTransformation
@@ -205,9 +177,12 @@ class MenuScreen(QMainWindow):
 if __name__ == "__main__":
     import sys
     from PySide6.QtWidgets import QApplication
+    from session import UserSession
 
     app = QApplication(sys.argv)
-    window = MenuScreen("SeuApelidoAqui")
+    aplicar_tema(app)
+    # Sessão de demonstração, sem usuário no banco
+    window = MenuScreen(UserSession(None, "Seu Nome", "SeuApelidoAqui", ""))
     window.showMaximized()
     sys.exit(app.exec()) 
 
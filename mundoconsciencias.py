@@ -1,67 +1,130 @@
 import sys
+import time
 from PySide6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                              QLabel, QPushButton, QFrame, QSpacerItem, 
-                             QSizePolicy, QMessageBox, QScrollArea, QTabWidget,
-                             QGraphicsDropShadowEffect)
+                             QSizePolicy, QMessageBox, QTabWidget,
+                             QGraphicsDropShadowEffect, QStyle, QStyleOption)
 from PySide6.QtGui import (QPixmap, QPainter, QFont, QColor, QLinearGradient, 
                          QBrush, QIcon, QPen, QFontDatabase, QImage)
-from PySide6.QtCore import (Qt, QSize, Signal, QPoint, QTimer)
+from PySide6.QtCore import (Qt, QSize, Signal, QPoint, QTimer, QMargins)
+from cardshadow import pintar_sombra
+from iconcache import cache_icones
+from imagecache import cache_imagens
+from storyprogress import StoryStatusProjection
+from storylist import StoryListModel, StoryCardDelegate, StoryListView
+from theme import TOKENS, aplicar_tema, definir_estado, margens_sombra
+
+# Títulos das abas de status (a contagem é acrescentada entre parênteses)
+STATUS_TAB_TITLES = {
+    "not_started": "NÃO INICIADAS",
+    "in_progress": "EM ANDAMENTO",
+    "completed": "CONCLUÍDAS",
+}
+
+# Pasta com as histórias declaradas em JSON (ver storyengine)
+STORIES_DIR = "stories"
+
+# Histórias exibidas nas abas de status, na ordem de exibição
+STORY_CATALOG = [
+    ("elias_story", "O Julgamento de Elias"),
+    ("livia_story", "A Jornada da Dra. Lívia"),
+    ("inequality_story", "Desigualdade Social"),
+]
 
 class BackgroundWidget(QWidget):
     """Widget de fundo com efeito de desfoque e overlay escuro"""
     def __init__(self, background_image_path, parent=None):
         super().__init__(parent)
-        self.original_pixmap = QPixmap(background_image_path)
-        self.darken_factor = 0.6  # Intensidade do escurecimento
-        
-        if self.original_pixmap.isNull():
-            print(f"ERRO: Não foi possível carregar a imagem em: {background_image_path}")
-            # Fallback: fundo gradiente
-            self.original_pixmap = QPixmap(QSize(1920, 1080))
-            self.original_pixmap.fill(QColor(20, 25, 45))
+        # A imagem só é decodificada na primeira pintura
+        self.background_image_path = background_image_path
+        self._darken_factor = 0.6  # Intensidade do escurecimento
         
         self.setAttribute(Qt.WA_StyledBackground, False)
+
+    @property
+    def darken_factor(self):
+        return self._darken_factor
+
+    @darken_factor.setter
+    def darken_factor(self, valor):
+        if valor != self._darken_factor:
+            self._darken_factor = valor
+            self.update()
+
+    def _compor_fundo(self, largura, altura):
+        """Monta uma única vez a imagem escalada já com o overlay escuro"""
+        composto = QPixmap(largura, altura)
+        composto.fill(QColor(20, 25, 45))
+        
+        painter = QPainter(composto)
+        original_pixmap = cache_imagens.original(self.background_image_path)
+        if original_pixmap.isNull():
+            # Fallback: fica só o fundo sólido
+            print(f"ERRO: Não foi possível carregar a imagem em: {self.background_image_path}")
+        else:
+            scaled_pixmap = original_pixmap.scaled(
+                largura, altura,
+                Qt.AspectRatioMode.KeepAspectRatioByExpanding,
+                Qt.TransformationMode.SmoothTransformation
+            )
+            x = (largura - scaled_pixmap.width()) // 2
+            y = (altura - scaled_pixmap.height()) // 2
+            painter.drawPixmap(x, y, scaled_pixmap)
+        
+        # Overlay escuro para melhor contraste (retângulo alinhado, sem antialiasing)
+        painter.fillRect(0, 0, largura, altura, QColor(0, 0, 0, int(255 * self._darken_factor)))
+        painter.end()
+        return composto
         
     def paintEvent(self, event):
-        painter = QPainter(self)
-        painter.setRenderHint(QPainter.Antialiasing)
-        
-        # Desenha a imagem de fundo escalada
-        scaled_pixmap = self.original_pixmap.scaled(
-            self.size(), 
-            Qt.AspectRatioMode.KeepAspectRatioByExpanding,
-            Qt.TransformationMode.SmoothTransformation
+        largura, altura = self.width(), self.height()
+        if largura <= 0 or altura <= 0:
+            return
+        
+        # Recompõe apenas quando o tamanho ou o darken_factor mudam
+        composto = cache_imagens.obter(
+            ("fundo_escurecido", self.background_image_path, largura, altura, self._darken_factor),
+            lambda: self._compor_fundo(largura, altura)
         )
-        x = (self.width() - scaled_pixmap.width()) // 2
-        y = (self.height() - scaled_pixmap.height()) // 2
-        painter.drawPixmap(x, y, scaled_pixmap)
-        
-        # Overlay escuro para melhor contraste
-        overlay = QBrush(QColor(0, 0, 0, int(255 * self.darken_factor)))
-        painter.setBrush(overlay)
-        painter.setPen(Qt.NoPen)
-        painter.drawRect(self.rect())
-        
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, composto)
         painter.end()
 
 class GlassCard(QFrame):
     """Card com efeito de vidro (glassmorphism)"""
+    # Espaço em volta do vidro ocupado pela sombra (margin de QFrame#GlassCard no tema)
+    SHADOW_MARGINS = QMargins(*margens_sombra())
+    # O QGraphicsDropShadowEffect antigo (preto, alfa 160) tirava a sombra do alfa do
+    # vidro (0.4); pintada sob um retângulo opaco, a mesma sombra tem alfa 160 * 0.4
+    SHADOW_COLOR = QColor(0, 0, 0, 64)
+
     def __init__(self, parent=None):
         super().__init__(parent)
-        self.setStyleSheet("""
-            QFrame {
-                background-color: rgba(35, 40, 60, 0.4);
-                border-radius: 20px;
-                border: 1px solid rgba(255, 255, 255, 0.1);
-            }
-        """)
-        
-        # Efeito de sombra
-        shadow = QGraphicsDropShadowEffect()
-        shadow.setBlurRadius(15)
-        shadow.setColor(QColor(0, 0, 0, 160))
-        shadow.setOffset(0, 5)
-        self.setGraphicsEffect(shadow)
+        # Aparência definida na folha do tema (QFrame#GlassCard)
+        self.setObjectName("GlassCard")
+        # O vidro é pintado em paintEvent, depois da sombra, e não antes dele
+        self.setAttribute(Qt.WidgetAttribute.WA_NoSystemBackground)
+
+    def glass_rect(self):
+        """Retângulo do vidro, sem a margem da sombra"""
+        return self.rect().marginsRemoved(self.SHADOW_MARGINS)
+
+    def paintEvent(self, event):
+        """Sombra de nove partes pré-renderizadas na margem e o vidro por cima.
+
+        Substitui o QGraphicsDropShadowEffect, que renderizava o card fora da
+        tela e refazia o desfoque a cada repintura.
+        """
+        painter = QPainter(self)
+        desfoque = TOKENS["sombra_desfoque"]
+        sombra = self.glass_rect().translated(0, TOKENS["sombra_deslocamento"])
+        pintar_sombra(painter, sombra.adjusted(-desfoque, -desfoque, desfoque, desfoque), 20, desfoque,
+                      self.SHADOW_COLOR)
+        option = QStyleOption()
+        option.initFrom(self)
+        self.style().drawPrimitive(QStyle.PrimitiveElement.PE_Widget, option, painter, self)
+        painter.end()
+        super().paintEvent(event)
 
 class StoryCard(GlassCard):
     """Card interativo para cada história com efeito de vidro"""
@@ -74,10 +137,12 @@ class StoryCard(GlassCard):
         self.enabled = enabled
         
         self.setCursor(Qt.CursorShape.PointingHandCursor if enabled else Qt.CursorShape.ArrowCursor)
-        self.setFixedSize(320, 450)
+        # Tamanho do vidro mais a margem da sombra
+        self.setFixedSize(QSize(320, 450).grownBy(self.SHADOW_MARGINS))
         
         # Efeito de brilho na borda
-        self.border_gradient = QLinearGradient(0, 0, self.width(), 0)
+        glass = self.glass_rect()
+        self.border_gradient = QLinearGradient(glass.left(), 0, glass.right() + 1, 0)
         if enabled:
             self.border_gradient.setColorAt(0, QColor(255, 215, 0, 80))  # Dourado
             self.border_gradient.setColorAt(0.5, QColor(255, 20, 147, 80))  # Rosa
@@ -98,65 +163,32 @@ class StoryCard(GlassCard):
         
         # Título da história
         title_label = QLabel(title)
-        title_label.setStyleSheet("""
-            QLabel {
-                color: #FFD700;
-                font-size: 24px;
-                font-weight: bold;
-                text-align: center;
-                text-shadow: 1px 1px 3px rgba(0, 0, 0, 0.5);
-            }
-        """)
+        title_label.setObjectName("TituloCard")
         layout.addWidget(title_label)
         
         # Divider
         divider = QFrame()
         divider.setFrameShape(QFrame.HLine)
-        divider.setStyleSheet("border: 1px solid rgba(255, 255, 255, 0.1);")
+        divider.setObjectName("DivisorCard")
         layout.addWidget(divider)
         
         # Status
         status_label = QLabel("DISPONÍVEL" if enabled else "EM DESENVOLVIMENTO")
-        status_label.setStyleSheet("""
-            QLabel {
-                color: #AAAAAA;
-                font-size: 16px;
-                font-weight: bold;
-                text-align: center;
-                letter-spacing: 2px;
-            }
-        """)
+        status_label.setObjectName("StatusCard")
         layout.addWidget(status_label)
         
         layout.addStretch()
 
     def load_icon(self, icon_path):
         """Carrega o ícone com tratamento de fallback"""
-        pixmap = QPixmap(icon_path)
+        pixmap = cache_icones.circular(icon_path, 180)
         if pixmap.isNull():
             # Fallback: ícone padrão
             self.icon_label.setText("📖")
-            self.icon_label.setStyleSheet("""
-                QLabel {
-                    font-size: 80px;
-                    color: rgba(255, 255, 255, 0.7);
-                }
-            """)
+            self.icon_label.setObjectName("IconeReserva")
         else:
-            # Ícone circular com borda
-            mask = QPixmap(pixmap.size())
-            mask.fill(Qt.transparent)
-            
-            painter = QPainter(mask)
-            painter.setRenderHint(QPainter.Antialiasing)
-            painter.setBrush(Qt.white)
-            painter.drawEllipse(mask.rect())
-            painter.end()
-            
-            pixmap.setMask(mask.mask())
-            self.icon_label.setPixmap(pixmap.scaled(180, 180, 
-                                                 Qt.AspectRatioMode.KeepAspectRatio,
-                                                 Qt.TransformationMode.SmoothTransformation))
+            # Já recortado em círculo e escalado (cache em memória e em disco)
+            self.icon_label.setPixmap(pixmap)
 
     def paintEvent(self, event):
         """Personaliza a pintura para adicionar borda gradiente"""
@@ -169,11 +201,14 @@ class StoryCard(GlassCard):
         pen = QPen(QBrush(self.border_gradient), 3)
         painter.setPen(pen)
         painter.setBrush(Qt.NoBrush)
-        painter.drawRoundedRect(self.rect().adjusted(1, 1, -1, -1), 20, 20)
+        painter.drawRoundedRect(self.glass_rect().adjusted(1, 1, -1, -1), 20, 20)
         painter.end()
 
     def mousePressEvent(self, event):
-        if event.button() == Qt.MouseButton.LeftButton and self.enabled:
+        if not self.glass_rect().contains(event.position().toPoint()):
+            # Clique na sombra
+            super().mousePressEvent(event)
+        elif event.button() == Qt.MouseButton.LeftButton and self.enabled:
             self.clicked.emit(self.story_id)
         elif event.button() == Qt.MouseButton.LeftButton and not self.enabled:
             # Efeito visual ao clicar em história em desenvolvimento
@@ -185,27 +220,16 @@ class StoryCard(GlassCard):
 
     def animate_click(self):
         """Animação de clique para feedback visual"""
-        self.setStyleSheet("""
-            QFrame {
-                background-color: rgba(50, 55, 80, 0.6);
-                border-radius: 20px;
-                border: 1px solid rgba(255, 255, 255, 0.2);
-            }
-        """)
-        QTimer.singleShot(200, lambda: self.setStyleSheet("""
-            QFrame {
-                background-color: rgba(35, 40, 60, 0.4);
-                border-radius: 20px;
-                border: 1px solid rgba(255, 255, 255, 0.1);
-            }
-        """))
+        # Troca de estado pela propriedade; as regras já estão na folha do tema
+        definir_estado(self, "pressionado", True, filhos=True)
+        QTimer.singleShot(200, lambda: definir_estado(self, "pressionado", False, filhos=True))
 
 class ModernButton(QPushButton):
-    """Botão moderno com gradiente e efeitos"""
-    def __init__(self, text, color1, color2, parent=None):
+    """Botão moderno com gradiente e efeitos (cores em theme.BUTTON_VARIANTS)"""
+    def __init__(self, text, variante="ardosia", parent=None):
         super().__init__(text, parent)
-        self.color1 = color1
-        self.color2 = color2
+        self.setObjectName("ModernButton")
+        self.setProperty("variante", variante)
         
         self.setCursor(Qt.CursorShape.PointingHandCursor)
         self.setFixedHeight(50)
@@ -216,49 +240,17 @@ class ModernButton(QPushButton):
         shadow.setColor(QColor(0, 0, 0, 120))
         shadow.setOffset(0, 3)
         self.setGraphicsEffect(shadow)
-        
-        self.update_style()
-    
-    def update_style(self):
-        self.setStyleSheet(f"""
-            QPushButton {{
-                background-color: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                    stop:0 {self.color1}, stop:1 {self.color2});
-                color: white;
-                border-radius: 25px;
-                font: bold 16px;
-                padding: 0 25px;
-                border: none;
-            }}
-            QPushButton:hover {{
-                background-color: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                    stop:0 {self.lighter_color(self.color1)}, stop:1 {self.lighter_color(self.color2)});
-            }}
-            QPushButton:pressed {{
-                background-color: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                    stop:0 {self.darker_color(self.color1)}, stop:1 {self.darker_color(self.color2)});
-                padding-top: 2px;
-            }}
-        """)
-    
-    def lighter_color(self, hex_color, factor=0.2):
-        """Clareia a cor para o efeito hover"""
-        color = QColor(hex_color)
-        return color.lighter(int(100 + factor * 100)).name()
-    
-    def darker_color(self, hex_color, factor=0.2):
-        """Escurece a cor para o efeito pressed"""
-        color = QColor(hex_color)
-        return color.darker(int(100 + factor * 100)).name()
 
 class WorldOfConsciousnessScreen(QMainWindow):
     """Tela principal do Mundo de Consciências - Versão Premium"""
     go_back_to_menu = Signal()
     
-    def __init__(self, db, user_apelido, parent=None):
+    def __init__(self, db, sessao, parent=None):
         super().__init__(parent)
         self.db = db
-        self.user_apelido = user_apelido
+        # Usuário autenticado (session.UserSession) recebido do menu
+        self.sessao = sessao
+        self.user_apelido = sessao.apelido
         self.selected_mode = None
         
         # Configuração da janela
@@ -285,7 +277,15 @@ class WorldOfConsciousnessScreen(QMainWindow):
         # Cards principais das histórias
         self.setup_main_stories(main_layout)
         
-        # Abas de status das histórias
+        # Abas de status das histórias (uma consulta carrega os três status)
+        self.status_projection = StoryStatusProjection(db, self.user_apelido, STORY_CATALOG,
+                                                       ao_alterar=self._schedule_refresh)
+        self.story_rows = {}
+        self.status_tabs = {}
+        self._refresh_scheduled = False
+        # Medição: recebe (duração em ms, histórias alteradas) a cada atualização
+        self.refresh_hook = None
+        self.last_refresh_ms = 0.0
         self.setup_story_tabs(main_layout)
         
         # Referências para telas secundárias
@@ -310,7 +310,7 @@ class WorldOfConsciousnessScreen(QMainWindow):
         top_bar_layout.setContentsMargins(30, 10, 30, 10)
         
         # Botão de voltar
-        back_btn = ModernButton("Voltar ao Menu Principal", "#6A5ACD", "#9370DB")
+        back_btn = ModernButton("Voltar ao Menu Principal", "ardosia")
         back_btn.setIcon(QIcon("assets/icons/back_icon.png"))
         back_btn.setIconSize(QSize(24, 24))
         back_btn.clicked.connect(self.go_back_to_menu.emit)
@@ -319,15 +319,7 @@ class WorldOfConsciousnessScreen(QMainWindow):
         # Título
         title_label = QLabel("MUNDO DE CONSCIÊNCIAS")
         title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        title_label.setStyleSheet("""
-            QLabel {
-                color: #FFD700;
-                font-size: 32px;
-                font-weight: bold;
-                text-shadow: 2px 2px 8px rgba(0, 0, 0, 0.7);
-                letter-spacing: 3px;
-            }
-        """)
+        title_label.setObjectName("TituloTela")
         top_bar_layout.addWidget(title_label, 1)
         
         # Espaçador para alinhamento
@@ -346,31 +338,19 @@ class WorldOfConsciousnessScreen(QMainWindow):
         
         # Título da seção
         section_label = QLabel("SELECIONE O MODO:")
-        section_label.setStyleSheet("""
-            QLabel {
-                color: #AAAAAA;
-                font-size: 18px;
-                font-weight: bold;
-                letter-spacing: 2px;
-            }
-        """)
+        section_label.setObjectName("RotuloSecao")
         mode_layout.addWidget(section_label)
         mode_layout.addSpacing(40)
         
         # Indicador do Modo 1
         self.mode1_indicator = QLabel()
         self.mode1_indicator.setFixedSize(30, 30)
-        self.mode1_indicator.setStyleSheet("""
-            QLabel {
-                background-color: transparent;
-                border: 2px solid #FFD700;
-                border-radius: 15px;
-            }
-        """)
+        self.mode1_indicator.setObjectName("IndicadorModo")
+        self.mode1_indicator.setProperty("variante", "dourado")
         mode_layout.addWidget(self.mode1_indicator)
         
         # Botão do Modo 1
-        self.mode1_btn = ModernButton("MODO TRADICIONAL", "#FF8C00", "#FFD700")
+        self.mode1_btn = ModernButton("MODO TRADICIONAL", "dourado")
         self.mode1_btn.setFixedWidth(250)
         self.mode1_btn.clicked.connect(lambda: self.select_mode("modo1"))
         mode_layout.addWidget(self.mode1_btn)
@@ -379,17 +359,12 @@ class WorldOfConsciousnessScreen(QMainWindow):
         # Indicador do Modo 2
         self.mode2_indicator = QLabel()
         self.mode2_indicator.setFixedSize(30, 30)
-        self.mode2_indicator.setStyleSheet("""
-            QLabel {
-                background-color: transparent;
-                border: 2px solid #9370DB;
-                border-radius: 15px;
-            }
-        """)
+        self.mode2_indicator.setObjectName("IndicadorModo")
+        self.mode2_indicator.setProperty("variante", "violeta")
         mode_layout.addWidget(self.mode2_indicator)
         
         # Botão do Modo 2
-        self.mode2_btn = ModernButton("MODO TEMPORIZADO", "#8A2BE2", "#9370DB")
+        self.mode2_btn = ModernButton("MODO TEMPORIZADO", "violeta")
         self.mode2_btn.setFixedWidth(250)
         self.mode2_btn.clicked.connect(lambda: self.select_mode("modo2"))
         mode_layout.addWidget(self.mode2_btn)
@@ -407,15 +382,7 @@ class WorldOfConsciousnessScreen(QMainWindow):
         
         # Título da seção
         section_title = QLabel("EXPLORE AS HISTÓRIAS")
-        section_title.setStyleSheet("""
-            QLabel {
-                color: #FFD700;
-                font-size: 24px;
-                font-weight: bold;
-                text-shadow: 1px 1px 5px rgba(0, 0, 0, 0.5);
-                letter-spacing: 2px;
-            }
-        """)
+        section_title.setObjectName("TituloSecao")
         main_layout.addWidget(section_title)
         
         # Card da história de Elias
@@ -451,31 +418,7 @@ class WorldOfConsciousnessScreen(QMainWindow):
     def setup_story_tabs(self, main_layout):
         """Configura as abas de status das histórias premium"""
         self.tab_widget = QTabWidget()
-        self.tab_widget.setStyleSheet("""
-            QTabWidget::pane {
-                border: none;
-                background-color: rgba(30, 35, 50, 0.5);
-                border-radius: 15px;
-            }
-            QTabBar::tab {
-                background-color: rgba(60, 65, 90, 0.7);
-                color: #CCCCCC;
-                padding: 15px 30px;
-                border-top-left-radius: 10px;
-                border-top-right-radius: 10px;
-                border: 1px solid rgba(255, 255, 255, 0.1);
-                font-size: 16px;
-                font-weight: bold;
-            }
-            QTabBar::tab:selected {
-                background-color: rgba(80, 85, 120, 0.9);
-                color: #FFD700;
-                border-bottom: 3px solid #FFD700;
-            }
-            QTabBar::tab:hover {
-                background-color: rgba(90, 95, 130, 0.8);
-            }
-        """)
+        self.tab_widget.setObjectName("AbasStatus")
         
         # Efeito de sombra nas abas
         tab_shadow = QGraphicsDropShadowEffect()
@@ -484,20 +427,30 @@ class WorldOfConsciousnessScreen(QMainWindow):
         tab_shadow.setOffset(0, 5)
         self.tab_widget.setGraphicsEffect(tab_shadow)
         
+        # Um único delegate pinta as linhas de todas as abas
+        self.story_delegate = StoryCardDelegate(playable_ids={"elias_story"}, parent=self)  # Só Elias está implementado
+        self.story_delegate.action_clicked.connect(self.open_story)
+
         # Aba de histórias não iniciadas
         self.not_started_tab = QWidget()
         self.setup_story_tab(self.not_started_tab, "not_started")
-        self.tab_widget.addTab(self.not_started_tab, "NÃO INICIADAS")
+        self.tab_widget.addTab(self.not_started_tab, STATUS_TAB_TITLES["not_started"])
+        self.status_tabs["not_started"] = self.not_started_tab
+        self._update_tab_count("not_started")
         
         # Aba de histórias em andamento
         self.in_progress_tab = QWidget()
         self.setup_story_tab(self.in_progress_tab, "in_progress")
-        self.tab_widget.addTab(self.in_progress_tab, "EM ANDAMENTO")
+        self.tab_widget.addTab(self.in_progress_tab, STATUS_TAB_TITLES["in_progress"])
+        self.status_tabs["in_progress"] = self.in_progress_tab
+        self._update_tab_count("in_progress")
         
         # Aba de histórias concluídas
         self.completed_tab = QWidget()
         self.setup_story_tab(self.completed_tab, "completed")
-        self.tab_widget.addTab(self.completed_tab, "CONCLUÍDAS")
+        self.tab_widget.addTab(self.completed_tab, STATUS_TAB_TITLES["completed"])
+        self.status_tabs["completed"] = self.completed_tab
+        self._update_tab_count("completed")
         
         main_layout.addWidget(self.tab_widget, 1)
 
@@ -506,225 +459,33 @@ class WorldOfConsciousnessScreen(QMainWindow):
         layout = QVBoxLayout(tab)
         layout.setContentsMargins(30, 30, 30, 30)
         
-        scroll_area = QScrollArea()
-        scroll_area.setWidgetResizable(True)
-        scroll_area.setStyleSheet("""
-            QScrollArea {
-                border: none;
-                background-color: transparent;
-            }
-            QScrollBar:vertical {
-                background: rgba(50, 55, 80, 0.3);
-                width: 12px;
-                margin: 0px;
-            }
-            QScrollBar::handle:vertical {
-                background: rgba(255, 215, 0, 0.5);
-                min-height: 20px;
-                border-radius: 6px;
-            }
-            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
-                height: 0px;
-            }
-        """)
-        
-        container = QWidget()
-        container_layout = QVBoxLayout(container)
-        container_layout.setContentsMargins(0, 0, 0, 0)
-        container_layout.setSpacing(25)
-        
-        # Adiciona histórias de exemplo baseadas no status
-        stories = self.get_stories_by_status(status)
-        
-        if not stories:
-            no_stories_label = QLabel(f"Nenhuma história {status.replace('_', ' ').lower()}")
-            no_stories_label.setStyleSheet("""
-                QLabel {
-                    color: #666688;
-                    font-size: 20px;
-                    font-style: italic;
-                    padding: 50px 0;
-                }
-            """)
-            no_stories_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-            container_layout.addWidget(no_stories_label)
-        else:
-            for story in stories:
-                story_widget = self.create_story_status_widget(story)
-                container_layout.addWidget(story_widget)
-        
-        container_layout.addStretch()
-        scroll_area.setWidget(container)
-        layout.addWidget(scroll_area)
+        # Mensagem de aba vazia
+        no_stories_label = QLabel(f"Nenhuma história {status.replace('_', ' ').lower()}")
+        no_stories_label.setObjectName("AbaVazia")
+        no_stories_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        layout.addWidget(no_stories_label)
+
+        # Lista virtualizada: só as linhas visíveis são pintadas, sem widgets por história
+        model = StoryListModel(self.get_stories_by_status(status), parent=self)
+        list_view = StoryListView(model, self.story_delegate)
+        layout.addWidget(list_view, 1)
+
+        self.story_rows[status] = (model, list_view, no_stories_label)
+        self._update_empty_state(status)
 
     def get_stories_by_status(self, status):
-        """Retorna histórias baseadas no status (mock para demonstração)"""
-        # Na implementação real, isso viria do banco de dados
-        if status == "not_started":
-            return [
-                {"id": "livia_story", "title": "A Jornada da Dra. Lívia", "status": status},
-                {"id": "inequality_story", "title": "Desigualdade Social", "status": status}
-            ]
-        elif status == "in_progress":
-            return [
-                {"id": "elias_story", "title": "O Julgamento de Elias", "status": status, 
-                 "progress": "Capítulo 2", "completion": "40%"}
-            ]
-        elif status == "completed":
-            return []
-        return []
-
-    def create_story_status_widget(self, story):
-        """Cria um widget premium para exibir o status de uma história"""
-        widget = GlassCard()
-        widget.setFixedHeight(120)
-        
-        layout = QHBoxLayout(widget)
-        layout.setContentsMargins(20, 15, 20, 15)
-        
-        # Ícone da história
-        icon_label = QLabel()
-        icon_pixmap = QPixmap(f"assets/stories/{story['id']}_icon.png")
-        if icon_pixmap.isNull():
-            icon_label.setText("📖")
-            icon_label.setStyleSheet("font-size: 40px; color: rgba(255, 255, 255, 0.7);")
-        else:
-            icon_label.setPixmap(icon_pixmap.scaled(80, 80, Qt.AspectRatioMode.KeepAspectRatio, 
-                                                 Qt.TransformationMode.SmoothTransformation))
-        icon_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        layout.addWidget(icon_label)
-        layout.addSpacing(20)
-        
-        # Informações da história
-        info_layout = QVBoxLayout()
-        info_layout.setSpacing(8)
-        
-        # Título e progresso
-        title_layout = QHBoxLayout()
-        
-        title_label = QLabel(story["title"])
-        title_label.setStyleSheet("""
-            QLabel {
-                color: #FFD700;
-                font-size: 18px;
-                font-weight: bold;
-            }
-        """)
-        title_layout.addWidget(title_label)
-        title_layout.addStretch()
-        
-        if "completion" in story:
-            progress_label = QLabel(story["completion"])
-            progress_label.setStyleSheet("""
-                QLabel {
-                    color: #AAAAAA;
-                    font-size: 14px;
-                    font-weight: bold;
-                    background-color: rgba(70, 70, 100, 0.5);
-                    padding: 3px 10px;
-                    border-radius: 10px;
-                }
-            """)
-            title_layout.addWidget(progress_label)
-        
-        info_layout.addLayout(title_layout)
-        
-        # Barra de progresso customizada
-        if "progress" in story:
-            progress_bar = QFrame()
-            progress_bar.setFixedHeight(8)
-            progress_bar.setStyleSheet("""
-                QFrame {
-                    background-color: rgba(70, 70, 100, 0.5);
-                    border-radius: 4px;
-                }
-            """)
-            
-            # Barra de progresso interna
-            inner_progress = QFrame(progress_bar)
-            progress_width = 200 if story["id"] == "elias_story" else 0
-            inner_progress.setGeometry(0, 0, progress_width, 8)
-            inner_progress.setStyleSheet("""
-                QFrame {
-                    background-color: qlineargradient(x1:0, y1:0, x2:1, y2:0,
-                        stop:0 #FF8C00, stop:1 #FFD700);
-                    border-radius: 4px;
-                }
-            """)
-            
-            info_layout.addWidget(progress_bar)
-            
-            # Texto de progresso
-            progress_text = QLabel(f"Progresso: {story['progress']}")
-            progress_text.setStyleSheet("""
-                QLabel {
-                    color: #AAAAAA;
-                    font-size: 14px;
-                }
-            """)
-            info_layout.addWidget(progress_text)
-        
-        layout.addLayout(info_layout, 1)
-        
-        # Botão de ação
-        action_btn = ModernButton(
-            "Continuar" if story["status"] == "in_progress" else "Iniciar",
-            "#6A5ACD", "#9370DB"
-        )
-        action_btn.setFixedWidth(120)
-        action_btn.setEnabled(story["id"] == "elias_story")  # Só Elias está implementado
-        action_btn.clicked.connect(lambda: self.open_story(story["id"]))
-        layout.addWidget(action_btn)
-        
-        return widget
+        """Retorna as histórias de um status a partir da projeção em memória"""
+        return self.status_projection.stories(status)
 
     def select_mode(self, mode):
         """Seleciona o modo de jogo (1 ou 2) com animação"""
         self.selected_mode = mode
         
-        # Animação de seleção
-        if mode == "modo1":
-            self.mode1_indicator.setStyleSheet("""
-                QLabel {
-                    background-color: #FFD700;
-                    border: 2px solid #FFD700;
-                    border-radius: 15px;
-                }
-            """)
-            self.mode2_indicator.setStyleSheet("""
-                QLabel {
-                    background-color: transparent;
-                    border: 2px solid #9370DB;
-                    border-radius: 15px;
-                }
-            """)
-            self.mode1_btn.setStyleSheet(self.mode1_btn.styleSheet() + """
-                QPushButton {
-                    border: 2px solid #FFD700;
-                }
-            """)
-            self.mode2_btn.setStyleSheet(self.mode2_btn.styleSheet().replace("border: 2px solid #9370DB;", ""))
-        else:
-            self.mode1_indicator.setStyleSheet("""
-                QLabel {
-                    background-color: transparent;
-                    border: 2px solid #FFD700;
-                    border-radius: 15px;
-                }
-            """)
-            self.mode2_indicator.setStyleSheet("""
-                QLabel {
-                    background-color: #9370DB;
-                    border: 2px solid #9370DB;
-                    border-radius: 15px;
-                }
-            """)
-            self.mode2_btn.setStyleSheet(self.mode2_btn.styleSheet() + """
-                QPushButton {
-                    border: 2px solid #9370DB;
-                }
-            """)
-            self.mode1_btn.setStyleSheet(self.mode1_btn.styleSheet().replace("border: 2px solid #FFD700;", ""))
+        # Só a propriedade "selecionado" muda; nenhuma folha de estilo é reanalisada
+        for modo, botao, indicador in (("modo1", self.mode1_btn, self.mode1_indicator),
+                                       ("modo2", self.mode2_btn, self.mode2_indicator)):
+            definir_estado(botao, "selecionado", modo == mode)
+            definir_estado(indicador, "selecionado", modo == mode)
         
         print(f"Modo selecionado: {mode}")
 
@@ -752,43 +513,99 @@ class WorldOfConsciousnessScreen(QMainWindow):
         # Efeito de clique no card
         self.elias_card.animate_click()
         
-        # Simula a abertura da história
+        # Modo temporizado guarda o progresso separado do modo clássico
+        progress_id = "elias_story_timed" if self.selected_mode == "modo2" else "elias_story"
         print(f"Abrindo história de Elias no modo {self.selected_mode}")
-        
-        # Janela de demonstração
-        msg = QMessageBox()
-        msg.setWindowTitle("História de Elias")
-        msg.setText(f"História de Elias será aberta no Modo {self.selected_mode}")
-        msg.setIcon(QMessageBox.Icon.Information)
-        
-        # Personaliza a mensagem
-        msg.setStyleSheet("""
-            QMessageBox {
-                background-color: rgba(40, 45, 60, 0.9);
-                color: white;
-            }
-            QLabel {
-                color: #FFD700;
-                font-size: 18px;
-            }
-            QPushButton {
-                background-color: #6A5ACD;
-                color: white;
-                border-radius: 10px;
-                padding: 5px 15px;
-                min-width: 80px;
-            }
-            QPushButton:hover {
-                background-color: #9370DB;
-            }
-        """)
-        
-        msg.exec_()
+
+        # Fecha a janela anterior deste progresso antes de abrir de novo: ela
+        # solta o pacote mapeado, que pode precisar ser regravado agora
+        previous_window = self.story_windows.pop(progress_id, None)
+        if previous_window is not None:
+            previous_window.close()
+
+        story = self.load_story("elias_story")
+        if story is None:
+            QMessageBox.critical(self, "Erro", "Não foi possível carregar a história de Elias.")
+            return
+
+        # Retoma do último capítulo salvo, se a história estiver em andamento
+        saved = self.db.get_story_progress(self.user_apelido, progress_id)
+        start_node = None
+        if saved and saved.get("story_state") == "in_progress" and story.has_node(saved.get("last_chapter")):
+            start_node = saved["last_chapter"]
+
+        from decisiontimer import DECISION_SECONDS
+        from storyscreen import StoryScreen
+        decision_seconds = DECISION_SECONDS if self.selected_mode == "modo2" else None
+        story_window = StoryScreen(story, self.db, self.user_apelido, progress_id, start_node, decision_seconds)
+        self.story_windows[progress_id] = story_window
+        story_window.showMaximized()
+
+    def load_story(self, story_id):
+        """Carrega a história pelo pacote binário (ou pelo JSON, se o pacote estiver desatualizado)"""
+        from storybundle import open_story as open_story_file
+        try:
+            return open_story_file(f"{STORIES_DIR}/{story_id}.json")
+        except (OSError, ValueError) as e:
+            print(f"Erro ao carregar a história {story_id}: {e}")
+            return None
+
+    def _schedule_refresh(self):
+        """Chamado a cada progresso salvo; várias gravações seguidas viram uma atualização"""
+        if not self._refresh_scheduled:
+            self._refresh_scheduled = True
+            QTimer.singleShot(0, self.refresh_story_status)
 
     def refresh_story_status(self):
-        """Atualiza o status das histórias (será chamado quando retornar de uma história)"""
-        # TODO: Implementar atualização do banco de dados
-        pass
+        """Atualiza o status das histórias (chamado quando retornar de uma história)"""
+        self._refresh_scheduled = False
+        start = time.perf_counter()
+
+        # Só as histórias salvas desde a última atualização são refeitas
+        changes = self.status_projection.consumir_alteracoes()
+        touched = set()
+        for story_id, previous_status, status in changes:
+            if previous_status == status:
+                # Mesmo status: atualiza a linha no lugar
+                model, _, _ = self.story_rows[status]
+                story = next(s for s in self.get_stories_by_status(status) if s["id"] == story_id)
+                model.update_story(story)
+                continue
+            if previous_status is not None:
+                self._remove_story_row(previous_status, story_id)
+                touched.add(previous_status)
+            self._insert_story_row(status, story_id)
+            touched.add(status)
+
+        for status in touched:
+            self._update_tab_count(status)
+
+        self.last_refresh_ms = (time.perf_counter() - start) * 1000
+        if self.refresh_hook is not None:
+            self.refresh_hook(self.last_refresh_ms, len(changes))
+
+    def _remove_story_row(self, status, story_id):
+        model, _, _ = self.story_rows[status]
+        model.remove_story(story_id)
+        self._update_empty_state(status)
+
+    def _insert_story_row(self, status, story_id):
+        model, _, _ = self.story_rows[status]
+        stories = self.get_stories_by_status(status)
+        position = next(i for i, story in enumerate(stories) if story["id"] == story_id)
+        model.insert_story(position, stories[position])
+        self._update_empty_state(status)
+
+    def _update_tab_count(self, status):
+        index = self.tab_widget.indexOf(self.status_tabs[status])
+        count = self.status_projection.contagem(status)
+        self.tab_widget.setTabText(index, f"{STATUS_TAB_TITLES[status]} ({count})")
+
+    def _update_empty_state(self, status):
+        model, list_view, no_stories_label = self.story_rows[status]
+        empty = model.rowCount() == 0
+        no_stories_label.setVisible(empty)
+        list_view.setVisible(not empty)
 
 # Classe de mock para o banco de dados para teste
 class MockDatabase:
@@ -814,19 +631,46 @@ class MockDatabase:
             }
         }
 
+        self.listeners = []
+        self.choices = []
+
     def get_user_profile(self, apelido):
         return self.users.get(apelido, {})
 
+    def salvar_perfil(self, user_apelido, atributos):
+        self.users.setdefault(user_apelido, {"apelido": user_apelido}).update(atributos)
+        return True
+
+    def registrar_escolha(self, user_apelido, story_id, node, choice, elapsed_ms, modo="modo1"):
+        self.choices.append((user_apelido, story_id, node, choice, elapsed_ms, modo))
+        return True
+
     def get_story_progress(self, user_apelido, story_id):
         return self.story_progress.get(user_apelido, {}).get(story_id)
 
-    def save_story_progress(self, user_apelido, story_id, story_state, last_chapter):
+    def carregar_por_status(self, user_apelido):
+        by_status = {}
+        for story_id, progress in self.story_progress.get(user_apelido, {}).items():
+            if progress:
+                by_status.setdefault(progress["story_state"], {})[story_id] = progress
+        return by_status
+
+    def adicionar_ouvinte(self, listener):
+        self.listeners.append(listener)
+
+    def remover_ouvinte(self, listener):
+        self.listeners.remove(listener)
+
+    def save_story_progress(self, user_apelido, story_id, story_state, last_chapter, progress=None):
         if user_apelido not in self.story_progress:
             self.story_progress[user_apelido] = {}
         self.story_progress[user_apelido][story_id] = {
             "story_state": story_state, 
-            "last_chapter": last_chapter
+            "last_chapter": last_chapter,
+            "progress": progress
         }
+        for listener in list(self.listeners):
+            listener(user_apelido, story_id, story_state, last_chapter, progress)
 
 # Código para testar a aplicação
 if __name__ == "__main__":
@@ -856,12 +700,17 @@ if __name__ == "__main__":
     dark_palette.setColor(QPalette.ColorRole.HighlightedText, QColor(255, 255, 255))
     
     app.setPalette(dark_palette)
+    aplicar_tema(app)
     
     # Criar uma instância mock do banco de dados
     mock_db = MockDatabase()
     
     # Criar e mostrar a tela principal
-    main_window = WorldOfConsciousnessScreen(mock_db, "TestUser")
+    from session import UserSession
+    main_window = WorldOfConsciousnessScreen(mock_db, UserSession(None, "Aventureiro", "TestUser", ""))
+    if "--medir-atualizacao" in sys.argv:
+        main_window.refresh_hook = lambda ms, alteradas: print(
+            f"Atualização das abas: {alteradas} história(s) em {ms:.2f} ms")
     main_window.showMaximized()
     
     sys.exit(app.exec())
@@ -0,0 +1,85 @@
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from PySide6.QtCore import Qt, QSize
+from PySide6.QtGui import QImage, QPixmap
+
+from imagecache import cache_imagens
+
+# Tamanho em que a tela da história mostra a imagem do nó
+NODE_IMAGE_SIZE = QSize(600, 300)
+
+
+def decodificar(caminho, tamanho):
+    """Lê e escala a imagem; QImage (ao contrário de QPixmap) pode ser usada fora da thread da interface"""
+    imagem = QImage(caminho)
+    if imagem.isNull():
+        return imagem
+    return imagem.scaled(tamanho, Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+
+
+class NodePrefetcher:
+    """Decodifica em segundo plano as imagens dos nós alcançáveis pelo nó atual.
+
+    Ao entrar num nó, as imagens de todos os destinos das escolhas são
+    lidas e escaladas numa thread auxiliar e guardadas como QImage num
+    cache LRU limitado. Quando a escolha é feita, pixmap() só converte a
+    imagem pronta em QPixmap (na thread da interface) e a entrega ao
+    cache_imagens, com a mesma chave de cache_imagens.escalado.
+    """
+
+    def __init__(self, story, tamanho=NODE_IMAGE_SIZE, limite=24, trabalhadores=2):
+        self.story = story
+        self.tamanho = QSize(tamanho)
+        self.limite = limite
+        self._executor = ThreadPoolExecutor(max_workers=trabalhadores, thread_name_prefix="prefetch")
+        # caminho -> Future[QImage], do menos para o mais recente
+        self._imagens = OrderedDict()
+        # Imagem já pronta na memória quando pedida
+        self.acertos = 0
+        # Ainda sendo decodificada quando pedida (espera só o que falta)
+        self.esperas = 0
+        # Não tinha sido antecipada: decodificada na thread da interface
+        self.falhas = 0
+
+    def _chave(self, caminho):
+        return ("escalado", caminho, self.tamanho.width(), self.tamanho.height(),
+                Qt.AspectRatioMode.KeepAspectRatio, Qt.TransformationMode.SmoothTransformation)
+
+    def entrar(self, node):
+        """Agenda as imagens dos destinos de todas as escolhas do nó"""
+        story = self.story
+        for escolha in range(story.choice_count(node)):
+            caminho = story.image(story.choice_target(node, escolha))
+            if not caminho:
+                continue
+            if caminho in self._imagens:
+                self._imagens.move_to_end(caminho)
+            elif not cache_imagens.contem(self._chave(caminho)):
+                self._imagens[caminho] = self._executor.submit(decodificar, caminho, self.tamanho)
+        while len(self._imagens) > self.limite:
+            _, futuro = self._imagens.popitem(last=False)
+            futuro.cancel()
+
+    def pixmap(self, caminho):
+        """Pixmap da imagem do nó no tamanho da tela, antecipado quando possível"""
+        chave = self._chave(caminho)
+        futuro = self._imagens.pop(caminho, None)
+        if cache_imagens.contem(chave):
+            self.acertos += 1
+            return cache_imagens.obter(chave, QPixmap)
+        if futuro is None:
+            self.falhas += 1
+            imagem = decodificar(caminho, self.tamanho)
+        else:
+            if futuro.done():
+                self.acertos += 1
+            else:
+                self.esperas += 1
+            imagem = futuro.result()
+        return cache_imagens.obter(chave, lambda: QPixmap.fromImage(imagem))
+
+    def close(self):
+        """Descarta o que ainda não foi decodificado e libera as threads"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        self._imagens.clear()
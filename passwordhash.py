@@ -0,0 +1,115 @@
+import base64
+import hashlib
+import hmac
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+ALGORITHMS = ("scrypt", "pbkdf2_sha256")
+# hashlib.scrypt depende de o Python ter sido compilado com OpenSSL 1.1+
+DEFAULT_ALGORITHM = "scrypt" if hasattr(hashlib, "scrypt") else "pbkdf2_sha256"
+# Custos atuais; subir estes valores faz as senhas antigas serem regravadas no próximo login
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+PBKDF2_ITERATIONS = 600_000
+# Custos reduzidos (~64x menores) para importações em massa, só quando pedidos
+# (usuarioscli importar --custo-reduzido): cada senha ainda é derivada com sal
+# e o primeiro login a regrava com os custos atuais, mas contas que nunca
+# entram ficam com o hash fraco
+IMPORT_SCRYPT_N = 2 ** 8
+IMPORT_PBKDF2_ITERATIONS = 6_000
+SALT_BYTES = 16
+HASH_BYTES = 32
+
+
+def _b64(dados: bytes) -> str:
+    return base64.b64encode(dados).decode("ascii").rstrip("=")
+
+
+def _de_b64(texto: str) -> bytes:
+    return base64.b64decode(texto + "=" * (-len(texto) % 4), validate=True)
+
+
+class PasswordHasher:
+    """Gera e confere senhas no formato algoritmo$parâmetros$sal$hash.
+
+    Os parâmetros ficam gravados em cada senha, então o custo pode subir
+    com o tempo: senhas com parâmetros antigos continuam válidas e
+    precisa_atualizar indica quando regravá-las com os atuais. Senhas
+    antigas em texto puro (sem o formato) também são aceitas.
+    """
+
+    def __init__(self, algoritmo: str = DEFAULT_ALGORITHM, n: int = SCRYPT_N, r: int = SCRYPT_R,
+                 p: int = SCRYPT_P, iteracoes: int = PBKDF2_ITERATIONS) -> None:
+        if algoritmo not in ALGORITHMS:
+            raise ValueError(f"Algoritmo de senha desconhecido: {algoritmo}")
+        self.algoritmo = algoritmo
+        self.parametros: Dict[str, int] = {"n": n, "r": r, "p": p} if algoritmo == "scrypt" else {"i": iteracoes}
+
+    @classmethod
+    def para_importacao(cls, algoritmo: str = DEFAULT_ALGORITHM) -> "PasswordHasher":
+        """Hasher com os custos reduzidos de IMPORT_*; mais fraco até o primeiro login de cada conta"""
+        return cls(algoritmo, n=IMPORT_SCRYPT_N, iteracoes=IMPORT_PBKDF2_ITERATIONS)
+
+    @staticmethod
+    def _derivar(algoritmo: str, parametros: Dict[str, int], senha: str, sal: bytes) -> bytes:
+        dados = senha.encode("utf-8")
+        if algoritmo == "scrypt":
+            n, r, p = parametros["n"], parametros["r"], parametros["p"]
+            # Memória usada pelo scrypt (o padrão de 32 MiB do hashlib não cabe custos maiores)
+            return hashlib.scrypt(dados, salt=sal, n=n, r=r, p=p, maxmem=128 * r * (n + p + 2) + 65536,
+                                  dklen=HASH_BYTES)
+        return hashlib.pbkdf2_hmac("sha256", dados, sal, parametros["i"], HASH_BYTES)
+
+    @staticmethod
+    def codificada(valor: str) -> bool:
+        """Se o valor da coluna senha está no formato (e não em texto puro)"""
+        return valor.split("$", 1)[0] in ALGORITHMS
+
+    @staticmethod
+    def _separar(valor: str) -> Tuple[str, Dict[str, int], bytes, bytes]:
+        algoritmo, parametros, sal, esperado = valor.split("$")
+        campos = dict(item.split("=") for item in parametros.split(","))
+        return algoritmo, {chave: int(numero) for chave, numero in campos.items()}, _de_b64(sal), _de_b64(esperado)
+
+    def gerar(self, senha: str) -> str:
+        """Senha codificada com sal novo e os parâmetros atuais"""
+        sal = os.urandom(SALT_BYTES)
+        derivada = self._derivar(self.algoritmo, self.parametros, senha, sal)
+        parametros = ",".join(f"{chave}={valor}" for chave, valor in self.parametros.items())
+        return f"{self.algoritmo}${parametros}${_b64(sal)}${_b64(derivada)}"
+
+    @classmethod
+    def verificar(cls, senha: str, armazenada: Optional[str]) -> bool:
+        """Confere a senha contra o valor gravado, em tempo constante na comparação"""
+        if not armazenada:
+            return False
+        if not cls.codificada(armazenada):
+            return hmac.compare_digest(senha.encode("utf-8"), armazenada.encode("utf-8"))
+        try:
+            algoritmo, parametros, sal, esperado = cls._separar(armazenada)
+            derivada = cls._derivar(algoritmo, parametros, senha, sal)
+        except (ValueError, KeyError) as e:
+            # Valor corrompido nunca confere (e não vira senha em texto puro)
+            print(f"Senha gravada em formato inválido: {e}")
+            return False
+        return hmac.compare_digest(derivada, esperado)
+
+    def precisa_atualizar(self, armazenada: str) -> bool:
+        """Se a senha gravada usa texto puro, outro algoritmo ou parâmetros diferentes dos atuais"""
+        if not self.codificada(armazenada):
+            return True
+        try:
+            algoritmo, parametros, _, _ = self._separar(armazenada)
+        except (ValueError, KeyError):
+            return True
+        return algoritmo != self.algoritmo or parametros != self.parametros
+
+    def codificar_varias(self, senhas: Iterable[str], trabalhadores: Optional[int] = None) -> Iterator[str]:
+        """Codifica em paralelo (scrypt e PBKDF2 liberam o GIL); valores já codificados são mantidos"""
+        def codificar(senha: str) -> str:
+            return senha if self.codificada(senha) else self.gerar(senha)
+
+        with ThreadPoolExecutor(max_workers=trabalhadores or os.cpu_count() or 1) as executor:
+            yield from executor.map(codificar, senhas)
@@ -0,0 +1,97 @@
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from storyengine import ATTRIBUTES
+
+
+class ProfileEngine:
+    """Pontuação do perfil ético (Justice, Reputation, Empathy, Stress) com NumPy.
+
+    Cada história registrada vira uma matriz (escolhas x atributos) com as
+    variações de cada escolha. Uma escolha é identificada pelo seu índice
+    na tabela de escolhas da história (choice_offset[nó] + escolha), o mesmo
+    usado pelo storyengine. Assim, aplicar uma escolha é uma soma de vetores,
+    repetir um registro de escolhas é uma indexação seguida de soma, e
+    recalcular todos os usuários é um único passe agrupado por usuário.
+    """
+
+    def __init__(self, stories: Iterable = ()) -> None:
+        self._efeitos: Dict[str, np.ndarray] = {}
+        self._indices: Dict[str, int] = {}
+        # Tabela de todas as histórias concatenadas, refeita quando alguma muda
+        self._tabela_global: Optional[np.ndarray] = None
+        self._bases: Optional[np.ndarray] = None
+        for story in stories:
+            self.registrar_historia(story)
+
+    def registrar_historia(self, story) -> None:
+        """Registra (ou substitui, após um rebalanceamento) as variações de uma história"""
+        efeitos = np.frombuffer(story.choice_effect_table, dtype=np.int16)
+        self._efeitos[story.story_id] = efeitos.reshape(-1, len(ATTRIBUTES)).astype(np.int64)
+        self._indices.setdefault(story.story_id, len(self._indices))
+        self._tabela_global = None
+
+    def __contains__(self, story_id: str) -> bool:
+        return story_id in self._efeitos
+
+    def quantidade_escolhas(self, story_id: str) -> int:
+        """Tamanho da tabela de escolhas da história"""
+        return len(self._efeitos[story_id])
+
+    def indice_historia(self, story_id: str) -> int:
+        """Número da história usado nos arrays de recalcular_todos"""
+        return self._indices[story_id]
+
+    @staticmethod
+    def vetor(perfil: Dict[str, Any]) -> np.ndarray:
+        """Atributos de um dicionário de perfil como vetor"""
+        return np.array([perfil.get(atributo, 0) for atributo in ATTRIBUTES], dtype=np.int64)
+
+    @staticmethod
+    def como_dict(vetor: np.ndarray) -> Dict[str, int]:
+        return {atributo: int(valor) for atributo, valor in zip(ATTRIBUTES, vetor)}
+
+    def aplicar(self, perfil: np.ndarray, story_id: str, escolha: int) -> np.ndarray:
+        """Perfil depois de uma escolha"""
+        return perfil + self._efeitos[story_id][escolha]
+
+    def repetir(self, story_id: str, escolhas, perfil: Optional[np.ndarray] = None) -> np.ndarray:
+        """Aplica de uma vez um registro inteiro de escolhas de uma história"""
+        total = self._efeitos[story_id][np.asarray(escolhas, dtype=np.intp)].sum(axis=0)
+        return total if perfil is None else perfil + total
+
+    def _tabela(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._tabela_global is None:
+            ordem = sorted(self._indices, key=self._indices.get)
+            tamanhos = [len(self._efeitos[story_id]) for story_id in ordem]
+            self._bases = np.concatenate(([0], np.cumsum(tamanhos)[:-1])).astype(np.intp)
+            self._tabela_global = np.concatenate([self._efeitos[story_id] for story_id in ordem])
+        return self._tabela_global, self._bases
+
+    def recalcular_todos(self, usuarios, historias, escolhas, total_usuarios: int,
+                         base: Optional[np.ndarray] = None) -> np.ndarray:
+        """Recalcula o perfil de todos os usuários a partir do registro completo de escolhas.
+
+        usuarios, historias e escolhas são arrays paralelos com uma posição
+        por escolha feita: índice do usuário (0..total_usuarios-1), índice da
+        história (indice_historia) e índice da escolha na história. Retorna
+        uma matriz (total_usuarios x atributos), somada a 'base' se informada.
+        """
+        tabela, bases = self._tabela()
+        usuarios = np.asarray(usuarios, dtype=np.intp)
+        linhas = bases[np.asarray(historias, dtype=np.intp)] + np.asarray(escolhas, dtype=np.intp)
+        efeitos = tabela[linhas]
+        perfis = np.zeros((total_usuarios, len(ATTRIBUTES)), dtype=np.int64) if base is None \
+            else np.array(base, dtype=np.int64, copy=True)
+        # bincount soma os efeitos agrupando por usuário, um atributo por vez
+        for atributo in range(len(ATTRIBUTES)):
+            perfis[:, atributo] += np.bincount(usuarios, weights=efeitos[:, atributo],
+                                               minlength=total_usuarios).astype(np.int64)
+        return perfis
+
+
+def salvar_matriz(repositorio, user_ids: List[int], perfis: np.ndarray) -> bool:
+    """Grava a matriz de recalcular_todos na tabela perfis (linha i -> user_ids[i])"""
+    return repositorio.salvar_perfis(
+        (user_id, *map(int, linha)) for user_id, linha in zip(user_ids, perfis.tolist()))
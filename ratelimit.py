@@ -0,0 +1,185 @@
+import math
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Optional, Tuple
+
+from database import ConnectionPool
+
+# Envio de códigos por email: rajada de SEND_BURST e depois uma ficha a cada SEND_INTERVAL
+SEND_BURST = 3
+SEND_INTERVAL = 60.0
+# Limite de todos os envios somados, para não esgotar a cota do servidor SMTP
+SMTP_BURST = 30
+SMTP_INTERVAL = 6.0
+# Falhas de senha: MAX_LOGIN_FAILURES dentro de LOGIN_WINDOW bloqueiam o login
+MAX_LOGIN_FAILURES = 3
+LOGIN_WINDOW = 15 * 60
+# Chaves mantidas em memória; as demais são relidas do SQLite quando voltam a ser usadas
+HOT_KEYS = 1024
+
+_SMTP_KEY = ("*", "smtp")
+
+
+def mensagem_espera(segundos: float) -> str:
+    """Texto para o usuário quando um envio é recusado"""
+    segundos = math.ceil(segundos)
+    if segundos >= 120:
+        return f"Muitos pedidos de código. Aguarde {math.ceil(segundos / 60)} minutos e tente novamente."
+    return f"Muitos pedidos de código. Aguarde {segundos} segundos e tente novamente."
+
+
+class RateLimiter:
+    """Limites de envio de códigos e de tentativas de login, guardados no SQLite.
+
+    Envios usam um balde de fichas por (email, finalidade), além de um
+    balde geral para o SMTP. Falhas de senha usam uma janela deslizante
+    por email. O estado das chaves em uso fica em memória (LRU de
+    HOT_KEYS); o banco só é lido na primeira vez que uma chave aparece e
+    recebe cada alteração, então os limites valem também após reiniciar.
+    """
+
+    def __init__(self, db_name: Optional[str] = None, relogio: Callable[[], float] = time.time,
+                 capacidade: int = SEND_BURST, intervalo: float = SEND_INTERVAL,
+                 max_falhas: int = MAX_LOGIN_FAILURES, janela: float = LOGIN_WINDOW) -> None:
+        self.relogio = relogio
+        self.capacidade = capacidade
+        self.intervalo = intervalo
+        self.max_falhas = max_falhas
+        self.janela = janela
+        # (email, finalidade) -> [fichas, atualizado]
+        self._baldes: "OrderedDict[Tuple[str, str], list]" = OrderedDict()
+        # email -> instantes das falhas recentes (no máximo max_falhas)
+        self._falhas: "OrderedDict[str, Deque[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.pool = ConnectionPool(db_name) if db_name else None
+        if self.pool is not None:
+            self._criar_tabelas()
+
+    def _criar_tabelas(self) -> None:
+        try:
+            with self.pool.connection() as conn:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS limites_envio (
+                        email TEXT NOT NULL,
+                        finalidade TEXT NOT NULL,
+                        fichas REAL NOT NULL,
+                        atualizado REAL NOT NULL,
+                        PRIMARY KEY (email, finalidade)
+                    )
+                ''')
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS falhas_login (
+                        email TEXT NOT NULL,
+                        instante REAL NOT NULL
+                    )
+                ''')
+                conn.execute('CREATE INDEX IF NOT EXISTS idx_falhas_login_email ON falhas_login(email, instante)')
+                conn.execute('DELETE FROM falhas_login WHERE instante <= ?', (self.relogio() - self.janela,))
+        except sqlite3.Error as e:
+            print(f"Erro ao criar tabelas de limites: {e}")
+
+    def _ler(self, sql: str, parametros: tuple) -> list:
+        if self.pool is None:
+            return []
+        try:
+            with self.pool.connection() as conn:
+                return conn.execute(sql, parametros).fetchall()
+        except sqlite3.Error as e:
+            print(f"Erro ao ler limites: {e}")
+            return []
+
+    def _gravar(self, sql: str, parametros: tuple) -> None:
+        if self.pool is None:
+            return
+        try:
+            with self.pool.connection() as conn:
+                conn.execute(sql, parametros)
+        except sqlite3.Error as e:
+            print(f"Erro ao gravar limites: {e}")
+
+    @staticmethod
+    def _lembrar(cache: OrderedDict, chave, valor) -> None:
+        cache[chave] = valor
+        cache.move_to_end(chave)
+        if len(cache) > HOT_KEYS:
+            cache.popitem(last=False)
+
+    def _balde(self, chave: Tuple[str, str], capacidade: int, intervalo: float, agora: float) -> list:
+        """Estado do balde já reabastecido até agora"""
+        balde = self._baldes.get(chave)
+        if balde is None:
+            linhas = self._ler('SELECT fichas, atualizado FROM limites_envio WHERE email = ? AND finalidade = ?',
+                               chave)
+            balde = list(linhas[0]) if linhas else [float(capacidade), agora]
+            self._lembrar(self._baldes, chave, balde)
+        else:
+            self._baldes.move_to_end(chave)
+        fichas, atualizado = balde
+        balde[0] = min(float(capacidade), fichas + max(0.0, agora - atualizado) / intervalo)
+        balde[1] = agora
+        return balde
+
+    def _salvar_balde(self, chave: Tuple[str, str], balde: list) -> None:
+        self._gravar('INSERT OR REPLACE INTO limites_envio (email, finalidade, fichas, atualizado) VALUES (?, ?, ?, ?)',
+                     (chave[0], chave[1], balde[0], balde[1]))
+
+    def liberar_envio(self, email: str, finalidade: str) -> float:
+        """Consome uma ficha para enviar um código; retorna 0 se liberado ou os segundos de espera"""
+        with self._lock:
+            agora = self.relogio()
+            chave = (email, finalidade)
+            balde = self._balde(chave, self.capacidade, self.intervalo, agora)
+            geral = self._balde(_SMTP_KEY, SMTP_BURST, SMTP_INTERVAL, agora)
+            espera = max((1.0 - balde[0]) * self.intervalo, (1.0 - geral[0]) * SMTP_INTERVAL)
+            if espera > 1e-9:
+                return espera
+            balde[0] -= 1.0
+            geral[0] -= 1.0
+            self._salvar_balde(chave, balde)
+            self._salvar_balde(_SMTP_KEY, geral)
+            return 0.0
+
+    def _recentes(self, email: str, agora: float) -> Deque[float]:
+        """Falhas de email ainda dentro da janela"""
+        falhas = self._falhas.get(email)
+        if falhas is None:
+            linhas = self._ler('SELECT instante FROM falhas_login WHERE email = ? AND instante > ? '
+                               'ORDER BY instante DESC LIMIT ?', (email, agora - self.janela, self.max_falhas))
+            falhas = deque(sorted(instante for (instante,) in linhas), maxlen=self.max_falhas)
+            self._lembrar(self._falhas, email, falhas)
+        else:
+            self._falhas.move_to_end(email)
+        while falhas and falhas[0] <= agora - self.janela:
+            falhas.popleft()
+        return falhas
+
+    def falhas(self, email: str) -> int:
+        """Falhas de senha de email dentro da janela"""
+        with self._lock:
+            return len(self._recentes(email, self.relogio()))
+
+    def bloqueado(self, email: str) -> bool:
+        """Se email atingiu o máximo de falhas e não pode tentar a senha agora"""
+        return self.falhas(email) >= self.max_falhas
+
+    def registrar_falha(self, email: str) -> int:
+        """Anota uma senha errada e retorna quantas falhas há na janela"""
+        with self._lock:
+            agora = self.relogio()
+            falhas = self._recentes(email, agora)
+            falhas.append(agora)
+            self._gravar('INSERT INTO falhas_login (email, instante) VALUES (?, ?)', (email, agora))
+            self._gravar('DELETE FROM falhas_login WHERE email = ? AND instante <= ?', (email, agora - self.janela))
+            return len(falhas)
+
+    def limpar_falhas(self, email: str) -> None:
+        """Zera as falhas após login certo ou senha redefinida"""
+        with self._lock:
+            self._lembrar(self._falhas, email, deque(maxlen=self.max_falhas))
+            self._gravar('DELETE FROM falhas_login WHERE email = ?', (email,))
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.close_all()
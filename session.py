@@ -0,0 +1,35 @@
+from typing import Any, Dict, Optional
+
+
+class UserSession:
+    """Usuário autenticado, montado com a consulta do login e repassado entre as telas.
+
+    Assim nenhuma tela precisa voltar ao banco para descobrir id, nome ou
+    email do jogador. perfil() lê o perfil ético pelo repositório de
+    progresso associado com vincular().
+    """
+
+    def __init__(self, user_id: Optional[int], nome: str, apelido: str, email: str) -> None:
+        self.id = user_id
+        self.nome = nome
+        self.apelido = apelido
+        self.email = email
+        self.repositorio = None
+
+    @classmethod
+    def da_conta(cls, conta: Dict[str, Any]) -> "UserSession":
+        """Sessão a partir do registro de Database.obter_conta"""
+        return cls(conta['id'], conta['nome'], conta['apelido'], conta['email'])
+
+    def como_usuario(self) -> Dict[str, Any]:
+        """Mesmo formato de Database.obter_usuario"""
+        return {'id': self.id, 'nome': self.nome, 'apelido': self.apelido, 'email': self.email}
+
+    def vincular(self, repositorio) -> None:
+        """Associa o repositório de progresso, que passa a conhecer o usuário sem consultá-lo"""
+        self.repositorio = repositorio
+        repositorio.registrar_sessao(self)
+
+    def perfil(self) -> Dict[str, Any]:
+        """Nome, apelido e atributos do perfil ético (vazio se a sessão não estiver vinculada)"""
+        return self.repositorio.get_user_profile(self.apelido) if self.repositorio is not None else {}
@@ -0,0 +1,280 @@
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from storyengine import ATTRIBUTES
+
+
+class ProfileSimilarityIndex:
+    """Índice de vizinhos mais próximos sobre os vetores de atributos dos perfis.
+
+    Os perfis são divididos em grupos em volta de centróides obtidos por
+    k-means. Cada grupo guarda o seu raio e, para cada membro, a distância
+    ao centróide. Pela desigualdade triangular, para a consulta q, o
+    centróide c e um membro x:
+
+        | |q - c| - |x - c| |  <=  |q - x|  <=  |q - c| + |x - c|
+
+    Os membros ficam num único array ordenado por (grupo, distância ao
+    centróide). Uma busca avalia primeiro os grupos mais promissores, o que
+    dá um limite para o k-ésimo resultado; depois uma única busca binária
+    acha, em todos os grupos que ainda podem contribuir, a faixa de membros
+    compatível com esse limite. A resposta é exata, igual à de uma varredura
+    completa.
+
+    Perfis atualizados vão para uma área de transbordo sem ordem, sempre
+    avaliada por inteiro, e deixam uma lápide (id -1, vetor NaN) na posição
+    antiga. Quando o transbordo enche, o índice é reorganizado mantendo os
+    centróides.
+    """
+
+    def __init__(self, dimensao: int, grupos: Optional[int] = None) -> None:
+        self.dimensao = dimensao
+        self.grupos_desejados = grupos
+        self.centroides = np.zeros((0, dimensao), dtype=np.float64)
+        self._distribuir(np.zeros(0, dtype=np.int64), np.zeros((0, dimensao)), np.zeros(0, dtype=np.intp))
+
+    def __len__(self) -> int:
+        return len(self._posicoes)
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._posicoes
+
+    def construir(self, ids: Iterable[int], vetores, iteracoes: int = 8, amostra: int = 50000,
+                  semente: int = 0) -> None:
+        """Monta o índice do zero a partir de todos os perfis"""
+        ids = np.asarray(ids if isinstance(ids, np.ndarray) else list(ids), dtype=np.int64)
+        vetores = np.asarray(vetores, dtype=np.float64).reshape(len(ids), self.dimensao)
+        total = len(ids)
+        if not total:
+            self.centroides = np.zeros((0, self.dimensao), dtype=np.float64)
+            self._distribuir(ids, vetores, np.zeros(0, dtype=np.intp))
+            return
+        quantidade = min(self.grupos_desejados or max(1, int(np.sqrt(total))), total)
+
+        aleatorio = np.random.default_rng(semente)
+        treino = vetores if total <= amostra else vetores[aleatorio.choice(total, amostra, replace=False)]
+        centroides = treino[aleatorio.choice(len(treino), quantidade, replace=False)].copy()
+        for _ in range(iteracoes):
+            rotulos = self._mais_proximo(treino, centroides)
+            contagens = np.bincount(rotulos, minlength=quantidade)
+            ocupados = contagens > 0
+            for dimensao in range(self.dimensao):
+                somas = np.bincount(rotulos, weights=treino[:, dimensao], minlength=quantidade)
+                centroides[ocupados, dimensao] = somas[ocupados] / contagens[ocupados]
+        self.centroides = centroides
+        self._distribuir(ids, vetores, self._mais_proximo(vetores, centroides))
+
+    @staticmethod
+    def _mais_proximo(vetores: np.ndarray, centroides: np.ndarray, bloco: int = 1024) -> np.ndarray:
+        """Índice do centróide mais próximo de cada vetor.
+
+        Em float32 e em blocos pequenos, para que a matriz de distâncias caiba
+        no cache. Um empate mal resolvido pelo arredondamento só coloca o
+        perfil num grupo vizinho: as distâncias guardadas no índice são
+        calculadas em float64 e a busca continua exata.
+        """
+        centroides = centroides.astype(np.float32)
+        normas = (centroides ** 2).sum(axis=1)
+        transpostos = np.ascontiguousarray(centroides.T)
+        rotulos = np.empty(len(vetores), dtype=np.intp)
+        for inicio in range(0, len(vetores), bloco):
+            # |x - c|² = |x|² - 2 x·c + |c|²; |x|² não muda o argmin
+            distancias = vetores[inicio:inicio + bloco].astype(np.float32) @ transpostos
+            distancias *= -2
+            distancias += normas
+            rotulos[inicio:inicio + bloco] = np.argmin(distancias, axis=1)
+        return rotulos
+
+    def _distribuir(self, ids: np.ndarray, vetores: np.ndarray, rotulos: np.ndarray) -> None:
+        """Ordena os perfis por (grupo, distância ao centróide) e esvazia o transbordo"""
+        quantidade = len(self.centroides)
+        normas = np.sqrt(((vetores - self.centroides[rotulos]) ** 2).sum(axis=1))
+        # Chave única grupo * escala + norma: como toda norma é menor que a
+        # escala, uma só busca binária funciona dentro de qualquer grupo
+        self._escala = float(normas.max()) + 1.0 if len(normas) else 1.0
+        chaves = rotulos * self._escala + normas
+        ordem = np.argsort(chaves, kind="stable")
+        self._ids = ids[ordem]
+        self._vetores = vetores[ordem]
+        self._chaves = chaves[ordem]
+        self._inicios = np.searchsorted(rotulos[ordem], np.arange(quantidade + 1))
+        normas = normas[ordem]
+        self.raios = np.zeros(quantidade, dtype=np.float64)
+        ocupados = self._inicios[1:] > self._inicios[:-1]
+        # O último membro de cada grupo é o mais distante do centróide
+        self.raios[ocupados] = normas[self._inicios[1:][ocupados] - 1]
+        self._removidos = 0
+
+        self._limite_transbordo = max(4096, len(ids) // 100)
+        self._transbordo_ids = np.full(self._limite_transbordo, -1, dtype=np.int64)
+        self._transbordo_vetores = np.full((self._limite_transbordo, self.dimensao), np.nan)
+        self._transbordo_tamanho = 0
+
+        # user_id -> posição no array ordenado; no transbordo, -(posição + 1)
+        self._posicoes: Dict[int, int] = dict(zip(self._ids.tolist(), range(len(self._ids))))
+
+    def _reorganizar(self) -> None:
+        """Devolve o transbordo aos grupos e descarta as lápides, mantendo os centróides"""
+        vivos = self._ids >= 0
+        rotulos = np.repeat(np.arange(len(self.centroides)), np.diff(self._inicios))[vivos]
+        tamanho = self._transbordo_tamanho
+        novos = self._transbordo_ids[:tamanho] >= 0
+        novos_vetores = self._transbordo_vetores[:tamanho][novos]
+        self._distribuir(np.concatenate((self._ids[vivos], self._transbordo_ids[:tamanho][novos])),
+                         np.concatenate((self._vetores[vivos], novos_vetores)),
+                         np.concatenate((rotulos, self._mais_proximo(novos_vetores, self.centroides))))
+
+    def vetor(self, user_id: int) -> np.ndarray:
+        posicao = self._posicoes[user_id]
+        if posicao < 0:
+            return self._transbordo_vetores[-posicao - 1].copy()
+        return self._vetores[posicao].copy()
+
+    def atualizar(self, user_id: int, vetor) -> None:
+        """Insere ou move um perfil sem reordenar o índice"""
+        vetor = np.asarray(vetor, dtype=np.float64)
+        if not len(self.centroides):
+            # Índice vazio: o primeiro perfil vira o primeiro centróide
+            self.construir([user_id], vetor[None, :])
+            return
+        self.remover(user_id)
+        posicao = self._transbordo_tamanho
+        self._transbordo_ids[posicao] = user_id
+        self._transbordo_vetores[posicao] = vetor
+        self._transbordo_tamanho += 1
+        self._posicoes[user_id] = -posicao - 1
+        if self._transbordo_tamanho == self._limite_transbordo:
+            self._reorganizar()
+
+    def remover(self, user_id: int) -> None:
+        posicao = self._posicoes.pop(user_id, None)
+        if posicao is None:
+            return
+        # Lápide: manter a posição preserva a ordem do array. O raio do grupo
+        # não diminui, o que só deixa os limites mais folgados.
+        if posicao < 0:
+            self._transbordo_ids[-posicao - 1] = -1
+            self._transbordo_vetores[-posicao - 1] = np.nan
+            return
+        self._ids[posicao] = -1
+        self._vetores[posicao] = np.nan
+        self._removidos += 1
+        if self._removidos > max(self._limite_transbordo, len(self._ids) // 4):
+            self._reorganizar()
+
+    def mais_proximos(self, vetor, k: int = 5, excluir: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Os k perfis mais parecidos com o vetor, como (user_id, distância), do mais próximo ao mais distante"""
+        return self._buscar(vetor, k, excluir, mais_distantes=False)
+
+    def mais_distantes(self, vetor, k: int = 5, excluir: Optional[int] = None) -> List[Tuple[int, float]]:
+        """Os k perfis mais diferentes do vetor, como (user_id, distância), do mais distante ao mais próximo"""
+        return self._buscar(vetor, k, excluir, mais_distantes=True)
+
+    @staticmethod
+    def _avaliar(vetor: np.ndarray, ids: np.ndarray, vetores: np.ndarray, sinal: float,
+                 excluir: Optional[int]) -> Tuple[np.ndarray, np.ndarray]:
+        # Lápides têm vetor NaN, então a chave delas também é NaN
+        chaves = np.sqrt(((vetores - vetor) ** 2).sum(axis=1)) * sinal
+        validos = ~np.isnan(chaves)
+        if excluir is not None:
+            validos &= ids != excluir
+        return chaves[validos], ids[validos]
+
+    @staticmethod
+    def _melhores(chaves: np.ndarray, ids: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        if len(chaves) <= k:
+            return chaves, ids
+        escolhidos = np.argpartition(chaves, k - 1)[:k]
+        return chaves[escolhidos], ids[escolhidos]
+
+    def _buscar(self, vetor, k: int, excluir: Optional[int], mais_distantes: bool) -> List[Tuple[int, float]]:
+        if k <= 0 or not self._posicoes:
+            return []
+        vetor = np.asarray(vetor, dtype=np.float64)
+        ate_centroides = np.sqrt(((self.centroides - vetor) ** 2).sum(axis=1))
+        # Tudo é comparado por uma chave em que menor é melhor: a distância
+        # na busca dos mais próximos e a distância negativa na dos mais distantes
+        sinal = -1.0 if mais_distantes else 1.0
+        if mais_distantes:
+            limites = -(ate_centroides + self.raios)
+        else:
+            limites = np.maximum(ate_centroides - self.raios, 0.0)
+        # Vários grupos contêm a consulta e empatam em 0; entre eles, o de
+        # centróide mais próximo costuma ter os melhores candidatos
+        ordem = np.lexsort((sinal * ate_centroides, limites))
+        inicios = self._inicios
+
+        # 1) Transbordo inteiro e os grupos mais promissores até juntar k candidatos
+        tamanho = self._transbordo_tamanho
+        chaves, ids = self._avaliar(vetor, self._transbordo_ids[:tamanho],
+                                    self._transbordo_vetores[:tamanho], sinal, excluir)
+        visitados = 0
+        while visitados < len(ordem) and (visitados == 0 or len(chaves) < k):
+            numero = ordem[visitados]
+            a, b = inicios[numero], inicios[numero + 1]
+            novas_chaves, novos_ids = self._avaliar(vetor, self._ids[a:b], self._vetores[a:b], sinal, excluir)
+            chaves, ids = self._melhores(np.concatenate((chaves, novas_chaves)),
+                                         np.concatenate((ids, novos_ids)), k)
+            visitados += 1
+
+        # 2) Com o k-ésimo atual como limite, só a faixa compatível de cada
+        # grupo restante que ainda pode contribuir
+        if len(chaves) == k and visitados < len(ordem):
+            pior = float(chaves.max())
+            # Margem para que arredondamentos não descartem empates
+            folga = 1e-6
+            restantes = ordem[visitados:]
+            restantes = restantes[limites[restantes] <= pior + folga]
+            primeiro, ultimo = inicios[restantes], inicios[restantes + 1]
+            base = restantes * self._escala
+            dqc = ate_centroides[restantes]
+            if mais_distantes:
+                comeco = np.searchsorted(self._chaves, base + np.maximum(-pior - dqc - folga, 0.0))
+                fim = ultimo
+            else:
+                comeco = np.searchsorted(self._chaves, base + np.maximum(dqc - pior - folga, 0.0))
+                fim = np.minimum(np.searchsorted(self._chaves, base + dqc + pior + folga, side="right"), ultimo)
+            comeco = np.maximum(comeco, primeiro)
+            tamanhos = np.maximum(fim - comeco, 0)
+            total = int(tamanhos.sum())
+            if total:
+                # Concatena as faixas [comeco, fim) sem laço em Python
+                posicoes = np.repeat(comeco - (np.cumsum(tamanhos) - tamanhos), tamanhos) + np.arange(total)
+                novas_chaves, novos_ids = self._avaliar(vetor, self._ids[posicoes], self._vetores[posicoes],
+                                                        sinal, excluir)
+                chaves, ids = self._melhores(np.concatenate((chaves, novas_chaves)),
+                                             np.concatenate((ids, novos_ids)), k)
+
+        ordem = np.argsort(chaves, kind="stable")
+        return [(user_id, abs(chave)) for user_id, chave in zip(ids[ordem].tolist(), chaves[ordem].tolist())]
+
+
+def indice_dos_perfis(repositorio) -> ProfileSimilarityIndex:
+    """Monta o índice com todos os perfis salvos e o mantém atualizado a cada salvar_perfis.
+
+    Pode rodar fora da thread da interface: perfis gravados enquanto o
+    índice é montado ficam guardados e são aplicados antes de ele ser
+    retornado; depois disso, cada gravação atualiza o índice diretamente.
+    """
+    indice = ProfileSimilarityIndex(len(ATTRIBUTES))
+    pendentes: Optional[List[Tuple[int, list]]] = []
+    lock = threading.Lock()
+
+    def ouvinte(user_id: int, atributos: list) -> None:
+        with lock:
+            if pendentes is not None:
+                pendentes.append((user_id, atributos))
+                return
+        indice.atualizar(user_id, atributos)
+
+    # Registrado antes da leitura: nada gravado durante a montagem se perde
+    repositorio.adicionar_ouvinte_perfil(ouvinte)
+    linhas = np.array(repositorio.carregar_perfis(), dtype=np.int64).reshape(-1, 1 + len(ATTRIBUTES))
+    indice.construir(linhas[:, 0], linhas[:, 1:])
+    with lock:
+        for user_id, atributos in pendentes:
+            indice.atualizar(user_id, atributos)
+        pendentes = None
+    return indice
@@ -0,0 +1,38 @@
+import time
+
+
+class StartupTimeline:
+    """Linha do tempo da inicialização: importações, construção e primeira pintura"""
+
+    def __init__(self):
+        self.inicio = time.perf_counter()
+        self.marcos = []
+        self.ativo = False
+        self._primeira_pintura = False
+
+    def marcar(self, nome):
+        """Registra um marco com o tempo decorrido desde o início do processo"""
+        self.marcos.append((nome, time.perf_counter()))
+
+    def registrar_primeira_pintura(self):
+        """Chamado pelo paintEvent da janela inicial; só o primeiro conta"""
+        if self._primeira_pintura:
+            return
+        self._primeira_pintura = True
+        self.marcar("primeira pintura")
+        if self.ativo:
+            print(self.relatorio())
+
+    def relatorio(self):
+        """Tabela com o tempo de cada etapa e o acumulado"""
+        linhas = ["Linha do tempo da inicialização:"]
+        anterior = self.inicio
+        for nome, instante in self.marcos:
+            linhas.append(f"  {nome:<32} +{(instante - anterior) * 1000:8.1f} ms"
+                          f"   (total {(instante - self.inicio) * 1000:8.1f} ms)")
+            anterior = instante
+        return "\n".join(linhas)
+
+
+# Criada na primeira importação, o mais cedo possível no processo
+timeline = StartupTimeline()
@@ -0,0 +1,318 @@
+"""Pacotes binários pré-compilados das histórias.
+
+Uso:
+    python storybundle.py [stories/elias_story.json ...] [--verificar]
+
+Sem argumentos, compila todas as histórias de stories/. Cada história
+stories/<id>.json gera stories/<id>.bundle com a tabela de strings, a
+tabela de nós e a tabela de escolhas já no formato usado pelo
+storyengine. O pacote é aberto com mmap e lido sob demanda: abrir uma
+história grande só custa as páginas dos nós efetivamente visitados.
+
+O cabeçalho guarda o tamanho e a data de modificação do JSON de origem;
+se não baterem (pacote desatualizado), se a versão for outra ou se o
+checksum do cabeçalho falhar, open_story recompila a partir do JSON e
+regrava o pacote. O checksum do conteúdo não é conferido ao abrir, o que
+leria o pacote inteiro; --verificar confere os pacotes gerados. Quem abre
+a história deve chamar close() ao terminar, para soltar o mmap (no
+Windows, um arquivo mapeado não pode ser substituído).
+"""
+import argparse
+import glob
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from typing import Optional, Dict, Tuple
+
+from storyengine import ATTRIBUTES, CompiledStory, load_story
+
+MAGIC = b"NPSB"
+BUNDLE_VERSION = 1
+BUNDLE_SUFFIX = ".bundle"
+
+# magic, versão, nº de atributos, tamanho e mtime do JSON de origem, nº de nós,
+# nº de escolhas, nº de strings, nó inicial, string do id, string do título,
+# crc32 do conteúdo, crc32 do cabeçalho (calculado com este campo zerado)
+HEADER = struct.Struct("<4sHHQqIIIiiiII")
+
+
+class BundleError(ValueError):
+    """Pacote inexistente, corrompido, de outra versão ou desatualizado"""
+
+
+def bundle_path(source_path: str) -> str:
+    return os.path.splitext(source_path)[0] + BUNDLE_SUFFIX
+
+
+def _alinhar(posicao: int) -> int:
+    return (posicao + 7) & ~7
+
+
+def _secoes(node_count: int, choice_count: int, string_count: int):
+    """Posição (início, fim) de cada tabela a partir do fim do cabeçalho"""
+    tamanhos = (
+        ("string_offsets", 4 * (string_count + 1)),
+        ("node_name", 4 * node_count),
+        ("node_text", 4 * node_count),
+        ("node_image", 4 * node_count),
+        ("choice_offset", 4 * (node_count + 1)),
+        ("choice_text", 4 * choice_count),
+        ("choice_target", 4 * choice_count),
+        ("choice_effects", 2 * choice_count * len(ATTRIBUTES)),
+        ("node_ending", node_count),
+    )
+    secoes = {}
+    posicao = _alinhar(HEADER.size)
+    for nome, tamanho in tamanhos:
+        secoes[nome] = (posicao, posicao + tamanho)
+        posicao = _alinhar(posicao + tamanho)
+    secoes["strings"] = (posicao, None)
+    return secoes
+
+
+def build_bundle(source_path: str, destino: Optional[str] = None, story: Optional[CompiledStory] = None) -> str:
+    """Compila o JSON e grava o pacote binário (de forma atômica)"""
+    if sys.byteorder != "little":
+        raise BundleError("pacotes só são gerados em máquinas little-endian")
+    destino = destino or bundle_path(source_path)
+    origem = os.stat(source_path)
+    story = story or load_story(source_path)
+
+    strings = list(story.strings)
+    indices = {texto: i for i, texto in enumerate(strings)}
+    for texto in (story.story_id, story.title, *story.node_names):
+        if texto not in indices:
+            indices[texto] = len(strings)
+            strings.append(texto)
+
+    codificadas = [texto.encode("utf-8") for texto in strings]
+    string_offsets = array('I', [0])
+    for dados in codificadas:
+        string_offsets.append(string_offsets[-1] + len(dados))
+
+    tabelas = {
+        "string_offsets": string_offsets,
+        "node_name": array('i', (indices[nome] for nome in story.node_names)),
+        "node_text": story.node_text,
+        "node_image": story.node_image,
+        "choice_offset": story.choice_offset,
+        "choice_text": story.choice_text_ids,
+        "choice_target": story.choice_targets,
+        "choice_effects": story.choice_effect_table,
+        "node_ending": story.node_ending,
+    }
+    node_count, choice_count = story.node_count, len(story.choice_targets)
+    secoes = _secoes(node_count, choice_count, len(strings))
+    inicio_strings = secoes["strings"][0]
+    conteudo = bytearray(inicio_strings + string_offsets[-1])
+    for nome, tabela in tabelas.items():
+        inicio, fim = secoes[nome]
+        dados = tabela.tobytes()
+        assert len(dados) == fim - inicio, nome
+        conteudo[inicio:fim] = dados
+    conteudo[inicio_strings:] = b"".join(codificadas)
+
+    payload_crc = zlib.crc32(memoryview(conteudo)[HEADER.size:])
+    campos = (MAGIC, BUNDLE_VERSION, len(ATTRIBUTES), origem.st_size, origem.st_mtime_ns,
+              node_count, choice_count, len(strings), story.start,
+              indices[story.story_id], indices[story.title], payload_crc)
+    header_crc = zlib.crc32(HEADER.pack(*campos, 0))
+    conteudo[:HEADER.size] = HEADER.pack(*campos, header_crc)
+
+    temporario = destino + ".tmp"
+    with open(temporario, "wb") as arquivo:
+        arquivo.write(conteudo)
+    os.replace(temporario, destino)
+    return destino
+
+
+class BundledStory:
+    """História lida direto do pacote mapeado em memória.
+
+    Tem a mesma interface de CompiledStory; as tabelas são memoryviews
+    sobre o mmap, então nada é copiado ou decodificado até ser usado.
+    """
+
+    def __init__(self, path: str, source_path: Optional[str] = None) -> None:
+        self.path = path
+        with open(path, "rb") as arquivo:
+            self._mmap = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            self._abrir(source_path)
+        except BundleError:
+            self.close()
+            raise
+
+    def _abrir(self, source_path: Optional[str]) -> None:
+        if sys.byteorder != "little":
+            raise BundleError("pacotes só podem ser lidos em máquinas little-endian")
+        if len(self._mmap) < HEADER.size:
+            raise BundleError(f"{self.path}: arquivo truncado")
+        campos = HEADER.unpack_from(self._mmap, 0)
+        (magic, versao, atributos, source_size, source_mtime_ns, node_count, choice_count,
+         string_count, start, story_id, title, payload_crc, header_crc) = campos
+        if magic != MAGIC:
+            raise BundleError(f"{self.path}: não é um pacote de história")
+        if zlib.crc32(HEADER.pack(*campos[:-1], 0)) != header_crc:
+            raise BundleError(f"{self.path}: checksum do cabeçalho não confere")
+        if versao != BUNDLE_VERSION or atributos != len(ATTRIBUTES):
+            raise BundleError(f"{self.path}: versão {versao} do pacote, esperada {BUNDLE_VERSION}")
+        if source_path is not None and os.path.exists(source_path):
+            origem = os.stat(source_path)
+            if (origem.st_size, origem.st_mtime_ns) != (source_size, source_mtime_ns):
+                raise BundleError(f"{self.path}: desatualizado em relação a {source_path}")
+
+        secoes = _secoes(node_count, choice_count, string_count)
+        if len(self._mmap) < secoes["strings"][0]:
+            raise BundleError(f"{self.path}: arquivo truncado")
+        visao = self._visao = memoryview(self._mmap)
+        self._views = []
+
+        def tabela(nome, formato):
+            inicio, fim = secoes[nome]
+            view = visao[inicio:fim].cast(formato)
+            self._views.append(view)
+            return view
+
+        self.string_offsets = tabela("string_offsets", "I")
+        inicio_strings = secoes["strings"][0]
+        if inicio_strings + self.string_offsets[-1] != len(self._mmap):
+            raise BundleError(f"{self.path}: tamanho não confere com o cabeçalho")
+
+        self._inicio_strings = inicio_strings
+        self._payload_crc = payload_crc
+        self.node_name_ids = tabela("node_name", "i")
+        self.node_text = tabela("node_text", "i")
+        self.node_image = tabela("node_image", "i")
+        self.choice_offset = tabela("choice_offset", "i")
+        self.choice_text_ids = tabela("choice_text", "i")
+        self.choice_targets = tabela("choice_target", "i")
+        self.choice_effect_table = tabela("choice_effects", "h")
+        self.node_ending = tabela("node_ending", "B")
+        self._strings: Dict[int, str] = {}
+        self._node_ids: Optional[Dict[str, int]] = None
+        self.start = start
+        self.story_id = self.string(story_id)
+        self.title = self.string(title)
+
+    def string(self, indice: int) -> str:
+        """Decodifica a string só na primeira vez que é usada"""
+        texto = self._strings.get(indice)
+        if texto is None:
+            inicio = self._inicio_strings + self.string_offsets[indice]
+            fim = self._inicio_strings + self.string_offsets[indice + 1]
+            texto = self._strings[indice] = str(self._visao[inicio:fim], "utf-8")
+        return texto
+
+    def verify(self) -> bool:
+        """Confere o checksum do conteúdo inteiro (lê todas as páginas)"""
+        return zlib.crc32(self._visao[HEADER.size:]) == self._payload_crc
+
+    @property
+    def node_count(self) -> int:
+        return len(self.node_text)
+
+    def _indice_nomes(self) -> Dict[str, int]:
+        # Só montado quando alguém procura um nó pelo nome (ex.: ao retomar)
+        if self._node_ids is None:
+            self._node_ids = {self.string(indice): node for node, indice in enumerate(self.node_name_ids)}
+        return self._node_ids
+
+    def node_id(self, name: str) -> int:
+        return self._indice_nomes()[name]
+
+    def has_node(self, name: Optional[str]) -> bool:
+        return name in self._indice_nomes()
+
+    def node_name(self, node: int) -> str:
+        return self.string(self.node_name_ids[node])
+
+    def text(self, node: int) -> str:
+        return self.string(self.node_text[node])
+
+    def image(self, node: int) -> Optional[str]:
+        indice = self.node_image[node]
+        return self.string(indice) if indice >= 0 else None
+
+    def is_ending(self, node: int) -> bool:
+        return bool(self.node_ending[node])
+
+    def choice_count(self, node: int) -> int:
+        return self.choice_offset[node + 1] - self.choice_offset[node]
+
+    def choice_text(self, node: int, choice: int) -> str:
+        return self.string(self.choice_text_ids[self.choice_offset[node] + choice])
+
+    def choice_target(self, node: int, choice: int) -> int:
+        return self.choice_targets[self.choice_offset[node] + choice]
+
+    def choice_effects(self, node: int, choice: int) -> Tuple[int, ...]:
+        inicio = (self.choice_offset[node] + choice) * len(ATTRIBUTES)
+        return tuple(self.choice_effect_table[inicio:inicio + len(ATTRIBUTES)])
+
+    def close(self) -> None:
+        """Libera as visões e o mmap"""
+        for view in getattr(self, "_views", ()):
+            view.release()
+        self._views = []
+        if getattr(self, "_visao", None) is not None:
+            self._visao.release()
+            self._visao = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+
+def open_story(source_path: str):
+    """Abre a história pelo pacote; se ele faltar ou estiver desatualizado, usa o JSON.
+
+    Depois de compilar a partir do JSON o pacote é regravado, então só a
+    primeira abertura após uma edição paga o custo da compilação.
+    """
+    destino = bundle_path(source_path)
+    if os.path.exists(destino):
+        try:
+            # Só o cabeçalho é conferido: o crc32 do conteúdo leria todas as
+            # páginas do mmap a cada abertura (use storybundle.py --verificar)
+            return BundledStory(destino, source_path)
+        except (ValueError, OSError) as e:
+            print(f"Pacote ignorado, usando {source_path}: {e}")
+
+    story = load_story(source_path)
+    try:
+        build_bundle(source_path, destino, story)
+    except (BundleError, OSError) as e:
+        print(f"Não foi possível gravar o pacote {destino}: {e}")
+    return story
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compila as histórias em pacotes binários")
+    parser.add_argument("arquivos", nargs="*", help="histórias em JSON (padrão: stories/*.json)")
+    parser.add_argument("--verificar", action="store_true", help="confere o checksum de cada pacote gerado")
+    args = parser.parse_args(argv)
+
+    falhas = 0
+    for source_path in args.arquivos or sorted(glob.glob("stories/*.json")):
+        try:
+            destino = build_bundle(source_path)
+        except (ValueError, OSError) as e:
+            print(f"{source_path}: {e}")
+            falhas += 1
+            continue
+        print(f"{source_path} -> {destino} ({os.path.getsize(destino)} bytes)")
+        if args.verificar:
+            story = BundledStory(destino, source_path)
+            ok = story.verify()
+            story.close()
+            if not ok:
+                print(f"{destino}: checksum do conteúdo não confere")
+                falhas += 1
+    return 1 if falhas else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,232 @@
+import json
+import sys
+from array import array
+from collections import deque
+from typing import Optional, Dict, Any, List, Tuple
+
+# Atributos do perfil afetados pelas escolhas, na ordem usada nas tabelas
+ATTRIBUTES = ("Justice", "Reputation", "Empathy", "Stress")
+# Faixa das variações de atributo: a tabela de efeitos é array('h') (int16)
+EFFECT_MIN = -32768
+EFFECT_MAX = 32767
+
+
+class StoryValidationError(ValueError):
+    """História com erros de estrutura (nós inexistentes, inalcançáveis ou sem saída)"""
+
+    def __init__(self, story_id: str, problems: List[str]) -> None:
+        self.story_id = story_id
+        self.problems = problems
+        super().__init__(f"História '{story_id}' inválida:\n  " + "\n  ".join(problems))
+
+
+class CompiledStory:
+    """Grafo da história compilado em tabelas.
+
+    Os nós são inteiros 0..node_count-1. As escolhas ficam em tabelas
+    contíguas no formato CSR: as escolhas do nó n ocupam as posições
+    choice_offset[n] até choice_offset[n + 1] - 1. Textos e caminhos de
+    imagem são índices para a tabela de strings (cada string aparece uma
+    única vez). Todas as consultas abaixo são O(1).
+    """
+
+    def __init__(self, story_id: str, title: str, start: int, strings: List[str],
+                 node_names: List[str], node_text: array, node_image: array, node_ending: array,
+                 choice_offset: array, choice_text: array, choice_target: array,
+                 choice_effects: array) -> None:
+        self.story_id = story_id
+        self.title = title
+        self.start = start
+        self.strings = strings
+        self.node_names = node_names
+        self.node_text = node_text
+        self.node_image = node_image
+        self.node_ending = node_ending
+        self.choice_offset = choice_offset
+        self.choice_text_ids = choice_text
+        self.choice_targets = choice_target
+        self.choice_effect_table = choice_effects
+        self._node_ids = {name: node for node, name in enumerate(node_names)}
+
+    @property
+    def node_count(self) -> int:
+        return len(self.node_names)
+
+    def node_id(self, name: str) -> int:
+        return self._node_ids[name]
+
+    def has_node(self, name: Optional[str]) -> bool:
+        return name in self._node_ids
+
+    def node_name(self, node: int) -> str:
+        return self.node_names[node]
+
+    def text(self, node: int) -> str:
+        return self.strings[self.node_text[node]]
+
+    def image(self, node: int) -> Optional[str]:
+        indice = self.node_image[node]
+        return self.strings[indice] if indice >= 0 else None
+
+    def is_ending(self, node: int) -> bool:
+        return bool(self.node_ending[node])
+
+    def choice_count(self, node: int) -> int:
+        return self.choice_offset[node + 1] - self.choice_offset[node]
+
+    def choice_text(self, node: int, choice: int) -> str:
+        return self.strings[self.choice_text_ids[self.choice_offset[node] + choice]]
+
+    def choice_target(self, node: int, choice: int) -> int:
+        return self.choice_targets[self.choice_offset[node] + choice]
+
+    def choice_effects(self, node: int, choice: int) -> Tuple[int, ...]:
+        """Variação de cada atributo (na ordem de ATTRIBUTES) causada pela escolha"""
+        inicio = (self.choice_offset[node] + choice) * len(ATTRIBUTES)
+        return tuple(self.choice_effect_table[inicio:inicio + len(ATTRIBUTES)])
+
+    def close(self) -> None:
+        """Nada a liberar; existe para ter a mesma interface de BundledStory"""
+
+
+def compile_story(data: Dict[str, Any]) -> CompiledStory:
+    """Valida a história declarada e monta as tabelas do grafo.
+
+    Formato esperado:
+        {"id": ..., "title": ..., "start": "nome_do_no",
+         "nodes": {"nome_do_no": {"text": ..., "image": ..., "ending": false,
+                                  "choices": [{"text": ..., "target": ...,
+                                               "effects": {"Empathy": 2}}]}}}
+    """
+    story_id = data.get("id", "?")
+    problems = []
+    nodes = data.get("nodes") or {}
+    if not nodes:
+        raise StoryValidationError(story_id, ["a história não tem nós"])
+
+    node_names = list(nodes)
+    node_ids = {name: node for node, name in enumerate(node_names)}
+    start_name = data.get("start")
+    if start_name not in node_ids:
+        problems.append(f"nó inicial '{start_name}' não existe")
+
+    strings: List[str] = []
+    string_ids: Dict[str, int] = {}
+
+    def intern(texto: str) -> int:
+        indice = string_ids.get(texto)
+        if indice is None:
+            indice = string_ids[texto] = len(strings)
+            strings.append(sys.intern(texto))
+        return indice
+
+    node_text = array('i')
+    node_image = array('i')
+    node_ending = array('b')
+    choice_offset = array('i', [0])
+    choice_text = array('i')
+    choice_target = array('i')
+    choice_effects = array('h')
+    adjacency: List[List[int]] = []
+
+    for name in node_names:
+        node = nodes[name]
+        node_text.append(intern(node.get("text", "")))
+        node_image.append(intern(node["image"]) if node.get("image") else -1)
+        ending = bool(node.get("ending"))
+        node_ending.append(1 if ending else 0)
+        choices = node.get("choices") or []
+        if not choices and not ending:
+            problems.append(f"nó '{name}' não tem escolhas e não é um final")
+
+        destinos = []
+        for posicao, choice in enumerate(choices):
+            target = node_ids.get(choice.get("target"))
+            if target is None:
+                problems.append(f"escolha {posicao} do nó '{name}' leva a '{choice.get('target')}', que não existe")
+                target = -1
+            else:
+                destinos.append(target)
+            effects = choice.get("effects") or {}
+            desconhecidos = set(effects) - set(ATTRIBUTES)
+            if desconhecidos:
+                problems.append(f"escolha {posicao} do nó '{name}' altera atributos desconhecidos: "
+                                f"{', '.join(sorted(desconhecidos))}")
+            valores = []
+            for atributo in ATTRIBUTES:
+                valor = effects.get(atributo, 0)
+                if isinstance(valor, bool) or not isinstance(valor, int) or not EFFECT_MIN <= valor <= EFFECT_MAX:
+                    problems.append(f"escolha {posicao} do nó '{name}' altera {atributo} em {valor!r}; "
+                                    f"use um inteiro entre {EFFECT_MIN} e {EFFECT_MAX}")
+                    valor = 0
+                valores.append(valor)
+            choice_text.append(intern(choice.get("text", "")))
+            choice_target.append(target)
+            choice_effects.extend(valores)
+        choice_offset.append(len(choice_target))
+        adjacency.append(destinos)
+
+    if start_name in node_ids:
+        # Busca em largura a partir do início para achar nós inalcançáveis
+        alcancados = bytearray(len(node_names))
+        inicio = node_ids[start_name]
+        alcancados[inicio] = 1
+        fila = deque([inicio])
+        while fila:
+            for destino in adjacency[fila.popleft()]:
+                if not alcancados[destino]:
+                    alcancados[destino] = 1
+                    fila.append(destino)
+        inalcancaveis = [name for node, name in enumerate(node_names) if not alcancados[node]]
+        if inalcancaveis:
+            amostra = ", ".join(f"'{name}'" for name in inalcancaveis[:10])
+            extra = f" e mais {len(inalcancaveis) - 10}" if len(inalcancaveis) > 10 else ""
+            problems.append(f"nós inalcançáveis a partir de '{start_name}': {amostra}{extra}")
+
+    if problems:
+        raise StoryValidationError(story_id, problems)
+
+    return CompiledStory(story_id, data.get("title", story_id), node_ids[start_name], strings,
+                         [sys.intern(name) for name in node_names], node_text, node_image, node_ending,
+                         choice_offset, choice_text, choice_target, choice_effects)
+
+
+def load_story(path: str) -> CompiledStory:
+    """Lê uma história em JSON e a compila"""
+    with open(path, encoding="utf-8") as arquivo:
+        return compile_story(json.load(arquivo))
+
+
+class StoryCursor:
+    """Posição de um jogador na história e efeito acumulado das escolhas feitas"""
+
+    def __init__(self, story: CompiledStory, node: Optional[int] = None) -> None:
+        self.story = story
+        self.node = story.start if node is None else node
+        self.totals = [0] * len(ATTRIBUTES)
+        # (nó, escolha) na ordem em que foram feitas
+        self.history: List[Tuple[int, int]] = []
+
+    @property
+    def finished(self) -> bool:
+        return self.story.is_ending(self.node)
+
+    def choices(self) -> List[str]:
+        story, node = self.story, self.node
+        return [story.choice_text(node, choice) for choice in range(story.choice_count(node))]
+
+    def choose(self, choice: int) -> int:
+        """Aplica a escolha e avança para o nó de destino"""
+        story, node = self.story, self.node
+        if not 0 <= choice < story.choice_count(node):
+            raise IndexError(f"escolha {choice} não existe no nó '{story.node_name(node)}'")
+        inicio = (story.choice_offset[node] + choice) * len(ATTRIBUTES)
+        for atributo in range(len(ATTRIBUTES)):
+            self.totals[atributo] += story.choice_effect_table[inicio + atributo]
+        self.history.append((node, choice))
+        self.node = story.choice_targets[story.choice_offset[node] + choice]
+        return self.node
+
+    def effects(self) -> Dict[str, int]:
+        """Efeito acumulado por atributo"""
+        return dict(zip(ATTRIBUTES, self.totals))
@@ -0,0 +1,223 @@
+from PySide6.QtWidgets import QListView, QStyledItemDelegate, QStyle, QAbstractItemView
+from PySide6.QtGui import QPainter, QColor, QFont, QPen, QLinearGradient, QBrush
+from PySide6.QtCore import (Qt, QAbstractListModel, QModelIndex, QRect, QRectF, QSize,
+                            QEvent, Signal)
+
+from iconcache import cache_icones
+
+ROW_HEIGHT = 120
+ROW_SPACING = 12
+ICON_SIZE = 80
+BUTTON_SIZE = QSize(120, 50)
+
+
+class StoryListModel(QAbstractListModel):
+    """Modelo com as histórias de uma aba de status"""
+    StoryRole = Qt.ItemDataRole.UserRole + 1
+
+    def __init__(self, stories=None, parent=None):
+        super().__init__(parent)
+        self._stories = list(stories or [])
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._stories)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        story = self._stories[index.row()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return story["title"]
+        if role == self.StoryRole:
+            return story
+        return None
+
+    def set_stories(self, stories):
+        self.beginResetModel()
+        self._stories = list(stories)
+        self.endResetModel()
+
+    def row_of(self, story_id):
+        for row, story in enumerate(self._stories):
+            if story["id"] == story_id:
+                return row
+        return -1
+
+    def insert_story(self, row, story):
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._stories.insert(row, story)
+        self.endInsertRows()
+
+    def update_story(self, story):
+        """Troca os dados de uma linha existente e repinta só ela"""
+        row = self.row_of(story["id"])
+        if row < 0:
+            return
+        self._stories[row] = story
+        index = self.index(row)
+        self.dataChanged.emit(index, index)
+
+    def remove_story(self, story_id):
+        row = self.row_of(story_id)
+        if row < 0:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._stories[row]
+        self.endRemoveRows()
+
+
+class StoryCardDelegate(QStyledItemDelegate):
+    """Pinta cada linha como um card de vidro, sem criar widgets por história"""
+    action_clicked = Signal(str)
+
+    def __init__(self, playable_ids=(), parent=None):
+        super().__init__(parent)
+        self.playable_ids = set(playable_ids)
+
+        # Objetos de pintura criados uma vez e reaproveitados em todas as linhas
+        self.card_brush = QBrush(QColor(35, 40, 60, 102))
+        self.card_hover_brush = QBrush(QColor(50, 55, 80, 153))
+        self.card_pen = QPen(QColor(255, 255, 255, 25), 1)
+        self.title_font = QFont()
+        self.title_font.setPixelSize(18)
+        self.title_font.setBold(True)
+        self.small_font = QFont()
+        self.small_font.setPixelSize(14)
+        self.small_bold_font = QFont(self.small_font)
+        self.small_bold_font.setBold(True)
+        self.button_font = QFont()
+        self.button_font.setPixelSize(16)
+        self.button_font.setBold(True)
+        self.icon_font = QFont()
+        self.icon_font.setPixelSize(40)
+        self.title_color = QColor("#FFD700")
+        self.text_color = QColor("#AAAAAA")
+        self.chip_color = QColor(70, 70, 100, 128)
+        self.icon_fallback_color = QColor(255, 255, 255, 178)
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), ROW_HEIGHT)
+
+    def is_playable(self, story):
+        return story["id"] in self.playable_ids
+
+    def _button_rect(self, rect):
+        return QRect(rect.right() - 20 - BUTTON_SIZE.width(),
+                     rect.center().y() - BUTTON_SIZE.height() // 2,
+                     BUTTON_SIZE.width(), BUTTON_SIZE.height())
+
+    @staticmethod
+    def _completion_ratio(story):
+        try:
+            return max(0.0, min(1.0, float(story.get("completion", "0").rstrip("%")) / 100))
+        except ValueError:
+            return 0.0
+
+    def paint(self, painter, option, index):
+        story = index.data(StoryListModel.StoryRole)
+        rect = option.rect
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+
+        # Fundo de vidro
+        hovered = bool(option.state & QStyle.StateFlag.State_MouseOver)
+        painter.setPen(self.card_pen)
+        painter.setBrush(self.card_hover_brush if hovered else self.card_brush)
+        painter.drawRoundedRect(QRectF(rect).adjusted(0.5, 0.5, -0.5, -0.5), 20, 20)
+
+        # Ícone da história
+        icon_rect = QRect(rect.left() + 20, rect.center().y() - ICON_SIZE // 2, ICON_SIZE, ICON_SIZE)
+        icon = cache_icones.circular(f"assets/stories/{story['id']}_icon.png", ICON_SIZE)
+        if icon.isNull():
+            painter.setFont(self.icon_font)
+            painter.setPen(self.icon_fallback_color)
+            painter.drawText(icon_rect, Qt.AlignmentFlag.AlignCenter, "📖")
+        else:
+            painter.drawPixmap(icon_rect.left() + (ICON_SIZE - icon.width()) // 2,
+                               icon_rect.top() + (ICON_SIZE - icon.height()) // 2, icon)
+
+        # Informações da história
+        button_rect = self._button_rect(rect)
+        info_left = icon_rect.right() + 20
+        info = QRect(info_left, rect.top() + 15, button_rect.left() - 20 - info_left, rect.height() - 30)
+
+        painter.setFont(self.title_font)
+        painter.setPen(self.title_color)
+        title_rect = QRect(info.left(), info.top(), info.width(), 28)
+        painter.drawText(title_rect, Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter, story["title"])
+
+        if "completion" in story:
+            painter.setFont(self.small_bold_font)
+            chip_width = painter.fontMetrics().horizontalAdvance(story["completion"]) + 20
+            chip = QRect(info.right() - chip_width, title_rect.top() + 2, chip_width, 24)
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(self.chip_color)
+            painter.drawRoundedRect(chip, 10, 10)
+            painter.setPen(self.text_color)
+            painter.drawText(chip, Qt.AlignmentFlag.AlignCenter, story["completion"])
+
+        if "progress" in story:
+            # Barra de progresso
+            bar = QRectF(info.left(), title_rect.bottom() + 10, info.width(), 8)
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.setBrush(self.chip_color)
+            painter.drawRoundedRect(bar, 4, 4)
+            ratio = self._completion_ratio(story)
+            if ratio > 0:
+                filled = QRectF(bar.left(), bar.top(), bar.width() * ratio, bar.height())
+                gradient = QLinearGradient(filled.topLeft(), filled.topRight())
+                gradient.setColorAt(0, QColor("#FF8C00"))
+                gradient.setColorAt(1, QColor("#FFD700"))
+                painter.setBrush(gradient)
+                painter.drawRoundedRect(filled, 4, 4)
+
+            painter.setFont(self.small_font)
+            painter.setPen(self.text_color)
+            painter.drawText(QRect(info.left(), int(bar.bottom()) + 8, info.width(), 20),
+                             Qt.AlignmentFlag.AlignLeft | Qt.AlignmentFlag.AlignVCenter,
+                             f"Progresso: {story['progress']}")
+
+        # Botão de ação (Continuar/Iniciar)
+        if not self.is_playable(story):
+            painter.setOpacity(0.4)
+        gradient = QLinearGradient(button_rect.topLeft(), button_rect.topRight())
+        gradient.setColorAt(0, QColor("#6A5ACD"))
+        gradient.setColorAt(1, QColor("#9370DB"))
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.setBrush(gradient)
+        painter.drawRoundedRect(QRectF(button_rect), 25, 25)
+        painter.setFont(self.button_font)
+        painter.setPen(Qt.GlobalColor.white)
+        painter.drawText(button_rect, Qt.AlignmentFlag.AlignCenter,
+                         "Continuar" if story["status"] == "in_progress" else "Iniciar")
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        """Trata o clique no botão pintado da linha"""
+        if (event.type() == QEvent.Type.MouseButtonRelease
+                and event.button() == Qt.MouseButton.LeftButton):
+            story = index.data(StoryListModel.StoryRole)
+            if (self._button_rect(option.rect).contains(event.position().toPoint())
+                    and self.is_playable(story)):
+                self.action_clicked.emit(story["id"])
+                return True
+        return super().editorEvent(event, model, option, index)
+
+
+class StoryListView(QListView):
+    """Lista de histórias que só pinta as linhas visíveis"""
+
+    def __init__(self, model, delegate, parent=None):
+        super().__init__(parent)
+        self.setModel(model)
+        self.setItemDelegate(delegate)
+        # Linhas de mesma altura: o Qt calcula a rolagem sem medir cada item
+        self.setUniformItemSizes(True)
+        self.setVerticalScrollMode(QAbstractItemView.ScrollMode.ScrollPerPixel)
+        self.verticalScrollBar().setSingleStep(20)
+        self.setSpacing(ROW_SPACING)
+        self.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
+        self.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        self.setMouseTracking(True)
+        # Aparência na folha do tema (QListView#ListaHistorias)
+        self.setObjectName("ListaHistorias")
@@ -0,0 +1,422 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+from itertools import groupby
+from typing import Optional, Dict, Any, List, Tuple, Callable, Iterable
+
+from choicelog import ChoiceLog
+from database import ConnectionPool, Database
+from storyengine import ATTRIBUTES
+from storystats import StoryAggregates
+
+# Status usados pelas abas do Mundo de Consciências, na ordem das abas
+STORY_STATUSES = ("not_started", "in_progress", "completed")
+
+# Colunas da tabela perfis, na ordem de ATTRIBUTES
+PROFILE_COLUMNS = tuple(atributo.lower() for atributo in ATTRIBUTES)
+
+
+class StoryProgressRepository:
+    """Progresso das histórias salvo na tabela user_stories (mesma interface do MockDatabase)"""
+
+    def __init__(self, usuarios: Database, db_name: str = "database.db",
+                 log_escolhas: str = "escolhas.log") -> None:
+        self.usuarios = usuarios
+        self.db_name = db_name
+        self.pool = ConnectionPool(db_name)
+        # apelido -> {'id', 'nome', 'apelido', 'email'}
+        self._usuarios: Dict[str, Dict[str, Any]] = {}
+        # user_id -> {story_id: {"story_state", "last_chapter", "progress"}}
+        self._cache: Dict[int, Dict[str, Dict[str, Any]]] = {}
+        self._pendentes: Optional[List[Tuple]] = None
+        self._ouvintes: List[Callable] = []
+        self._ouvintes_perfil: List[Callable] = []
+        self._lock = threading.RLock()
+        self.create_tables()
+        # Estatísticas da comunidade, atualizadas junto com cada gravação
+        self.agregados = StoryAggregates(self.pool)
+        # Histórico de todas as escolhas (o progresso guarda só o último nó)
+        self.escolhas = ChoiceLog(log_escolhas)
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        return self.pool.connection()
+
+    def create_tables(self) -> None:
+        """Cria a tabela de progresso e os índices se não existirem"""
+        try:
+            with self.conn as conn:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS user_stories (
+                        user_id INTEGER,
+                        story_name TEXT NOT NULL,
+                        status TEXT NOT NULL,
+                        progress INTEGER,
+                        PRIMARY KEY (user_id, story_name)
+                    )
+                ''')
+                colunas = {row[1] for row in conn.execute("PRAGMA table_info(user_stories)")}
+                if 'last_chapter' not in colunas:
+                    conn.execute("ALTER TABLE user_stories ADD COLUMN last_chapter TEXT")
+                # A chave primária já cobre a busca por usuário; este índice
+                # atende às consultas por usuário e status
+                conn.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_user_stories_user_status
+                    ON user_stories (user_id, status)
+                ''')
+                conn.execute(f'''
+                    CREATE TABLE IF NOT EXISTS perfis (
+                        user_id INTEGER PRIMARY KEY,
+                        {", ".join(f"{coluna} INTEGER NOT NULL DEFAULT 0" for coluna in PROFILE_COLUMNS)}
+                    )
+                ''')
+        except sqlite3.Error as e:
+            print(f"Erro ao criar tabela de progresso: {e}")
+            raise
+
+    def registrar_sessao(self, sessao) -> None:
+        """Guarda o usuário da sessão de login: as leituras seguintes não consultam a tabela usuarios"""
+        if sessao.id is not None:
+            self._usuarios[sessao.apelido] = sessao.como_usuario()
+
+    def _usuario(self, apelido: str) -> Optional[Dict[str, Any]]:
+        """Resolve o apelido para id, nome e email do usuário, com cache"""
+        usuario = self._usuarios.get(apelido)
+        if usuario is None:
+            usuario = self.usuarios.obter_usuario(apelido)
+            if usuario is None:
+                return None
+            self._usuarios[apelido] = usuario
+        return usuario
+
+    def _user_id(self, apelido: str) -> Optional[int]:
+        usuario = self._usuario(apelido)
+        return usuario['id'] if usuario else None
+
+    def _progresso_usuario(self, user_id: int) -> Dict[str, Dict[str, Any]]:
+        """Carrega todo o progresso do usuário em uma consulta na primeira leitura"""
+        with self._lock:
+            progresso = self._cache.get(user_id)
+            if progresso is not None:
+                return progresso
+            progresso = {}
+            try:
+                for story_name, status, last_chapter, progress in self.conn.execute(
+                        'SELECT story_name, status, last_chapter, progress FROM user_stories WHERE user_id = ?',
+                        (user_id,)):
+                    progresso[story_name] = {
+                        "story_state": status,
+                        "last_chapter": last_chapter,
+                        "progress": progress,
+                    }
+            except sqlite3.Error as e:
+                print(f"Erro ao carregar progresso: {e}")
+                return progresso
+            self._cache[user_id] = progresso
+            return progresso
+
+    def carregar_por_status(self, user_apelido: str) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Progresso do usuário agrupado por status, em uma única consulta indexada"""
+        user_id = self._user_id(user_apelido)
+        if user_id is None:
+            return {}
+        try:
+            linhas = self.conn.execute('''
+                SELECT status, story_name, last_chapter, progress
+                FROM user_stories WHERE user_id = ?
+                ORDER BY status
+            ''', (user_id,)).fetchall()
+        except sqlite3.Error as e:
+            print(f"Erro ao carregar progresso por status: {e}")
+            return {}
+
+        por_status = {}
+        progresso = {}
+        for status, grupo in groupby(linhas, key=lambda linha: linha[0]):
+            por_status[status] = particao = {}
+            for _, story_name, last_chapter, progress in grupo:
+                particao[story_name] = progresso[story_name] = {
+                    "story_state": status,
+                    "last_chapter": last_chapter,
+                    "progress": progress,
+                }
+        # A mesma leitura já serve de cache para get_story_progress
+        with self._lock:
+            self._cache[user_id] = progresso
+        return por_status
+
+    def adicionar_ouvinte(self, ouvinte: Callable) -> None:
+        """Registra ouvinte(user_apelido, story_id, story_state, last_chapter, progress), chamado a cada save"""
+        self._ouvintes.append(ouvinte)
+
+    def remover_ouvinte(self, ouvinte: Callable) -> None:
+        if ouvinte in self._ouvintes:
+            self._ouvintes.remove(ouvinte)
+
+    def _notificar(self, user_apelido: str, registro: Tuple) -> None:
+        _, story_id, status, progress, last_chapter = registro
+        for ouvinte in list(self._ouvintes):
+            ouvinte(user_apelido, story_id, status, last_chapter, progress)
+
+    def adicionar_ouvinte_perfil(self, ouvinte: Callable) -> None:
+        """Registra ouvinte(user_id, atributos), chamado para cada perfil gravado em salvar_perfis"""
+        self._ouvintes_perfil.append(ouvinte)
+
+    def remover_ouvinte_perfil(self, ouvinte: Callable) -> None:
+        if ouvinte in self._ouvintes_perfil:
+            self._ouvintes_perfil.remove(ouvinte)
+
+    def get_user_profile(self, apelido: str) -> Dict[str, Any]:
+        """Nome, apelido e atributos do perfil ético (zerados se ainda não houver perfil)"""
+        usuario = self._usuario(apelido)
+        if usuario is None:
+            return {}
+        perfil = {"name": usuario['nome'], "apelido": usuario['apelido']}
+        try:
+            linha = self.conn.execute(
+                f'SELECT {", ".join(PROFILE_COLUMNS)} FROM perfis WHERE user_id = ?', (usuario['id'],)
+            ).fetchone()
+        except sqlite3.Error as e:
+            print(f"Erro ao carregar perfil: {e}")
+            linha = None
+        perfil.update(zip(ATTRIBUTES, linha or (0,) * len(ATTRIBUTES)))
+        return perfil
+
+    def salvar_perfil(self, user_apelido: str, atributos: Dict[str, int]) -> bool:
+        """Grava os atributos do perfil ético do usuário"""
+        user_id = self._user_id(user_apelido)
+        if user_id is None:
+            print(f"Usuário não encontrado ao salvar perfil: {user_apelido}")
+            return False
+        return self.salvar_perfis([(user_id, *(int(atributos.get(a, 0)) for a in ATTRIBUTES))])
+
+    def carregar_perfis(self) -> List[Tuple[int, ...]]:
+        """Todos os perfis como (user_id, justice, reputation, empathy, stress)"""
+        try:
+            return self.conn.execute(
+                f'SELECT user_id, {", ".join(PROFILE_COLUMNS)} FROM perfis ORDER BY user_id'
+            ).fetchall()
+        except sqlite3.Error as e:
+            print(f"Erro ao carregar perfis: {e}")
+            return []
+
+    def salvar_perfis(self, linhas: Iterable[Tuple[int, ...]]) -> bool:
+        """Grava vários perfis (user_id seguido dos atributos) em uma transação"""
+        linhas = list(linhas)
+        colunas = ", ".join(PROFILE_COLUMNS)
+        try:
+            with self.conn as conn:
+                conn.executemany(f'''
+                    INSERT INTO perfis (user_id, {colunas})
+                    VALUES (?, {", ".join("?" * len(PROFILE_COLUMNS))})
+                    ON CONFLICT (user_id) DO UPDATE SET
+                    {", ".join(f"{coluna} = excluded.{coluna}" for coluna in PROFILE_COLUMNS)}
+                ''', linhas)
+        except sqlite3.Error as e:
+            print(f"Erro ao salvar perfis: {e}")
+            return False
+        for ouvinte in list(self._ouvintes_perfil):
+            for user_id, *atributos in linhas:
+                ouvinte(user_id, atributos)
+        return True
+
+    def registrar_escolha(self, user_apelido: str, story_id: str, node: int, choice: int,
+                          elapsed_ms: int, modo: str = "modo1") -> bool:
+        """Acrescenta a escolha ao log (choice = índice na tabela de escolhas da história)"""
+        user_id = self._user_id(user_apelido)
+        if user_id is None:
+            print(f"Usuário não encontrado ao registrar escolha: {user_apelido}")
+            return False
+        return self.escolhas.registrar(user_id, story_id, node, choice, elapsed_ms, modo)
+
+    def get_story_progress(self, user_apelido: str, story_id: str) -> Optional[Dict[str, Any]]:
+        user_id = self._user_id(user_apelido)
+        if user_id is None:
+            return None
+        return self._progresso_usuario(user_id).get(story_id)
+
+    def get_all_progress(self, user_apelido: str) -> Dict[str, Dict[str, Any]]:
+        """Todo o progresso do usuário, vindo do cache"""
+        user_id = self._user_id(user_apelido)
+        if user_id is None:
+            return {}
+        return dict(self._progresso_usuario(user_id))
+
+    def save_story_progress(self, user_apelido: str, story_id: str, story_state: str,
+                            last_chapter: Optional[str], progress: Optional[int] = None) -> bool:
+        """Salva o progresso; dentro de lote() a gravação fica para o fim do bloco"""
+        user_id = self._user_id(user_apelido)
+        if user_id is None:
+            print(f"Usuário não encontrado ao salvar progresso: {user_apelido}")
+            return False
+
+        registro = (user_id, story_id, story_state, progress, last_chapter)
+        with self._lock:
+            if self._pendentes is not None:
+                self._pendentes.append(registro)
+                self._atualizar_cache([registro])
+                self._notificar(user_apelido, registro)
+                return True
+        if not self._gravar([registro]):
+            return False
+        self._atualizar_cache([registro])
+        self._notificar(user_apelido, registro)
+        return True
+
+    @contextmanager
+    def lote(self):
+        """Agrupa vários save_story_progress em uma única transação"""
+        with self._lock:
+            if self._pendentes is not None:
+                # Lote aninhado: o bloco externo grava tudo
+                yield self
+                return
+            self._pendentes = []
+        try:
+            yield self
+        finally:
+            with self._lock:
+                pendentes, self._pendentes = self._pendentes, None
+            if pendentes and not self._gravar(pendentes):
+                # Cache não reflete mais o banco; força uma nova leitura
+                self.invalidar()
+
+    def _gravar(self, registros: List[Tuple]) -> bool:
+        """Upsert de todos os registros em uma transação"""
+        try:
+            with self.conn as conn:
+                # Compara com o estado anterior, então vem antes do upsert
+                self.agregados.registrar(conn, registros)
+                conn.executemany('''
+                    INSERT INTO user_stories (user_id, story_name, status, progress, last_chapter)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT (user_id, story_name) DO UPDATE SET
+                        status = excluded.status,
+                        progress = COALESCE(excluded.progress, user_stories.progress),
+                        last_chapter = excluded.last_chapter
+                ''', registros)
+            return True
+        except sqlite3.Error as e:
+            print(f"Erro ao salvar progresso: {e}")
+            return False
+
+    def _atualizar_cache(self, registros: List[Tuple]) -> None:
+        with self._lock:
+            for user_id, story_id, status, progress, last_chapter in registros:
+                progresso = self._cache.get(user_id)
+                if progresso is None:
+                    # Usuário ainda não lido: a próxima leitura vem do banco
+                    continue
+                anterior = progresso.get(story_id) or {}
+                progresso[story_id] = {
+                    "story_state": status,
+                    "last_chapter": last_chapter,
+                    "progress": progress if progress is not None else anterior.get("progress"),
+                }
+
+    def invalidar(self, user_apelido: Optional[str] = None) -> None:
+        """Descarta o cache de leitura (de um usuário ou de todos)"""
+        with self._lock:
+            if user_apelido is None:
+                self._cache.clear()
+            else:
+                usuario = self._usuarios.get(user_apelido)
+                self._cache.pop(usuario['id'] if usuario else None, None)
+
+    def close(self) -> None:
+        self.escolhas.close()
+        self.pool.close_all()
+
+
+def descrever_progresso(last_chapter: Optional[str], progress: Optional[int]) -> Dict[str, str]:
+    """Textos de progresso exibidos nas abas ("Capítulo 2", "40%")"""
+    textos = {}
+    if last_chapter:
+        if last_chapter.startswith("chapter_"):
+            textos["progress"] = f"Capítulo {last_chapter[len('chapter_'):]}"
+        else:
+            textos["progress"] = last_chapter
+    if progress is not None:
+        textos["completion"] = f"{progress}%"
+    return textos
+
+
+class StoryStatusProjection:
+    """Histórias de um usuário já separadas por status para as abas.
+
+    É carregada com uma única consulta agrupada e depois atualizada a cada
+    save_story_progress, guardando quais histórias mudaram para que a tela
+    atualize só essas linhas. Se 'ao_alterar' for informado, é chamado a
+    cada mudança para a tela agendar a atualização.
+    """
+
+    def __init__(self, repositorio, user_apelido: str, catalogo: Iterable[Tuple[str, str]],
+                 ao_alterar: Optional[Callable[[], None]] = None) -> None:
+        self.repositorio = repositorio
+        self.ao_alterar = ao_alterar
+        self.user_apelido = user_apelido
+        # story_id -> título, na ordem de exibição
+        self.catalogo = dict(catalogo)
+        self._ordem = {story_id: i for i, story_id in enumerate(self.catalogo)}
+        self.particoes: Dict[str, Dict[str, Dict[str, Any]]] = {status: {} for status in STORY_STATUSES}
+        self._status_atual: Dict[str, str] = {}
+        # story_id -> status que tinha antes da primeira mudança ainda não consumida
+        self._alteradas: Dict[str, Optional[str]] = {}
+        self.recarregar()
+        repositorio.adicionar_ouvinte(self._on_progresso_salvo)
+
+    def _montar(self, story_id: str, status: str, last_chapter=None, progress=None) -> Dict[str, Any]:
+        story = {"id": story_id, "title": self.catalogo[story_id], "status": status}
+        if status == "in_progress":
+            story.update(descrever_progresso(last_chapter, progress))
+        return story
+
+    def _colocar(self, story_id: str, status: str, last_chapter=None, progress=None) -> None:
+        anterior = self._status_atual.get(story_id)
+        if anterior is not None:
+            self.particoes[anterior].pop(story_id, None)
+        self.particoes[status][story_id] = self._montar(story_id, status, last_chapter, progress)
+        self._status_atual[story_id] = status
+
+    def recarregar(self) -> None:
+        """Relê tudo do banco (uma consulta) e descarta as mudanças pendentes"""
+        por_status = self.repositorio.carregar_por_status(self.user_apelido)
+        self.particoes = {status: {} for status in STORY_STATUSES}
+        self._status_atual = {}
+        for status, historias in por_status.items():
+            if status not in self.particoes:
+                continue
+            for story_id, dados in historias.items():
+                if story_id in self.catalogo:
+                    self._colocar(story_id, status, dados.get("last_chapter"), dados.get("progress"))
+        for story_id in self.catalogo:
+            if story_id not in self._status_atual:
+                self._colocar(story_id, "not_started")
+        self._alteradas.clear()
+
+    def _on_progresso_salvo(self, user_apelido, story_id, story_state, last_chapter, progress) -> None:
+        if user_apelido != self.user_apelido or story_id not in self.catalogo:
+            return
+        if story_state not in self.particoes:
+            return
+        self._alteradas.setdefault(story_id, self._status_atual.get(story_id))
+        self._colocar(story_id, story_state, last_chapter, progress)
+        if self.ao_alterar is not None:
+            self.ao_alterar()
+
+    def stories(self, status: str) -> List[Dict[str, Any]]:
+        """Histórias de um status, na ordem do catálogo"""
+        return sorted(self.particoes.get(status, {}).values(), key=lambda story: self._ordem[story["id"]])
+
+    def contagem(self, status: str) -> int:
+        return len(self.particoes.get(status, {}))
+
+    def consumir_alteracoes(self) -> List[Tuple[str, Optional[str], str]]:
+        """Lista de (story_id, status_anterior, status_atual) desde a última chamada"""
+        alteracoes = [(story_id, anterior, self._status_atual[story_id])
+                      for story_id, anterior in self._alteradas.items()]
+        self._alteradas.clear()
+        return alteracoes
+
+    def desconectar(self) -> None:
+        self.repositorio.remover_ouvinte(self._on_progresso_salvo)
@@ -0,0 +1,184 @@
+from PySide6.QtWidgets import QMainWindow, QVBoxLayout, QHBoxLayout, QLabel
+from PySide6.QtCore import Qt, Signal
+
+from decisiontimer import CountdownLabel, agora_ms, temporizador_decisoes
+from mundoconsciencias import BackgroundWidget, GlassCard, ModernButton
+from nodeprefetch import NodePrefetcher
+from profileengine import ProfileEngine
+from storyengine import StoryCursor
+from storystats import separar_modo
+
+
+class StoryScreen(QMainWindow):
+    """Tela que conduz o jogador pelos nós de uma história compilada"""
+    story_finished = Signal(str, dict)  # story_id, efeito acumulado por atributo
+
+    def __init__(self, story, db, user_apelido, progress_id=None, start_node=None, decision_seconds=None,
+                 parent=None):
+        super().__init__(parent)
+        self.story = story
+        self.db = db
+        self.user_apelido = user_apelido
+        # Id usado ao salvar o progresso (ex.: elias_story_timed no modo temporizado)
+        self.progress_id = progress_id or story.story_id
+        self.mode = separar_modo(self.progress_id)[1]
+        # Modo 2: segundos para cada decisão (None = sem tempo)
+        self.decision_seconds = decision_seconds
+        self.node_shown_at = agora_ms()
+        node = story.node_id(start_node) if start_node else None
+        self.cursor = StoryCursor(story, node)
+        self.choice_buttons = []
+        # Imagens dos próximos nós decodificadas enquanto o jogador lê
+        self.prefetcher = NodePrefetcher(story)
+
+        # Perfil ético atualizado a cada escolha
+        self.profile_engine = ProfileEngine([story])
+        self.profile = ProfileEngine.vetor(db.get_user_profile(user_apelido))
+
+        self.setWindowTitle(f"Na Pele e na Consciência - {story.title}")
+        self.setMinimumSize(1200, 800)
+
+        self.background_widget = BackgroundWidget("assets/world_bg.jpg")
+        self.setCentralWidget(self.background_widget)
+
+        main_layout = QVBoxLayout(self.background_widget)
+        main_layout.setContentsMargins(120, 60, 120, 60)
+        main_layout.setSpacing(30)
+
+        title_label = QLabel(story.title.upper())
+        title_label.setStyleSheet("""
+            QLabel {
+                color: #FFD700;
+                font-size: 32px;
+                font-weight: bold;
+                letter-spacing: 2px;
+            }
+        """)
+        title_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        main_layout.addWidget(title_label)
+
+        self.countdown_label = CountdownLabel()
+        self.countdown_label.setVisible(decision_seconds is not None)
+        main_layout.addWidget(self.countdown_label, 0, Qt.AlignmentFlag.AlignCenter)
+
+        self.timeout_label = QLabel("Tempo esgotado! A história recomeçou do início.")
+        self.timeout_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.timeout_label.setStyleSheet("color: #FF6347; font-size: 18px; font-weight: bold;")
+        self.timeout_label.hide()
+        main_layout.addWidget(self.timeout_label)
+
+        card = GlassCard()
+        card_layout = QVBoxLayout(card)
+        card_layout.setContentsMargins(50, 40, 50, 40)
+        card_layout.setSpacing(25)
+
+        self.image_label = QLabel()
+        self.image_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        self.image_label.setStyleSheet("background: transparent; border: none;")
+        card_layout.addWidget(self.image_label)
+
+        self.text_label = QLabel()
+        self.text_label.setWordWrap(True)
+        self.text_label.setStyleSheet("""
+            QLabel {
+                color: white;
+                font-size: 20px;
+                line-height: 150%;
+                background: transparent;
+                border: none;
+            }
+        """)
+        card_layout.addWidget(self.text_label, 1)
+
+        self.choices_layout = QVBoxLayout()
+        self.choices_layout.setSpacing(15)
+        card_layout.addLayout(self.choices_layout)
+
+        main_layout.addWidget(card, 1)
+
+        bottom_layout = QHBoxLayout()
+        bottom_layout.addStretch()
+        self.close_btn = ModernButton("SAIR DA HISTÓRIA", "grafite")
+        self.close_btn.setFixedWidth(250)
+        self.close_btn.clicked.connect(self.close)
+        bottom_layout.addWidget(self.close_btn)
+        main_layout.addLayout(bottom_layout)
+
+        self.show_node()
+
+    def show_node(self):
+        """Exibe o texto, a imagem e as escolhas do nó atual"""
+        story, node = self.story, self.cursor.node
+        self.text_label.setText(story.text(node))
+        # Início do tempo de reação registrado com a escolha
+        self.node_shown_at = agora_ms()
+
+        image_path = story.image(node)
+        pixmap = self.prefetcher.pixmap(image_path) if image_path else None
+        if pixmap is not None and not pixmap.isNull():
+            self.image_label.setPixmap(pixmap)
+            self.image_label.show()
+        else:
+            self.image_label.hide()
+
+        for button in self.choice_buttons:
+            self.choices_layout.removeWidget(button)
+            button.deleteLater()
+        self.choice_buttons = []
+
+        if self.cursor.finished:
+            temporizador_decisoes.parar(self)
+            self.countdown_label.hide()
+            button = ModernButton("VOLTAR AO MUNDO DE CONSCIÊNCIAS", "dourado")
+            button.clicked.connect(self.close)
+            self.choices_layout.addWidget(button)
+            self.choice_buttons.append(button)
+            return
+
+        self.prefetcher.entrar(node)
+        for index, text in enumerate(self.cursor.choices()):
+            button = ModernButton(text, "ardosia")
+            button.clicked.connect(lambda checked=False, i=index: self.make_choice(i))
+            self.choices_layout.addWidget(button)
+            self.choice_buttons.append(button)
+
+        if self.decision_seconds is not None:
+            temporizador_decisoes.iniciar(self, self.decision_seconds * 1000,
+                                          self.countdown_label.mostrar, self.on_time_up)
+
+    def on_time_up(self):
+        """Tempo esgotado no Modo 2: a história recomeça do início"""
+        self.cursor = StoryCursor(self.story)
+        # Sem último nó: a próxima escolha conta como início de partida, não
+        # como escolha feita no nó em que o tempo acabou
+        self.db.save_story_progress(self.user_apelido, self.progress_id, "in_progress", None)
+        self.timeout_label.show()
+        self.show_node()
+
+    def make_choice(self, index):
+        """Aplica a escolha, salva o progresso e avança"""
+        node = self.cursor.node
+        choice_index = self.story.choice_offset[node] + index
+        # Mesmo relógio da contagem do Modo 2
+        elapsed_ms = agora_ms() - self.node_shown_at
+        temporizador_decisoes.parar(self)
+        self.timeout_label.hide()
+        self.db.registrar_escolha(self.user_apelido, self.story.story_id, node, choice_index, elapsed_ms, self.mode)
+        self.cursor.choose(index)
+        self.profile = self.profile_engine.aplicar(self.profile, self.story.story_id, choice_index)
+        self.db.salvar_perfil(self.user_apelido, ProfileEngine.como_dict(self.profile))
+        node_name = self.story.node_name(self.cursor.node)
+        if self.cursor.finished:
+            self.db.save_story_progress(self.user_apelido, self.progress_id, "completed", node_name, 100)
+            self.story_finished.emit(self.progress_id, self.cursor.effects())
+        else:
+            self.db.save_story_progress(self.user_apelido, self.progress_id, "in_progress", node_name)
+        self.show_node()
+
+    def closeEvent(self, event):
+        # Sem isso a contagem do Modo 2 continuaria e recomeçaria a história fechada
+        temporizador_decisoes.parar(self)
+        self.prefetcher.close()
+        # Solta o mmap do pacote (cada abertura da história cria um novo)
+        self.story.close()
+        super().closeEvent(event)
@@ -0,0 +1,376 @@
+"""Estatísticas agregadas das histórias para as telas da comunidade e de perfil.
+
+Uso:
+    python storystats.py reconstruir [--db database.db] [--log escolhas.log] [--historias stories]
+    python storystats.py mostrar elias_story [--db database.db]
+
+As tabelas estatisticas_* são mantidas a cada save_story_progress, na
+mesma transação que grava o progresso: para cada história e modo (modo1,
+ou modo2 quando o id do progresso termina em _timed), quantos jogadores
+começaram, estão em andamento e concluíram e a soma do progresso; para
+cada nó, quantas vezes foi alcançado; e, para cada nó de origem, quantas
+vezes cada destino foi escolhido. As consultas são buscas pela chave
+primária, sem percorrer o progresso de todos os usuários.
+
+'reconstruir' recalcula os totais por história a partir da tabela
+user_stories, caso as estatísticas tenham ficado para trás (por exemplo,
+num banco anterior a elas). As visitas por nó e as escolhas são
+recalculadas repetindo o log de escolhas (choicelog), se ele existir.
+"""
+import argparse
+import glob
+import os
+import sqlite3
+import sys
+from collections import Counter
+from typing import Dict, Any, Iterable, List, Optional, Tuple
+
+from database import ConnectionPool
+
+# Sufixo dos ids de progresso do modo com tempo (ex.: elias_story_timed)
+TIMED_SUFFIX = "_timed"
+MODES = ("modo1", "modo2")
+
+# Origem registrada para a primeira escolha de uma partida
+START_NODE = ""
+
+
+def origem_da_escolha(status_anterior: Optional[str], no_anterior: Optional[str]) -> str:
+    """Nó de onde saiu a escolha que levou ao próximo nó gravado.
+
+    Convenção usada tanto por registrar quanto por reconstruir_escolhas:
+    numa partida em andamento é o último nó gravado; se a partida está
+    (re)começando (primeira escolha, depois de concluir ou de o tempo
+    esgotar no Modo 2), é START_NODE.
+    """
+    return no_anterior if status_anterior == "in_progress" and no_anterior else START_NODE
+
+
+def separar_modo(progress_id: str) -> Tuple[str, str]:
+    """'elias_story_timed' -> ('elias_story', 'modo2'); sem o sufixo, modo1"""
+    if progress_id.endswith(TIMED_SUFFIX):
+        return progress_id[:-len(TIMED_SUFFIX)], "modo2"
+    return progress_id, "modo1"
+
+
+class StoryAggregates:
+    """Totais por história, por nó e por escolha, atualizados de forma incremental"""
+
+    def __init__(self, pool: ConnectionPool) -> None:
+        self.pool = pool
+        self.create_tables()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        return self.pool.connection()
+
+    def create_tables(self) -> None:
+        """Cria as tabelas de estatísticas se não existirem"""
+        try:
+            with self.conn as conn:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS estatisticas_historias (
+                        story_id TEXT NOT NULL,
+                        modo TEXT NOT NULL,
+                        jogadores INTEGER NOT NULL DEFAULT 0,
+                        em_andamento INTEGER NOT NULL DEFAULT 0,
+                        concluidas INTEGER NOT NULL DEFAULT 0,
+                        soma_progresso INTEGER NOT NULL DEFAULT 0,
+                        PRIMARY KEY (story_id, modo)
+                    )
+                ''')
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS estatisticas_nos (
+                        story_id TEXT NOT NULL,
+                        modo TEXT NOT NULL,
+                        no TEXT NOT NULL,
+                        visitas INTEGER NOT NULL DEFAULT 0,
+                        PRIMARY KEY (story_id, modo, no)
+                    )
+                ''')
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS estatisticas_escolhas (
+                        story_id TEXT NOT NULL,
+                        modo TEXT NOT NULL,
+                        origem TEXT NOT NULL,
+                        destino TEXT NOT NULL,
+                        vezes INTEGER NOT NULL DEFAULT 0,
+                        PRIMARY KEY (story_id, modo, origem, destino)
+                    )
+                ''')
+        except sqlite3.Error as e:
+            print(f"Erro ao criar tabelas de estatísticas: {e}")
+            raise
+
+    def registrar(self, conn: sqlite3.Connection, registros: List[Tuple]) -> None:
+        """Aplica os registros (user_id, story_id, status, progress, last_chapter) às estatísticas.
+
+        Deve ser chamado na transação da gravação, antes do upsert em
+        user_stories, porque compara cada registro com o estado anterior.
+        Erros do SQLite sobem para quem grava, que desfaz a transação toda.
+        """
+        historias: Dict[Tuple[str, str], List[int]] = {}
+        nos: Counter = Counter()
+        escolhas: Counter = Counter()
+        # Estado mais recente de cada (usuário, história) dentro deste lote
+        estados: Dict[Tuple[int, str], Optional[Tuple]] = {}
+
+        for user_id, progress_id, status, progress, last_chapter in registros:
+            chave = (user_id, progress_id)
+            if chave not in estados:
+                estados[chave] = conn.execute(
+                    'SELECT status, progress, last_chapter FROM user_stories WHERE user_id = ? AND story_name = ?',
+                    chave).fetchone()
+            anterior = estados[chave]
+            status_anterior, progresso_anterior, no_anterior = anterior or (None, None, None)
+            if progress is None:
+                # Mesmo COALESCE do upsert: sem progresso informado, mantém o anterior
+                progress = progresso_anterior
+
+            story_id, modo = separar_modo(progress_id)
+            totais = historias.setdefault((story_id, modo), [0, 0, 0, 0])
+            totais[0] += anterior is None
+            totais[1] += (status == "in_progress") - (status_anterior == "in_progress")
+            totais[2] += (status == "completed") - (status_anterior == "completed")
+            totais[3] += (progress or 0) - (progresso_anterior or 0)
+
+            if last_chapter:
+                # Cada gravação com nó é uma escolha feita (StoryScreen.make_choice),
+                # inclusive a que volta ao mesmo nó
+                nos[(story_id, modo, last_chapter)] += 1
+                escolhas[(story_id, modo, origem_da_escolha(status_anterior, no_anterior), last_chapter)] += 1
+            estados[chave] = (status, progress, last_chapter)
+
+        conn.executemany('''
+            INSERT INTO estatisticas_historias (story_id, modo, jogadores, em_andamento, concluidas, soma_progresso)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (story_id, modo) DO UPDATE SET
+                jogadores = jogadores + excluded.jogadores,
+                em_andamento = em_andamento + excluded.em_andamento,
+                concluidas = concluidas + excluded.concluidas,
+                soma_progresso = soma_progresso + excluded.soma_progresso
+        ''', [(*chave, *totais) for chave, totais in historias.items()])
+        conn.executemany('''
+            INSERT INTO estatisticas_nos (story_id, modo, no, visitas) VALUES (?, ?, ?, ?)
+            ON CONFLICT (story_id, modo, no) DO UPDATE SET visitas = visitas + excluded.visitas
+        ''', [(*chave, vezes) for chave, vezes in nos.items()])
+        conn.executemany('''
+            INSERT INTO estatisticas_escolhas (story_id, modo, origem, destino, vezes) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT (story_id, modo, origem, destino) DO UPDATE SET vezes = vezes + excluded.vezes
+        ''', [(*chave, vezes) for chave, vezes in escolhas.items()])
+
+    def _modos(self, modo: Optional[str]) -> Iterable[str]:
+        return MODES if modo is None else (modo,)
+
+    def resumo(self, story_id: str, modo: Optional[str] = None) -> Dict[str, Any]:
+        """Jogadores, partidas em andamento e concluídas, progresso médio e taxa de conclusão (modo None = ambos)"""
+        jogadores = em_andamento = concluidas = soma_progresso = 0
+        try:
+            for m in self._modos(modo):
+                linha = self.conn.execute('''
+                    SELECT jogadores, em_andamento, concluidas, soma_progresso
+                    FROM estatisticas_historias WHERE story_id = ? AND modo = ?
+                ''', (story_id, m)).fetchone()
+                if linha:
+                    jogadores += linha[0]
+                    em_andamento += linha[1]
+                    concluidas += linha[2]
+                    soma_progresso += linha[3]
+        except sqlite3.Error as e:
+            print(f"Erro ao carregar estatísticas: {e}")
+        return {
+            "jogadores": jogadores,
+            "em_andamento": em_andamento,
+            "concluidas": concluidas,
+            "progresso_medio": soma_progresso / jogadores if jogadores else 0.0,
+            "taxa_conclusao": concluidas / jogadores if jogadores else 0.0,
+        }
+
+    def visitas(self, story_id: str, no: str, modo: Optional[str] = None) -> int:
+        """Quantas vezes o nó foi alcançado"""
+        total = 0
+        try:
+            for m in self._modos(modo):
+                linha = self.conn.execute(
+                    'SELECT visitas FROM estatisticas_nos WHERE story_id = ? AND modo = ? AND no = ?',
+                    (story_id, m, no)).fetchone()
+                total += linha[0] if linha else 0
+        except sqlite3.Error as e:
+            print(f"Erro ao carregar estatísticas: {e}")
+        return total
+
+    def distribuicao(self, story_id: str, origem: str, modo: Optional[str] = None) -> Dict[str, float]:
+        """Fração das escolhas feitas em 'origem' que levou a cada destino"""
+        vezes: Counter = Counter()
+        try:
+            for m in self._modos(modo):
+                vezes.update(dict(self.conn.execute(
+                    'SELECT destino, vezes FROM estatisticas_escolhas WHERE story_id = ? AND modo = ? AND origem = ?',
+                    (story_id, m, origem))))
+        except sqlite3.Error as e:
+            print(f"Erro ao carregar estatísticas: {e}")
+        total = sum(vezes.values())
+        return {destino: n / total for destino, n in vezes.items()} if total else {}
+
+    def reconstruir(self) -> bool:
+        """Recalcula os totais por história a partir de user_stories"""
+        historias: Dict[Tuple[str, str], List[int]] = {}
+        try:
+            with self.conn as conn:
+                for progress_id, jogadores, em_andamento, concluidas, soma in conn.execute('''
+                    SELECT story_name, COUNT(*), SUM(status = 'in_progress'), SUM(status = 'completed'),
+                           SUM(COALESCE(progress, 0))
+                    FROM user_stories GROUP BY story_name
+                '''):
+                    totais = historias.setdefault(separar_modo(progress_id), [0, 0, 0, 0])
+                    for i, valor in enumerate((jogadores, em_andamento, concluidas, soma)):
+                        totais[i] += valor
+                conn.execute("DELETE FROM estatisticas_historias")
+                conn.executemany('''
+                    INSERT INTO estatisticas_historias
+                        (story_id, modo, jogadores, em_andamento, concluidas, soma_progresso)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', [(*chave, *totais) for chave, totais in historias.items()])
+            return True
+        except sqlite3.Error as e:
+            print(f"Erro ao reconstruir estatísticas: {e}")
+            return False
+
+    def reconstruir_escolhas(self, log_path: str, stories: Dict[str, Any]) -> bool:
+        """Recalcula as visitas por nó e as escolhas por origem repetindo o log de escolhas.
+
+        'stories' mapeia o id para a história compilada, usada para traduzir
+        os números de nó e de escolha do log para os nomes dos nós.
+        """
+        import numpy as np
+        from choicelog import StoryRegistry, ler_eventos, registry_path
+
+        registro = StoryRegistry(registry_path(log_path))
+        # Os eventos de cada (usuário, história, modo) são repetidos na ordem
+        # do log: a escolha continua a partida se saiu do destino da escolha
+        # anterior e ele não era um final; senão a partida (re)começou, como
+        # quando registrar vê uma partida concluída ou sem nó gravado
+        vezes: Counter = Counter()
+        # (história, usuário, modo) -> destino da última escolha, entre blocos
+        ultimos: Dict[Tuple[int, int, int], int] = {}
+        tabelas = {}
+        for numero, story_id in enumerate(registro.ids):
+            story = stories.get(story_id)
+            if story is not None:
+                tabelas[numero] = (story, np.asarray(story.choice_targets, dtype=np.int64),
+                                   np.asarray(story.node_ending, dtype=bool))
+
+        for eventos in ler_eventos(log_path):
+            for numero in np.unique(eventos["story"]).tolist():
+                if numero not in tabelas:
+                    continue
+                story, destinos, finais = tabelas[numero]
+                daqui = eventos[eventos["story"] == numero]
+                validos = (daqui["mode"] >= 1) & (daqui["mode"] <= len(MODES)) & (daqui["choice"] < len(destinos))
+                daqui = daqui[validos]
+                if not len(daqui):
+                    continue
+                chaves = daqui["user_id"].astype(np.int64) * 256 + daqui["mode"]
+                ordem = np.argsort(chaves, kind="stable")
+                chaves = chaves[ordem]
+                node = daqui["node"][ordem].astype(np.int64)
+                destino = destinos[daqui["choice"][ordem].astype(np.int64)]
+
+                anterior = np.empty_like(destino)
+                anterior[1:] = destino[:-1]
+                inicios = np.flatnonzero(np.r_[True, chaves[1:] != chaves[:-1]])
+                anterior[inicios] = [ultimos.get((numero, chave), -1) for chave in chaves[inicios].tolist()]
+                continua = (anterior == node) & ~finais[np.maximum(anterior, 0)]
+                origem = np.where(continua, node, -1)
+
+                fins = np.r_[inicios[1:], len(chaves)] - 1
+                ultimos.update(zip(((numero, chave) for chave in chaves[fins].tolist()), destino[fins].tolist()))
+
+                colunas = np.stack((daqui["mode"][ordem].astype(np.int64), origem, destino))
+                unicas, contagens = np.unique(colunas, axis=1, return_counts=True)
+                vezes.update({(numero, *chave): n for chave, n in zip(map(tuple, unicas.T.tolist()),
+                                                                       contagens.tolist())})
+
+        nos: Counter = Counter()
+        escolhas: Counter = Counter()
+        for (numero, codigo, origem, destino), n in vezes.items():
+            story = tabelas[numero][0]
+            modo = MODES[codigo - 1]
+            nome_origem = START_NODE if origem < 0 else story.node_name(origem)
+            nome_destino = story.node_name(destino)
+            nos[(story.story_id, modo, nome_destino)] += n
+            escolhas[(story.story_id, modo, nome_origem, nome_destino)] += n
+        try:
+            with self.conn as conn:
+                conn.execute("DELETE FROM estatisticas_nos")
+                conn.execute("DELETE FROM estatisticas_escolhas")
+                conn.executemany('INSERT INTO estatisticas_nos (story_id, modo, no, visitas) VALUES (?, ?, ?, ?)',
+                                 [(*chave, n) for chave, n in nos.items()])
+                conn.executemany('''
+                    INSERT INTO estatisticas_escolhas (story_id, modo, origem, destino, vezes)
+                    VALUES (?, ?, ?, ?, ?)
+                ''', [(*chave, n) for chave, n in escolhas.items()])
+            return True
+        except sqlite3.Error as e:
+            print(f"Erro ao reconstruir estatísticas das escolhas: {e}")
+            return False
+
+
+def reconstruir(args):
+    pool = ConnectionPool(args.db)
+    try:
+        agregados = StoryAggregates(pool)
+        if not agregados.reconstruir():
+            return 1
+        if os.path.exists(args.log):
+            from storybundle import open_story
+            stories = {}
+            for source_path in sorted(glob.glob(os.path.join(args.historias, "*.json"))):
+                try:
+                    story = open_story(source_path)
+                except (OSError, ValueError) as e:
+                    print(f"{source_path}: {e}")
+                    continue
+                stories[story.story_id] = story
+            if not agregados.reconstruir_escolhas(args.log, stories):
+                return 1
+        total = agregados.conn.execute("SELECT COUNT(*) FROM estatisticas_historias").fetchone()[0]
+    finally:
+        pool.close_all()
+    print(f"Estatísticas reconstruídas: {total} história(s)/modo(s)")
+    return 0
+
+
+def mostrar(args):
+    pool = ConnectionPool(args.db)
+    try:
+        agregados = StoryAggregates(pool)
+        for modo in (None,) + MODES:
+            resumo = agregados.resumo(args.story_id, modo)
+            print(f"{modo or 'total'}: {resumo['jogadores']} jogadores, {resumo['em_andamento']} em andamento, "
+                  f"{resumo['concluidas']} concluídas, progresso médio {resumo['progresso_medio']:.0f}%")
+    finally:
+        pool.close_all()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Estatísticas agregadas das histórias")
+    parser.add_argument('--db', default='database.db', help="banco de dados (padrão: database.db)")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p_reconstruir = sub.add_parser('reconstruir', help="recalcula as estatísticas a partir do progresso salvo")
+    p_reconstruir.add_argument('--log', default='escolhas.log', help="log de escolhas (padrão: escolhas.log)")
+    p_reconstruir.add_argument('--historias', default='stories', help="pasta das histórias (padrão: stories)")
+    p_reconstruir.set_defaults(func=reconstruir)
+
+    p_mostrar = sub.add_parser('mostrar', help="mostra os totais de uma história")
+    p_mostrar.add_argument('story_id')
+    p_mostrar.set_defaults(func=mostrar)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
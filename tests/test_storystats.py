@@ -0,0 +1,105 @@
+import os
+import tempfile
+import unittest
+
+from database import Database
+from storyengine import StoryCursor, compile_story
+from storyprogress import StoryProgressRepository
+from storystats import separar_modo
+
+# a -> b | c; b volta para a, fica em b ou termina; c termina
+HISTORIA = {
+    "id": "teste",
+    "title": "Teste",
+    "start": "a",
+    "nodes": {
+        "a": {"text": "A", "choices": [{"text": "b", "target": "b"}, {"text": "c", "target": "c"}]},
+        "b": {"text": "B", "choices": [{"text": "a", "target": "a"}, {"text": "b", "target": "b"},
+                                       {"text": "fim", "target": "fim"}]},
+        "c": {"text": "C", "choices": [{"text": "fim", "target": "fim"}]},
+        "fim": {"text": "Fim", "ending": True},
+    },
+}
+
+
+class Partida:
+    """Mesmas gravações que a StoryScreen faz a cada escolha e quando o tempo esgota"""
+
+    def __init__(self, repositorio, story, apelido, progress_id, start_node=None):
+        self.repositorio = repositorio
+        self.story = story
+        self.apelido = apelido
+        self.progress_id = progress_id
+        self.modo = separar_modo(progress_id)[1]
+        self.cursor = StoryCursor(story, story.node_id(start_node) if start_node else None)
+
+    def escolher(self, texto):
+        node = self.cursor.node
+        indice = [self.story.choice_text(node, i) for i in range(self.story.choice_count(node))].index(texto)
+        self.repositorio.registrar_escolha(self.apelido, self.story.story_id, node,
+                                           self.story.choice_offset[node] + indice, 0, self.modo)
+        self.cursor.choose(indice)
+        nome = self.story.node_name(self.cursor.node)
+        if self.cursor.finished:
+            self.repositorio.save_story_progress(self.apelido, self.progress_id, "completed", nome, 100)
+        else:
+            self.repositorio.save_story_progress(self.apelido, self.progress_id, "in_progress", nome)
+
+    def esgotar_tempo(self):
+        self.cursor = StoryCursor(self.story)
+        self.repositorio.save_story_progress(self.apelido, self.progress_id, "in_progress", None)
+
+
+class StoryAggregatesTest(unittest.TestCase):
+    def setUp(self):
+        self.pasta = tempfile.TemporaryDirectory()
+        caminho = lambda nome: os.path.join(self.pasta.name, nome)
+        self.log = caminho("escolhas.log")
+        self.usuarios = Database(caminho("usuarios.db"))
+        for apelido in ("ana", "bia"):
+            self.usuarios.inserir_usuario(apelido, apelido, f"{apelido}@teste", "x")
+        self.repositorio = StoryProgressRepository(self.usuarios, caminho("database.db"), log_escolhas=self.log)
+        self.story = compile_story(HISTORIA)
+
+    def tearDown(self):
+        self.repositorio.close()
+        self.usuarios.close()
+        self.pasta.cleanup()
+
+    def tabelas(self):
+        conn = self.repositorio.agregados.conn
+        return {tabela: conn.execute(f"SELECT * FROM {tabela} ORDER BY 1, 2, 3, 4").fetchall()
+                for tabela in ("estatisticas_historias", "estatisticas_nos", "estatisticas_escolhas")}
+
+    def test_reconstruir_da_o_mesmo_que_as_gravacoes_incrementais(self):
+        story = self.story
+        ana = Partida(self.repositorio, story, "ana", "teste")
+        # Fica no mesmo nó, volta ao início e termina; depois joga de novo
+        for texto in ("b", "b", "a", "c", "fim"):
+            ana.escolher(texto)
+        ana = Partida(self.repositorio, story, "ana", "teste")
+        for texto in ("b", "fim"):
+            ana.escolher(texto)
+
+        # Modo 2: o tempo esgota em b, a partida recomeça e depois é retomada em c
+        bia = Partida(self.repositorio, story, "bia", "teste_timed")
+        bia.escolher("b")
+        bia.esgotar_tempo()
+        bia.escolher("c")
+        bia = Partida(self.repositorio, story, "bia", "teste_timed", start_node="c")
+        bia.escolher("fim")
+
+        Partida(self.repositorio, story, "ana", "teste_timed").escolher("c")
+
+        incrementais = self.tabelas()
+        self.assertTrue(all(incrementais.values()))
+
+        self.repositorio.escolhas.descarregar()
+        agregados = self.repositorio.agregados
+        self.assertTrue(agregados.reconstruir())
+        self.assertTrue(agregados.reconstruir_escolhas(self.log, {story.story_id: story}))
+        self.assertEqual(self.tabelas(), incrementais)
+
+
+if __name__ == "__main__":
+    unittest.main()
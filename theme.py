@@ -0,0 +1,544 @@
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from PySide6.QtGui import QColor
+from PySide6.QtWidgets import QApplication, QWidget
+
+# Cores, gradientes e fontes de todas as telas; a folha de estilo é gerada a partir daqui
+TOKENS: Dict[str, Any] = {
+    "fonte": "'Arial'",
+    "texto": "white",
+    "ouro": "#FFD700",
+    "ouro_suave": "#FFD54F",
+    "cinza_texto": "#AAAAAA",
+    "aba_texto": "#CCCCCC",
+    "vazio_texto": "#666688",
+    "reserva_texto": "rgba(255, 255, 255, 0.7)",
+    "vidro": "rgba(35, 40, 60, 0.4)",
+    "vidro_borda": "rgba(255, 255, 255, 0.1)",
+    "vidro_pressionado": "rgba(50, 55, 80, 0.6)",
+    "vidro_borda_pressionado": "rgba(255, 255, 255, 0.2)",
+    "rolagem": "rgba(50, 55, 80, 0.3)",
+    "rolagem_alca": "rgba(255, 215, 0, 0.5)",
+    "contagem_borda": "#9370DB",
+    "urgente": "#FF6347",
+    # Sombra do GlassCard, pintada por ele na margem em volta do vidro
+    "sombra_desfoque": 15,
+    "sombra_deslocamento": 5,
+    "painel_abas": "rgba(30, 35, 50, 0.5)",
+    "aba": "rgba(60, 65, 90, 0.7)",
+    "aba_selecionada": "rgba(80, 85, 120, 0.9)",
+    "aba_hover": "rgba(90, 95, 130, 0.8)",
+    "mensagem_fundo": "#333333",
+    "mensagem_botao": "#555555",
+    "mensagem_botao_hover": "#777777",
+    "menu_fundo": "#2c3e50",
+    "icone_marcado": "check.png",
+    "formulario": ("#F06292", "#FFD54F", "#8E24AA"),
+    "formulario_hover": ("#FF80AB", "#FFEB3B", "#AB47BC"),
+    "voltar": ("#6D6D6D", "#9E9E9E", "#6D6D6D"),
+    "voltar_hover": ("#8E8E8E", "#BEBEBE", "#8E8E8E"),
+    "iniciar": ("#8A2BE2", "#FF1493", "#FF8C00"),
+    "iniciar_hover": ("#9932CC", "#FF69B4", "#FFA500"),
+    # Botões do menu principal, na ordem: (normal, hover)
+    "menu": (
+        (("#FF8C00", "#FF4500"), ("#FFA07A", "#FF6347")),
+        (("#FF69B4", "#FF1493"), ("#FFB6C1", "#FF69B4")),
+        (("#9370DB", "#8A2BE2"), ("#BA55D3", "#9932CC")),
+        (("#8A2BE2", "#4B0082"), ("#9370DB", "#6A5ACD")),
+        (("#4B0082", "#6A5ACD"), ("#6A5ACD", "#836FFF")),
+        (("#6A5ACD", "#DDA0DD"), ("#DDA0DD", "#EE82EE")),
+    ),
+}
+
+# Variantes do ModernButton (e dos indicadores de modo): cor inicial e final do gradiente
+BUTTON_VARIANTS: Dict[str, Sequence[str]] = {
+    "dourado": ("#FF8C00", "#FFD700"),
+    "violeta": ("#8A2BE2", "#9370DB"),
+    "ardosia": ("#6A5ACD", "#9370DB"),
+    "grafite": ("#4A4A6A", "#6A6A8A"),
+}
+
+
+def _gradiente(cores: Sequence[str]) -> str:
+    """Gradiente horizontal com as paradas distribuídas igualmente"""
+    ultima = len(cores) - 1
+    paradas = ", ".join(f"stop:{i / ultima:g} {cor}" for i, cor in enumerate(cores))
+    return f"qlineargradient(x1:0, y1:0, x2:1, y2:0, {paradas})"
+
+
+def _clarear(cor: str, fator: float = 0.2) -> str:
+    return QColor(cor).lighter(int(100 + fator * 100)).name()
+
+
+def _escurecer(cor: str, fator: float = 0.2) -> str:
+    return QColor(cor).darker(int(100 + fator * 100)).name()
+
+
+def _botoes_modernos(t: Dict[str, Any]) -> str:
+    regras = []
+    for nome, (cor1, cor2) in BUTTON_VARIANTS.items():
+        seletor = f'QPushButton#ModernButton[variante="{nome}"]'
+        regras.append(f"""
+            {seletor} {{
+                background-color: {_gradiente((cor1, cor2))};
+                color: {t["texto"]};
+                border-radius: 25px;
+                font: bold 16px;
+                padding: 0 25px;
+                border: none;
+            }}
+            {seletor}:hover {{
+                background-color: {_gradiente((_clarear(cor1), _clarear(cor2)))};
+            }}
+            {seletor}:pressed {{
+                background-color: {_gradiente((_escurecer(cor1), _escurecer(cor2)))};
+                padding-top: 2px;
+            }}
+            {seletor}[selecionado="true"] {{
+                border: 2px solid {cor2};
+            }}
+            QLabel#IndicadorModo[variante="{nome}"] {{
+                background-color: transparent;
+                border: 2px solid {cor2};
+                border-radius: 15px;
+            }}
+            QLabel#IndicadorModo[variante="{nome}"][selecionado="true"] {{
+                background-color: {cor2};
+            }}
+        """)
+    return "".join(regras)
+
+
+def margens_sombra(t: Optional[Dict[str, Any]] = None) -> Tuple[int, int, int, int]:
+    """Margem (esquerda, cima, direita, baixo) que o GlassCard reserva para a sombra"""
+    t = t or TOKENS
+    desfoque, deslocamento = t["sombra_desfoque"], t["sombra_deslocamento"]
+    return desfoque, desfoque - deslocamento, desfoque, desfoque + deslocamento
+
+
+def _mundo(t: Dict[str, Any]) -> str:
+    """Mundo de Consciências: cards de vidro, títulos e abas de status"""
+    esquerda, cima, direita, baixo = margens_sombra(t)
+    return f"""
+        QFrame#GlassCard {{
+            margin: {cima}px {direita}px {baixo}px {esquerda}px;
+        }}
+        QFrame#GlassCard, QFrame#GlassCard QFrame {{
+            background-color: {t["vidro"]};
+            border-radius: 20px;
+            border: 1px solid {t["vidro_borda"]};
+        }}
+        QFrame#GlassCard[pressionado="true"], QFrame#GlassCard[pressionado="true"] QFrame {{
+            background-color: {t["vidro_pressionado"]};
+            border: 1px solid {t["vidro_borda_pressionado"]};
+        }}
+        QFrame#GlassCard QFrame#DivisorCard {{
+            border: 1px solid {t["vidro_borda"]};
+        }}
+        QLabel#TituloCard {{
+            color: {t["ouro"]};
+            font-size: 24px;
+            font-weight: bold;
+            text-align: center;
+            text-shadow: 1px 1px 3px rgba(0, 0, 0, 0.5);
+        }}
+        QLabel#StatusCard {{
+            color: {t["cinza_texto"]};
+            font-size: 16px;
+            font-weight: bold;
+            text-align: center;
+            letter-spacing: 2px;
+        }}
+        QLabel#IconeReserva {{
+            font-size: 80px;
+            color: {t["reserva_texto"]};
+        }}
+        QLabel#TituloTela {{
+            color: {t["ouro"]};
+            font-size: 32px;
+            font-weight: bold;
+            text-shadow: 2px 2px 8px rgba(0, 0, 0, 0.7);
+            letter-spacing: 3px;
+        }}
+        QLabel#RotuloSecao {{
+            color: {t["cinza_texto"]};
+            font-size: 18px;
+            font-weight: bold;
+            letter-spacing: 2px;
+        }}
+        QLabel#TituloSecao {{
+            color: {t["ouro"]};
+            font-size: 24px;
+            font-weight: bold;
+            text-shadow: 1px 1px 5px rgba(0, 0, 0, 0.5);
+            letter-spacing: 2px;
+        }}
+        QLabel#AbaVazia {{
+            color: {t["vazio_texto"]};
+            font-size: 20px;
+            font-style: italic;
+            padding: 50px 0;
+        }}
+        QTabWidget#AbasStatus::pane {{
+            border: none;
+            background-color: {t["painel_abas"]};
+            border-radius: 15px;
+        }}
+        QTabWidget#AbasStatus QTabBar::tab {{
+            background-color: {t["aba"]};
+            color: {t["aba_texto"]};
+            padding: 15px 30px;
+            border-top-left-radius: 10px;
+            border-top-right-radius: 10px;
+            border: 1px solid {t["vidro_borda"]};
+            font-size: 16px;
+            font-weight: bold;
+        }}
+        QTabWidget#AbasStatus QTabBar::tab:selected {{
+            background-color: {t["aba_selecionada"]};
+            color: {t["ouro"]};
+            border-bottom: 3px solid {t["ouro"]};
+        }}
+        QTabWidget#AbasStatus QTabBar::tab:hover {{
+            background-color: {t["aba_hover"]};
+        }}
+        QListView#ListaHistorias {{
+            border: none;
+            background-color: transparent;
+        }}
+        QListView#ListaHistorias QScrollBar:vertical {{
+            background: {t["rolagem"]};
+            width: 12px;
+            margin: 0px;
+        }}
+        QListView#ListaHistorias QScrollBar::handle:vertical {{
+            background: {t["rolagem_alca"]};
+            min-height: 20px;
+            border-radius: 6px;
+        }}
+        QListView#ListaHistorias QScrollBar::add-line:vertical,
+        QListView#ListaHistorias QScrollBar::sub-line:vertical {{
+            height: 0px;
+        }}
+    """
+
+
+def _historia(t: Dict[str, Any]) -> str:
+    """Tela da história: contagem do Modo 2, normal e nos últimos segundos"""
+    return f"""
+        QLabel#ContagemDecisao {{
+            color: {t["ouro"]};
+            font-size: 28px;
+            font-weight: bold;
+            background: transparent;
+            border: 2px solid {t["contagem_borda"]};
+            border-radius: 28px;
+        }}
+        QLabel#ContagemDecisao[urgente="true"] {{
+            color: {t["urgente"]};
+            border: 2px solid {t["urgente"]};
+        }}
+    """
+
+
+def _menu(t: Dict[str, Any]) -> str:
+    regras = [f"""
+        QMainWindow#TelaMenu[imagem="true"] {{
+            background: transparent;
+        }}
+        QMainWindow#TelaMenu[imagem="false"] {{
+            background-color: {t["menu_fundo"]};
+        }}
+        QLabel#TituloMenu {{
+            color: {t["texto"]};
+            font-family: {t["fonte"]};
+            font-size: 32px;
+            font-weight: normal;
+            padding-bottom: 5px;
+        }}
+        QFrame#DivisorMenu {{
+            background-color: {t["texto"]};
+        }}
+        QPushButton#BotaoMenu {{
+            color: {t["texto"]};
+            border: none;
+            border-radius: 18px;
+            padding: 10px 20px;
+            font-family: {t["fonte"]};
+            font-size: 18px;
+            font-weight: bold;
+            text-align: left;
+            min-height: 40px;
+        }}
+        QLabel#BoasVindas {{
+            color: {t["texto"]};
+            font-family: {t["fonte"]};
+            font-size: 32px;
+            font-weight: bold;
+        }}
+        QPushButton#BotaoIniciar {{
+            background-color: {_gradiente(t["iniciar"])};
+            color: {t["texto"]};
+            border: none;
+            border-radius: 25px;
+            padding: 15px 30px;
+            font-family: {t["fonte"]};
+            font-size: 20px;
+            font-weight: bold;
+            min-width: 250px;
+        }}
+        QPushButton#BotaoIniciar:hover {{
+            background-color: {_gradiente(t["iniciar_hover"])};
+        }}
+    """]
+    for indice, (normal, hover) in enumerate(t["menu"]):
+        regras.append(f"""
+        QPushButton#BotaoMenu[indice="{indice}"] {{
+            background-color: {_gradiente(normal)};
+        }}
+        QPushButton#BotaoMenu[indice="{indice}"]:hover {{
+            background-color: {_gradiente(hover)};
+        }}
+        """)
+    return "".join(regras)
+
+
+def _login(t: Dict[str, Any]) -> str:
+    """Login, redefinição de senha e verificação de código"""
+    return f"""
+        QDialog#TelaLogin[transparente="true"], QDialog#DialogoLogin[transparente="true"] {{
+            background: transparent;
+        }}
+        QLabel#RotuloLogin {{
+            color: {t["texto"]};
+            font-family: {t["fonte"]};
+            font-size: 18px;
+            font-weight: bold;
+        }}
+        QLabel#TituloDialogoLogin {{
+            color: {t["texto"]};
+            font-family: {t["fonte"]};
+            font-size: 24px;
+            font-weight: bold;
+            margin-bottom: 30px;
+        }}
+        QLabel#TextoDialogoLogin {{
+            color: {t["texto"]};
+            font-size: 16px;
+        }}
+        QLabel#InstrucaoLogin {{
+            color: {t["texto"]};
+            font-size: 14px;
+            text-align: center;
+        }}
+        QLineEdit#CampoLogin {{
+            background-color: {_gradiente(t["formulario"])};
+            border: 1px solid {t["texto"]};
+            border-radius: 15px;
+            padding: 10px;
+            color: {t["texto"]};
+            font-size: 16px;
+            font-family: {t["fonte"]};
+        }}
+        QCheckBox#MostrarSenha {{
+            color: {t["texto"]};
+            font-size: 16px;
+            font-family: {t["fonte"]};
+        }}
+        QCheckBox#MostrarSenha::indicator {{
+            width: 18px;
+            height: 18px;
+            border: 2px solid {t["texto"]};
+            border-radius: 5px;
+            background-color: transparent;
+        }}
+        QCheckBox#MostrarSenha::indicator:checked {{
+            background-color: {t["texto"]};
+        }}
+        QPushButton#LinkLogin {{
+            color: {t["texto"]};
+            font-size: 16px;
+            font-family: {t["fonte"]};
+            text-decoration: underline;
+            background: transparent;
+            border: none;
+            padding: 0;
+            margin-top: 10px;
+        }}
+        QPushButton#LinkLogin:hover, QPushButton#LinkReenviar:hover {{
+            color: {t["ouro_suave"]};
+        }}
+        QPushButton#LinkReenviar {{
+            color: {t["texto"]};
+            font-size: 12px;
+            font-family: {t["fonte"]};
+            text-decoration: underline;
+            background: transparent;
+            border: none;
+        }}
+        QPushButton#BotaoLogin, QPushButton#BotaoVoltarLogin {{
+            background-color: {_gradiente(t["formulario"])};
+            color: {t["texto"]};
+            border: none;
+            border-radius: 20px;
+            padding: 12px 25px;
+            font-size: 18px;
+            font-weight: bold;
+            font-family: {t["fonte"]};
+            min-width: 120px;
+        }}
+        QPushButton#BotaoLogin:hover {{
+            background-color: {_gradiente(t["formulario_hover"])};
+        }}
+        QPushButton#BotaoVoltarLogin {{
+            background-color: {_gradiente(t["voltar"])};
+        }}
+        QPushButton#BotaoVoltarLogin:hover {{
+            background-color: {_gradiente(t["voltar_hover"])};
+        }}
+        QMessageBox#MensagemLogin, QMessageBox#AvisoLogin {{
+            background-color: {t["mensagem_fundo"]};
+        }}
+        QMessageBox#MensagemLogin QLabel, QMessageBox#AvisoLogin QLabel {{
+            color: {t["texto"]};
+        }}
+        QMessageBox#MensagemLogin QPushButton {{
+            background-color: {t["mensagem_botao"]};
+            color: {t["texto"]};
+            padding: 5px 15px;
+            border-radius: 5px;
+        }}
+        QMessageBox#MensagemLogin QPushButton:hover {{
+            background-color: {t["mensagem_botao_hover"]};
+        }}
+    """
+
+
+def _cadastro(t: Dict[str, Any]) -> str:
+    """Formulário de cadastro e janelas de verificação em duas etapas"""
+    return f"""
+        QMainWindow#JanelaCadastro {{
+            background: transparent;
+        }}
+        QWidget#FormularioCadastro QLabel {{
+            color: {t["texto"]};
+            font-family: {t["fonte"]};
+            font-size: 16px;
+            font-weight: normal;
+        }}
+        QWidget#FormularioCadastro QLineEdit {{
+            background-color: {_gradiente(t["formulario"])};
+            border: 1px solid {t["texto"]};
+            border-radius: 15px;
+            padding: 10px;
+            color: {t["texto"]};
+            font-size: 14px;
+            font-family: {t["fonte"]};
+        }}
+        QWidget#FormularioCadastro QPushButton {{
+            background-color: {_gradiente(t["formulario"])};
+            color: {t["texto"]};
+            border: none;
+            border-radius: 20px;
+            padding: 12px 25px;
+            font-size: 18px;
+            font-weight: bold;
+            font-family: {t["fonte"]};
+        }}
+        QWidget#FormularioCadastro QPushButton:hover {{
+            background-color: {_gradiente(t["formulario_hover"])};
+        }}
+        QWidget#FormularioCadastro QCheckBox {{
+            color: {t["texto"]};
+            font-size: 14px;
+            font-family: {t["fonte"]};
+        }}
+        QWidget#FormularioCadastro QCheckBox::indicator {{
+            width: 18px;
+            height: 18px;
+            border: 2px solid {t["texto"]};
+            border-radius: 5px;
+            background-color: transparent;
+        }}
+        QWidget#FormularioCadastro QCheckBox::indicator:checked {{
+            background-color: {t["texto"]};
+            image: url({t["icone_marcado"]});
+        }}
+        QDialog#Dialogo2FA[transparente="true"] {{
+            background: transparent;
+        }}
+        QLineEdit#CampoCodigo {{
+            background-color: {_gradiente(t["formulario"])};
+            border: 1px solid {t["texto"]};
+            border-radius: 15px;
+            padding: 10px;
+            color: {t["texto"]};
+            font-size: 16px;
+            font-family: {t["fonte"]};
+            min-width: 200px;
+            max-width: 200px;
+        }}
+        QPushButton#BotaoCodigo {{
+            background-color: {_gradiente(t["formulario"])};
+            color: {t["texto"]};
+            border: none;
+            border-radius: 20px;
+            padding: 12px 25px;
+            font-size: 16px;
+            font-weight: bold;
+            font-family: {t["fonte"]};
+            min-width: 200px;
+        }}
+        QPushButton#BotaoCodigo:hover {{
+            background-color: {_gradiente(t["formulario_hover"])};
+        }}
+        QLabel#TituloVerificacao {{
+            font-size: 16px;
+            font-weight: bold;
+        }}
+        QLabel#ValidadeCodigo {{
+            font-size: 10px;
+        }}
+    """
+
+
+def compilar(tokens: Optional[Dict[str, Any]] = None) -> str:
+    """Folha de estilo completa da aplicação a partir dos tokens"""
+    t = dict(TOKENS, **(tokens or {}))
+    return "".join((_botoes_modernos(t), _mundo(t), _historia(t), _menu(t), _login(t), _cadastro(t)))
+
+
+_folha: Optional[str] = None
+
+
+def folha_de_estilo() -> str:
+    """Folha compilada uma única vez por processo"""
+    global _folha
+    if _folha is None:
+        _folha = compilar()
+    return _folha
+
+
+def aplicar_tema(app: Optional[QApplication] = None) -> None:
+    """Instala a folha no QApplication; chamado uma vez, na inicialização"""
+    app = app or QApplication.instance()
+    folha = folha_de_estilo()
+    # Trocar a folha da aplicação refaz o estilo de todos os widgets
+    if app.styleSheet() != folha:
+        app.setStyleSheet(folha)
+
+
+def definir_estado(widget: QWidget, propriedade: str, valor: Any, filhos: bool = False) -> None:
+    """Muda uma propriedade usada nos seletores e repole só o widget (e, se pedido, os filhos)
+
+    Nenhum texto de estilo é analisado de novo: a folha da aplicação já tem
+    as regras de cada estado.
+    """
+    if widget.property(propriedade) == valor:
+        return
+    widget.setProperty(propriedade, valor)
+    estilo = widget.style()
+    for alvo in [widget] + (widget.findChildren(QWidget) if filhos else []):
+        estilo.unpolish(alvo)
+        estilo.polish(alvo)
+    widget.update()
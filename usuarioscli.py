@@ -0,0 +1,120 @@
+"""Importação e exportação em massa da tabela de usuários.
+
+Uso:
+    python usuarioscli.py importar turma.csv [--lote 5000] [--db usuarios1.db]
+    python usuarioscli.py exportar usuarios.jsonl [--db usuarios1.db]
+
+Arquivos CSV precisam das colunas nome, apelido, email e senha; arquivos
+JSONL têm um objeto com essas chaves por linha. O formato é deduzido pela
+extensão e pode ser forçado com --formato. Use '-' para ler da entrada ou
+escrever na saída padrão.
+
+As senhas são gravadas codificadas (passwordhash). A exportação traz as
+senhas já codificadas, e ao importar elas são mantidas como estão, sem
+custo. Senhas em texto puro são derivadas com os custos atuais (~60 ms
+cada com scrypt, cerca de 1 hora e 40 minutos por 100 mil usuários em um
+núcleo, dividido pelos núcleos disponíveis).
+
+Com --custo-reduzido elas são derivadas com os custos de importação
+(PasswordHasher.para_importacao, ~1 ms cada) e regravadas com os custos
+atuais no primeiro login de cada usuário. Até lá o hash é ~64x mais barato
+de atacar, e contas que nunca entram ficam assim para sempre; use só
+quando a turma for entrar logo em seguida.
+"""
+import argparse
+import csv
+import json
+import sys
+import time
+
+from database import Database
+from passwordhash import PasswordHasher
+
+CAMPOS = ('nome', 'apelido', 'email', 'senha')
+
+
+def _formato(caminho, formato):
+    if formato:
+        return formato
+    return 'jsonl' if caminho.endswith(('.jsonl', '.ndjson')) else 'csv'
+
+
+def ler_registros(arquivo, formato):
+    """Lê os usuários do arquivo um a um, sem carregá-lo inteiro"""
+    if formato == 'csv':
+        yield from csv.DictReader(arquivo)
+    else:
+        for linha in arquivo:
+            if linha.strip():
+                yield json.loads(linha)
+
+
+def importar(args):
+    db = Database(args.db)
+    arquivo = sys.stdin if args.arquivo == '-' else open(args.arquivo, newline='', encoding='utf-8')
+    inicio = time.perf_counter()
+    try:
+        hasher = PasswordHasher.para_importacao() if args.custo_reduzido else PasswordHasher()
+        resultado = db.importar_usuarios(ler_registros(arquivo, _formato(args.arquivo, args.formato)), args.lote,
+                                         hasher)
+    finally:
+        if arquivo is not sys.stdin:
+            arquivo.close()
+        db.close()
+    duracao = time.perf_counter() - inicio
+
+    for linha, campo, valor in resultado['conflitos']:
+        print(f"linha {linha}: conflito em '{campo}' {valor}".rstrip(), file=sys.stderr)
+    print(f"{resultado['inseridos']} usuários importados, "
+          f"{len(resultado['conflitos'])} conflitos, em {duracao:.2f}s")
+    return 1 if resultado['conflitos'] else 0
+
+
+def exportar(args):
+    db = Database(args.db)
+    arquivo = sys.stdout if args.arquivo == '-' else open(args.arquivo, 'w', newline='', encoding='utf-8')
+    total = 0
+    try:
+        if _formato(args.arquivo, args.formato) == 'csv':
+            escritor = csv.writer(arquivo)
+            escritor.writerow(CAMPOS)
+            for usuario in db.exportar_usuarios():
+                escritor.writerow(usuario)
+                total += 1
+        else:
+            for usuario in db.exportar_usuarios():
+                arquivo.write(json.dumps(dict(zip(CAMPOS, usuario)), ensure_ascii=False) + '\n')
+                total += 1
+    finally:
+        if arquivo is not sys.stdout:
+            arquivo.close()
+        db.close()
+    print(f"{total} usuários exportados", file=sys.stderr)
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Importação e exportação em massa de usuários")
+    parser.add_argument('--db', default='usuarios1.db', help="banco de dados (padrão: usuarios1.db)")
+    sub = parser.add_subparsers(dest='comando', required=True)
+
+    p_importar = sub.add_parser('importar', help="importa usuários de um CSV ou JSONL")
+    p_importar.add_argument('arquivo')
+    p_importar.add_argument('--formato', choices=('csv', 'jsonl'))
+    p_importar.add_argument('--lote', type=int, default=5000, help="usuários por transação")
+    p_importar.add_argument('--custo-reduzido', action='store_true',
+                            help="codifica as senhas em texto puro com custo ~64x menor até o primeiro "
+                                 "login de cada usuário (mais rápido, porém mais fraco)")
+    p_importar.set_defaults(func=importar)
+
+    p_exportar = sub.add_parser('exportar', help="exporta os usuários para CSV ou JSONL")
+    p_exportar.add_argument('arquivo')
+    p_exportar.add_argument('--formato', choices=('csv', 'jsonl'))
+    p_exportar.set_defaults(func=exportar)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,183 @@
+import hashlib
+import heapq
+import hmac
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from database import ConnectionPool
+
+# Finalidades dos códigos (parte da chave junto com o email)
+PURPOSE_SIGNUP = "cadastro"
+PURPOSE_LOGIN = "login"
+PURPOSE_RESET = "redefinicao"
+
+# Resultados de VerificationCodeStore.verificar
+CODE_VALID = "valido"
+CODE_WRONG = "incorreto"
+CODE_EXPIRED = "expirado"
+CODE_LOCKED = "bloqueado"
+CODE_MISSING = "inexistente"
+
+# Mensagens para o usuário em cada resultado que não é válido
+CODE_MESSAGES = {
+    CODE_WRONG: "Código incorreto. Tente novamente.",
+    CODE_EXPIRED: "Código expirado. Solicite um novo.",
+    CODE_LOCKED: "Muitas tentativas erradas. Solicite um novo código.",
+    CODE_MISSING: "Nenhum código pendente. Solicite um novo.",
+}
+
+CODE_TTL = 5 * 60
+MAX_ATTEMPTS = 5
+CODE_DIGITS = 6
+
+
+class _Codigo:
+    __slots__ = ("sal", "resumo", "expira", "tentativas", "geracao")
+
+    def __init__(self, sal: bytes, resumo: bytes, expira: float, tentativas: int, geracao: int) -> None:
+        self.sal = sal
+        self.resumo = resumo
+        self.expira = expira
+        self.tentativas = tentativas
+        self.geracao = geracao
+
+
+def _resumir(sal: bytes, codigo: str) -> bytes:
+    # Só o resumo é guardado: quem lê o banco não vê os códigos pendentes
+    return hashlib.sha256(sal + codigo.encode("utf-8")).digest()
+
+
+class VerificationCodeStore:
+    """Códigos de verificação (2FA, cadastro, redefinição de senha) por (email, finalidade).
+
+    Os prazos ficam num heap único: cada operação remove o que já venceu,
+    sem um timer por código, então milhares de códigos pendentes custam só
+    a memória deles. A comparação é em tempo constante, cada código aceita
+    até max_tentativas erros e vale uma única vez. Com db_name, os códigos
+    também vão para o SQLite e sobrevivem a um reinício do programa.
+    """
+
+    def __init__(self, db_name: Optional[str] = None, validade: float = CODE_TTL,
+                 max_tentativas: int = MAX_ATTEMPTS, relogio: Callable[[], float] = time.time) -> None:
+        self.validade = validade
+        self.max_tentativas = max_tentativas
+        # Relógio de parede: os prazos gravados continuam valendo após reiniciar
+        self.relogio = relogio
+        self._codigos: Dict[Tuple[str, str], _Codigo] = {}
+        # (expira, geração, chave); entradas de códigos já trocados são ignoradas
+        self._prazos: List[Tuple[float, int, Tuple[str, str]]] = []
+        self._geracao = 0
+        self._lock = threading.Lock()
+        self.pool = ConnectionPool(db_name) if db_name else None
+        if self.pool is not None:
+            self._carregar()
+
+    def _carregar(self) -> None:
+        """Cria a tabela e recupera os códigos ainda válidos"""
+        try:
+            with self.pool.connection() as conn:
+                conn.execute('''
+                    CREATE TABLE IF NOT EXISTS codigos_verificacao (
+                        email TEXT NOT NULL,
+                        finalidade TEXT NOT NULL,
+                        sal BLOB NOT NULL,
+                        resumo BLOB NOT NULL,
+                        expira REAL NOT NULL,
+                        tentativas INTEGER NOT NULL DEFAULT 0,
+                        PRIMARY KEY (email, finalidade)
+                    )
+                ''')
+                conn.execute('DELETE FROM codigos_verificacao WHERE expira <= ?', (self.relogio(),))
+                linhas = conn.execute(
+                    'SELECT email, finalidade, sal, resumo, expira, tentativas FROM codigos_verificacao').fetchall()
+        except sqlite3.Error as e:
+            print(f"Erro ao carregar códigos de verificação: {e}")
+            return
+        for email, finalidade, sal, resumo, expira, tentativas in linhas:
+            self._guardar((email, finalidade), _Codigo(sal, resumo, expira, tentativas, 0))
+
+    def _guardar(self, chave: Tuple[str, str], entrada: _Codigo) -> None:
+        self._geracao += 1
+        entrada.geracao = self._geracao
+        self._codigos[chave] = entrada
+        heapq.heappush(self._prazos, (entrada.expira, entrada.geracao, chave))
+
+    def _gravar(self, sql: str, parametros: tuple) -> None:
+        if self.pool is None:
+            return
+        try:
+            with self.pool.connection() as conn:
+                conn.execute(sql, parametros)
+        except sqlite3.Error as e:
+            print(f"Erro ao gravar código de verificação: {e}")
+
+    def _apagar(self, chave: Tuple[str, str]) -> None:
+        self._codigos.pop(chave, None)
+        self._gravar('DELETE FROM codigos_verificacao WHERE email = ? AND finalidade = ?', chave)
+
+    def _expirar(self, agora: float) -> None:
+        """Remove do topo do heap os códigos vencidos"""
+        prazos = self._prazos
+        while prazos and prazos[0][0] <= agora:
+            _, geracao, chave = heapq.heappop(prazos)
+            entrada = self._codigos.get(chave)
+            if entrada is not None and entrada.geracao == geracao:
+                self._apagar(chave)
+
+    def gerar(self, email: str, finalidade: str) -> str:
+        """Novo código para (email, finalidade); substitui o anterior e zera as tentativas"""
+        codigo = f"{secrets.randbelow(10 ** CODE_DIGITS):0{CODE_DIGITS}d}"
+        sal = os.urandom(16)
+        with self._lock:
+            agora = self.relogio()
+            self._expirar(agora)
+            entrada = _Codigo(sal, _resumir(sal, codigo), agora + self.validade, 0, 0)
+            self._guardar((email, finalidade), entrada)
+            self._gravar('''
+                INSERT OR REPLACE INTO codigos_verificacao (email, finalidade, sal, resumo, expira, tentativas)
+                VALUES (?, ?, ?, ?, ?, 0)
+            ''', (email, finalidade, sal, entrada.resumo, entrada.expira))
+        return codigo
+
+    def verificar(self, email: str, finalidade: str, codigo: str) -> str:
+        """Confere o código e retorna um dos resultados CODE_*; o código certo é consumido"""
+        chave = (email, finalidade)
+        with self._lock:
+            agora = self.relogio()
+            entrada = self._codigos.get(chave)
+            if entrada is not None and entrada.expira <= agora:
+                self._apagar(chave)
+                self._expirar(agora)
+                return CODE_EXPIRED
+            self._expirar(agora)
+            if entrada is None:
+                return CODE_MISSING
+            if hmac.compare_digest(_resumir(entrada.sal, codigo), entrada.resumo):
+                self._apagar(chave)
+                return CODE_VALID
+            entrada.tentativas += 1
+            if entrada.tentativas >= self.max_tentativas:
+                self._apagar(chave)
+                return CODE_LOCKED
+            self._gravar('UPDATE codigos_verificacao SET tentativas = ? WHERE email = ? AND finalidade = ?',
+                         (entrada.tentativas, email, finalidade))
+            return CODE_WRONG
+
+    def descartar(self, email: str, finalidade: str) -> None:
+        """Cancela o código pendente, se houver"""
+        with self._lock:
+            self._apagar((email, finalidade))
+
+    def pendentes(self) -> int:
+        """Quantidade de códigos ainda válidos"""
+        with self._lock:
+            self._expirar(self.relogio())
+            return len(self._codigos)
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.close_all()